@@ -0,0 +1,183 @@
+"""asyncio variant of the daily data → train → predict pipeline.
+
+ib_insync is asyncio-native, so instead of issuing one blocking historical
+request at a time, every symbol runs as a coroutine on the IB event loop:
+
+- IB historical requests are awaited directly (``reqHistoricalDataAsync``),
+  bounded by ``pipeline.ib_concurrency`` to stay inside IB's pacing limits.
+- S3 reads/writes go through a thread-pool executor bridge, bounded by
+  ``pipeline.io_workers``.
+- Feature building and LightGBM training run in a process pool of
+  ``pipeline.cpu_workers`` processes, off the event loop and free of the GIL.
+
+All three overlap, so the wall-clock approaches the slowest resource rather
+than the sum of every symbol's latencies.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import pandas as pd
+
+from agents.ml_agent import fit_model
+from utils.dag_scheduler import PipelineReport, SymbolResult
+from utils.features import add_features
+from utils.run_manifest import hash_inputs
+from utils.tracing import span
+
+
+def featurize_and_fit(df: pd.DataFrame, params: Optional[dict]):
+    """Process-pool worker: build features and, if ``params`` is given, fit a model.
+
+    Returns ``(df_feat, model_str)``; ``model_str`` is None when training was
+    skipped or there were no features.
+    """
+    df_feat = add_features(df)
+    if df_feat.empty or params is None:
+        return df_feat, None
+    return df_feat, fit_model(df_feat, params)
+
+
+class AsyncPipeline:
+    """Run a ``SuperAgent``'s symbols concurrently on one asyncio event loop.
+
+    Reuses the agent's sub-agents, manifest checkpoints and report format, so
+    ``pipeline.mode: async`` is a drop-in alternative to ``pipelined``.
+    """
+
+    def __init__(self, agent, manifest=None, cpu_executor: Optional[Executor] = None):
+        self.agent = agent
+        self.manifest = manifest
+        self.logger = agent.logger
+        pipe_cfg = agent.config.get("pipeline", {})
+        self.ib_concurrency = pipe_cfg.get("ib_concurrency", 6)
+        self.io_workers = pipe_cfg.get("io_workers", 8)
+        self.cpu_workers = pipe_cfg.get("cpu_workers") or os.cpu_count() or 1
+        self._cpu_executor = cpu_executor
+
+    def run(self, symbols) -> PipelineReport:
+        """Run on the IB event loop (the loop the IB connection was opened on)."""
+        from ib_insync import util
+
+        # IBKRClient connects with the blocking IB.connect, which cannot run
+        # inside the running loop: open the shared connection first
+        if any(self._needs_fetch(symbol) for symbol in symbols):
+            self.agent.data_agent.ib
+        return util.run(self.run_async(symbols))
+
+    def _needs_fetch(self, symbol: str) -> bool:
+        return self.manifest is None or not self.manifest.is_done(
+            "fetch", symbol, self.agent._fetch_hash(symbol))
+
+    async def run_async(self, symbols) -> PipelineReport:
+        start = time.perf_counter()
+        self._ib_sem = asyncio.Semaphore(self.ib_concurrency)
+        self._io_sem = asyncio.Semaphore(self.io_workers)
+        self._cpu_sem = asyncio.Semaphore(self.cpu_workers)
+        self.results = {symbol: SymbolResult(symbol) for symbol in symbols}
+        self.stage_seconds = {}
+
+        # Per-run thread count; the shared MLAgent is left as configured
+        self._params = self.agent.ml_agent.params(self.agent.threads_per_model(self.cpu_workers))
+
+        cpu_pool = self._cpu_executor or ProcessPoolExecutor(self.cpu_workers)
+        self._io_pool = ThreadPoolExecutor(self.io_workers, thread_name_prefix="async-io")
+        self._cpu_pool = cpu_pool
+        try:
+            await asyncio.gather(*(self._run_symbol(symbol) for symbol in symbols))
+        finally:
+            self._io_pool.shutdown(wait=False)
+            if self._cpu_executor is None:
+                cpu_pool.shutdown()
+        return PipelineReport(time.perf_counter() - start, self.results, self.stage_seconds)
+
+    async def _run_symbol(self, symbol: str):
+        result = self.results[symbol]
+        try:
+            p_up = await self._process(symbol, result)
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+            self.logger.error(f"{symbol}: {result.failed_stage} failed: {result.error}")
+            return
+        if p_up is None:
+            result.status = "stopped"
+        else:
+            result.results["predict"] = p_up
+            result.status = "ok"
+
+    async def _process(self, symbol: str, result: SymbolResult):
+        agent, manifest = self.agent, self.manifest
+        data_agent = agent.data_agent
+        fetch_hash = agent._fetch_hash(symbol)
+
+        if not self._needs_fetch(symbol):
+            raw_key = manifest.output("fetch", symbol)
+            df = await self._stage(result, "fetch", self._io_sem, self._io_pool,
+                                   data_agent.s3.read_parquet, raw_key)
+        else:
+            df = await self._stage(result, "fetch", self._ib_sem, None, self._fetch, symbol)
+            raw_key = await self._stage(result, "store_raw", self._io_sem, self._io_pool,
+                                        agent._step, manifest, "fetch", symbol, fetch_hash,
+                                        lambda: data_agent.write_raw(symbol, df))
+
+        train_hash = hash_inputs(raw_key)
+        retrain = manifest is None or not manifest.is_done("train", symbol, train_hash)
+        df_feat, model_str = await self._stage(
+            result, "features_train", self._cpu_sem, self._cpu_pool,
+            featurize_and_fit, df, self._params if retrain else None,
+        )
+        if df_feat.empty:
+            self.logger.warning(f"No features available for {symbol}; skipping.")
+            return None
+
+        if model_str is not None:
+            def upload():
+                model_key = agent.ml_agent.upload_model(symbol, model_str)
+                agent.predict_agent.model_cache.invalidate(model_key)
+                return model_key
+
+            await self._stage(result, "upload_model", self._io_sem, self._io_pool,
+                              agent._step, manifest, "train", symbol, train_hash, upload)
+
+        X = df_feat.drop(columns=["target_up"])
+        predict_hash = agent._predict_hash(manifest, symbol, raw_key)
+        return await self._stage(result, "predict", self._io_sem, self._io_pool,
+                                 agent._step, manifest, "predict", symbol, predict_hash,
+                                 lambda: agent.predict_agent.predict_features(symbol, X))
+
+    async def _fetch(self, symbol: str) -> pd.DataFrame:
+        data_cfg = self.agent.config["data"]
+        try:
+            with span("ib.fetch", symbol=symbol) as sp:
+                df = await self.agent.data_agent.ib.get_historical_ohlc_async(
+                    symbol, data_cfg["bar_size"], data_cfg["lookback_days"]
+                )
+                sp.set(rows=len(df))
+            return df
+        except Exception as e:
+            if self.manifest is not None:
+                self.manifest.mark_failed("fetch", symbol, e, self.agent._fetch_hash(symbol))
+            raise
+
+    async def _stage(self, result: SymbolResult, name: str, sem: asyncio.Semaphore,
+                     executor: Optional[Executor], fn, *args):
+        """Await ``fn(*args)`` under ``sem``.
+
+        Coroutine functions are awaited directly; anything else runs on ``executor``.
+        """
+        result.failed_stage = name
+        async with sem:
+            start = time.perf_counter()
+            with span(f"stage.{name}", symbol=result.symbol):
+                if executor is None:
+                    value = await fn(*args)
+                else:
+                    value = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            elapsed = time.perf_counter() - start
+        result.durations[name] = elapsed
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + elapsed
+        result.failed_stage = None
+        return value
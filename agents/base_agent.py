@@ -1,21 +1,15 @@
 import logging
-import yaml
-from pathlib import Path
+from typing import Optional
+from utils.runtime import RuntimeContext, get_runtime
 
 
 class BaseAgent:
-    def __init__(self, config_path: str = "config.yaml"):
-        self.config = self._load_config(config_path)
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        self.runtime = runtime or get_runtime(config_path)
+        self.config = self.runtime.config
         self._setup_logging()
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def _load_config(self, path: str):
-        cfg_path = Path(path)
-        if not cfg_path.exists():
-            raise FileNotFoundError(f"Config file not found: {cfg_path}")
-        with cfg_path.open("r") as f:
-            return yaml.safe_load(f)
-
     def _setup_logging(self):
         logging.basicConfig(
             level=logging.INFO,
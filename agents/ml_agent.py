@@ -1,22 +1,33 @@
-from io import BytesIO
-import tempfile
-import os
+from typing import Optional
 from .base_agent import BaseAgent
-from utils.s3_client import S3Client
+from utils.runtime import RuntimeContext
 from utils.features import add_features
+from utils.tracing import span
 import lightgbm as lgb
+import pandas as pd
+
+
+def fit_model(df_feat: pd.DataFrame, params: dict, num_boost_round: int = 200) -> str:
+    """Fit a booster on a featurized frame and return its model text.
+
+    A plain function returning a string so it can run in a process pool.
+    """
+    X = df_feat.drop(columns=["target_up"])
+    y = df_feat["target_up"]
+    with span("lgb.train", rows=len(X)):
+        model = lgb.train(params, lgb.Dataset(X, label=y), num_boost_round=num_boost_round)
+        return model.model_to_string()
 
 
 class MLAgent(BaseAgent):
     """Loads raw data from S3, builds features, trains a LightGBM model, saves to S3."""
 
-    def __init__(self, config_path: str = "config.yaml"):
-        super().__init__(config_path)
-        aws_cfg = self.config["aws"]
-        self.s3 = S3Client(
-            region=aws_cfg["region"],
-            bucket=aws_cfg["s3_bucket"]
-        )
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        super().__init__(config_path, runtime)
+        self.s3 = self.runtime.s3
+        # LightGBM threads per model; 0 lets LightGBM use every core. Runs that
+        # train several symbols concurrently pass a lower count per call.
+        self.num_threads = self.config.get("training", {}).get("num_threads", 0)
 
     def train_symbol(self, symbol: str):
         raw_prefix = self.config["paths"]["raw_prefix"]
@@ -34,10 +45,18 @@ class MLAgent(BaseAgent):
             self.logger.warning(f"No features available for {symbol}; skipping.")
             return
 
-        X = df_feat.drop(columns=["target_up"])
-        y = df_feat["target_up"]
+        return self.train_features(symbol, df_feat)
+
+    def train_features(self, symbol: str, df_feat: pd.DataFrame,
+                       num_threads: Optional[int] = None) -> str:
+        """Train on an already featurized frame and upload the model; returns its key.
 
-        train_dataset = lgb.Dataset(X, label=y)
+        ``num_threads`` overrides ``training.num_threads`` for this model only.
+        """
+        self.logger.info(f"Training LightGBM model for {symbol}")
+        return self.upload_model(symbol, fit_model(df_feat, self.params(num_threads)))
+
+    def params(self, num_threads: Optional[int] = None) -> dict:
         params = {
             "objective": "binary",
             "metric": "binary_logloss",
@@ -46,29 +65,23 @@ class MLAgent(BaseAgent):
             "feature_fraction": 0.8,
             "verbose": -1,
         }
+        threads = num_threads or self.num_threads
+        if threads:
+            params["num_threads"] = threads
+        return params
 
-        self.logger.info(f"Training LightGBM model for {symbol}")
-        model = lgb.train(params, train_dataset, num_boost_round=200)
-
+    def upload_model(self, symbol: str, model_str: str) -> str:
         model_prefix = self.config["paths"]["model_prefix"]
         model_key = f"{model_prefix}{symbol}/model.txt"
-        
-        # Save model to temp file, then read and upload to S3
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
-            tmp_path = tmp.name
-        
-        try:
-            model.save_model(tmp_path)
-            with open(tmp_path, 'rb') as f:
-                self.s3.s3.put_object(
-                    Bucket=self.s3.bucket,
-                    Key=model_key,
-                    Body=f.read()
-                )
-            self.logger.info(f"Saved model for {symbol} to s3://{self.s3.bucket}/{model_key}")
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        body = model_str.encode("utf-8")
+        with span("s3.put", bytes=len(body)):
+            self.s3.s3.put_object(
+                Bucket=self.s3.bucket,
+                Key=model_key,
+                Body=body
+            )
+        self.logger.info(f"Saved model for {symbol} to s3://{self.s3.bucket}/{model_key}")
+        return model_key
 
     def run(self):
         for symbol in self.config["symbols"]:
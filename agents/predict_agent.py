@@ -1,10 +1,12 @@
 from datetime import datetime
-from io import BytesIO
-import tempfile
-import os
+from typing import Optional
 from .base_agent import BaseAgent
-from utils.s3_client import S3Client
+from utils.runtime import RuntimeContext
 from utils.features import add_features
+from utils.model_cache import CachedModel
+from utils.prediction_store import PredictionStore
+from utils.tracing import span
+from utils.tree_evaluator import CompiledEnsemble
 import pandas as pd
 import lightgbm as lgb
 
@@ -12,32 +14,47 @@ import lightgbm as lgb
 class PredictAgent(BaseAgent):
     """Loads model + latest data from S3, generates predictions and writes them back to S3."""
 
-    def __init__(self, config_path: str = "config.yaml"):
-        super().__init__(config_path)
-        aws_cfg = self.config["aws"]
-        self.s3 = S3Client(
-            region=aws_cfg["region"],
-            bucket=aws_cfg["s3_bucket"]
-        )
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        super().__init__(config_path, runtime)
+        self.s3 = self.runtime.s3
+        self.model_cache = self.runtime.model_cache
 
-    def _load_model(self, symbol: str) -> lgb.Booster:
+        pred_cfg = self.config.get("prediction", {})
+        # "full" re-scores the whole window into a new snapshot file each run;
+        # "incremental" scores only new bars into the partitioned dataset, but
+        # only while the model is unchanged: a retrain changes its ETag and
+        # forces a full re-score. run_daily retrains before every predict, so
+        # there it saves nothing; it pays off for repeated predict runs
+        # between retrains (e.g. intraday ``cli.py predict``).
+        self.mode = pred_cfg.get("mode", "full")
+        self.store = PredictionStore(self.s3, self.config["paths"]["pred_prefix"])
+        # "native" scores with lgb.Booster.predict; "numpy" with the compiled
+        # CompiledEnsemble, which has far less per-call overhead for a few rows.
+        self.backend = pred_cfg.get("backend", "native")
+        if self.backend not in ("native", "numpy"):
+            raise ValueError(f"Unknown prediction backend: {self.backend}")
+
+    def _model_key(self, symbol: str) -> str:
         model_prefix = self.config["paths"]["model_prefix"]
-        model_key = f"{model_prefix}{symbol}/model.txt"
-        obj = self.s3.s3.get_object(Bucket=self.s3.bucket, Key=model_key)
-        
-        # Save model to temp file, then load
-        with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.txt') as tmp:
-            tmp.write(obj["Body"].read())
-            tmp_path = tmp.name
-        
-        try:
-            model = lgb.Booster(model_file=tmp_path)
-            return model
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        return f"{model_prefix}{symbol}/model.txt"
 
-    def predict_symbol(self, symbol: str):
+    def _load_model(self, symbol: str) -> lgb.Booster:
+        """Return the symbol's booster, served from the in-process cache when current."""
+        return self.model_cache.get(self._model_key(symbol)).booster
+
+    def _scorer(self, entry: CachedModel):
+        """Return the object whose ``predict`` implements the configured backend."""
+        if self.backend == "native":
+            return entry.booster
+        if entry.compiled is None:
+            entry.compiled = CompiledEnsemble.from_booster(entry.booster)
+        return entry.compiled
+
+    def scorer(self, symbol: str):
+        return self._scorer(self.model_cache.get(self._model_key(symbol)))
+
+    def load_features(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Build the model input matrix from the symbol's latest raw data."""
         raw_prefix = self.config["paths"]["raw_prefix"]
         prefix = f"{raw_prefix}{symbol}/"
         latest_key = self.s3.get_latest_key(prefix)
@@ -53,13 +70,25 @@ class PredictAgent(BaseAgent):
             self.logger.warning(f"No features for {symbol}; cannot predict.")
             return None
 
-        X = df_feat.drop(columns=["target_up"])
+        return df_feat.drop(columns=["target_up"])
+
+    def predict_symbol(self, symbol: str):
+        X = self.load_features(symbol)
+        if X is None:
+            return None
+        return self.predict_features(symbol, X)
 
-        model = self._load_model(symbol)
-        preds = model.predict(X)
+    def predict_features(self, symbol: str, X: pd.DataFrame):
+        """Score a model input matrix, persist the predictions and return the latest P(up)."""
+        if self.mode == "incremental":
+            return self._predict_incremental(symbol, X)
+
+        scorer = self.scorer(symbol)
+        with span("predict.score", rows=len(X), backend=self.backend):
+            preds = scorer.predict(X)
 
         latest_prob = float(preds[-1])
-        latest_time = df_feat.index[-1]
+        latest_time = X.index[-1]
         self.logger.info(f"{symbol}: P(up)={latest_prob:.3f} at {latest_time}")
 
         # Save full prediction series
@@ -67,7 +96,7 @@ class PredictAgent(BaseAgent):
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M")
         pred_key = f"{pred_prefix}{symbol}/{timestamp}.parquet"
         out_df = pd.DataFrame({
-            "time": df_feat.index,
+            "time": X.index,
             "p_up": preds,
         })
         out_df.set_index("time", inplace=True)
@@ -76,9 +105,50 @@ class PredictAgent(BaseAgent):
 
         return latest_prob
 
+    def _predict_incremental(self, symbol: str, X: pd.DataFrame):
+        """Score only bars newer than the last persisted prediction.
+
+        The whole feature window is re-scored only when the model version
+        (S3 ETag) differs from the one recorded in the dataset manifest, which
+        is the case after every retrain on new data.
+        """
+        entry = self.model_cache.get(self._model_key(symbol))
+        manifest = self.store.read_manifest(symbol)
+
+        if manifest and manifest.get("model_version") == entry.etag:
+            # The last persisted bar is re-scored too: it may have been incomplete
+            # when it was first scored.
+            last_time = pd.Timestamp(manifest["last_time"])
+            X_new = X[pd.to_datetime(X.index) >= last_time]
+        else:
+            if manifest:
+                self.logger.info(f"{symbol}: model version changed; re-scoring full history")
+            X_new = X
+
+        if X_new.empty:
+            self.logger.info(f"{symbol}: no new bars since {manifest['last_time']}")
+            return manifest["last_p_up"]
+
+        scorer = self._scorer(entry)
+        with span("predict.score", rows=len(X_new), backend=self.backend):
+            preds = scorer.predict(X_new)
+        out_df = pd.DataFrame({"p_up": preds}, index=X_new.index)
+        manifest = self.store.append(symbol, out_df, entry.etag)
+
+        latest_prob = float(manifest["last_p_up"])
+        self.logger.info(
+            f"{symbol}: P(up)={latest_prob:.3f} at {manifest['last_time']} "
+            f"({len(X_new)} of {len(X)} bars scored)"
+        )
+        self.logger.info(
+            f"Appended predictions to s3://{self.s3.bucket}/{self.store.dataset_prefix(symbol)}"
+        )
+        return latest_prob
+
     def run(self):
         results = {}
         for symbol in self.config["symbols"]:
             prob = self.predict_symbol(symbol)
             results[symbol] = prob
+        self.logger.info(f"Model cache: {self.model_cache.stats()}")
         return results
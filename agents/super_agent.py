@@ -1,25 +1,278 @@
+import os
+import socket
+import threading
+import time
+from typing import Optional
 from .base_agent import BaseAgent
 from .data_agent import DataAgent
 from .ml_agent import MLAgent
 from .predict_agent import PredictAgent
+from utils.dag_scheduler import PipelineReport, Stage, SymbolPipeline
+from utils.features import add_features
+from utils.run_manifest import RunManifest, hash_inputs
+from utils.runtime import RuntimeContext
+from utils.tracing import span
+from utils.work_queue import WorkItem, WorkQueue, open_queue
 
 
 class SuperAgent(BaseAgent):
-    """Orchestrates the data, ML, and prediction agents in sequence."""
+    """Orchestrates the data, ML, and prediction agents.
 
-    def __init__(self, config_path: str = "config.yaml"):
-        super().__init__(config_path)
-        self.data_agent = DataAgent(config_path)
-        self.ml_agent = MLAgent(config_path)
-        self.predict_agent = PredictAgent(config_path)
+    ``pipeline.mode`` selects how: ``phased`` runs all fetches, then all
+    training, then all predictions; ``pipelined`` streams each symbol through
+    fetch → features → train → predict independently (see ``utils.dag_scheduler``);
+    ``async`` overlaps the same steps on one asyncio event loop with a process
+    pool for training (see ``agents.async_pipeline``). ``run_worker`` is the
+    sharded alternative: any number of workers, on any hosts, claim symbols
+    from a shared ``utils.work_queue`` queue until the run is drained.
 
-    def run_daily(self):
+    Both modes accept a ``RunManifest``: each symbol's fetch, train and predict
+    step is recorded as it completes, and a rerun with the same manifest skips
+    steps whose inputs are unchanged (the raw key for training, the raw key
+    plus model for prediction).
+    """
+
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        super().__init__(config_path, runtime)
+        # One runtime for all sub-agents: one config parse, one S3 client, one IB connection
+        self.data_agent = DataAgent(config_path, self.runtime)
+        self.ml_agent = MLAgent(config_path, self.runtime)
+        self.predict_agent = PredictAgent(config_path, self.runtime)
+        self.last_report = None
+
+    def run_daily(self, manifest: Optional[RunManifest] = None):
+        mode = self.config.get("pipeline", {}).get("mode", "phased")
+        if mode == "pipelined":
+            return self.run_pipelined(manifest)
+        if mode == "async":
+            return self.run_async(manifest)
+        if mode != "phased":
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+        return self.run_phased(manifest)
+
+    def run_phased(self, manifest: Optional[RunManifest] = None):
+        start = time.perf_counter()
+        symbols = self.config["symbols"]
         self.logger.info("Step 1: Updating data from IBKR → S3")
-        self.data_agent.run()
+        raw_keys = {
+            symbol: self._phase_step(manifest, "fetch", symbol, self._fetch_hash(symbol),
+                                     lambda: self.data_agent.update_symbol(symbol))
+            for symbol in symbols
+        }
 
         self.logger.info("Step 2: Training / updating models")
-        self.ml_agent.run()
+        for symbol in symbols:
+            self._phase_step(manifest, "train", symbol, hash_inputs(raw_keys[symbol]),
+                             lambda: self.ml_agent.train_symbol(symbol))
+        # Freshly trained models must not be served from a stale cache entry
+        self.predict_agent.model_cache.invalidate()
 
         self.logger.info("Step 3: Running predictions")
-        results = self.predict_agent.run()
+        results = {
+            symbol: self._phase_step(manifest, "predict", symbol,
+                                     self._predict_hash(manifest, symbol, raw_keys[symbol]),
+                                     lambda: self.predict_agent.predict_symbol(symbol))
+            for symbol in symbols
+        }
+        self.logger.info(f"Model cache: {self.predict_agent.model_cache.stats()}")
         self.logger.info(f"Final prediction snapshot: {results}")
+        self.logger.info(f"Phased run wall-clock: {time.perf_counter() - start:.2f}s")
+        return results
+
+    def run_pipelined(self, manifest: Optional[RunManifest] = None):
+        pipe_cfg = self.config.get("pipeline", {})
+        cpu_workers = pipe_cfg.get("cpu_workers") or os.cpu_count() or 1
+
+        pipeline = SymbolPipeline(
+            self.pipeline_stages(manifest, self.threads_per_model(cpu_workers)),
+            io_workers=pipe_cfg.get("io_workers", 8),
+            cpu_workers=cpu_workers,
+            logger=self.logger,
+        )
+        self.logger.info(f"Running pipelined DAG for {len(self.config['symbols'])} symbols")
+        report = pipeline.run(self.config["symbols"])
+        self.last_report = report
+
+        results = {symbol: r.results.get("predict") for symbol, r in report.symbols.items()}
+        self.logger.info(f"Final prediction snapshot: {results}")
+        self._log_report(report)
+        return results
+
+    def run_async(self, manifest: Optional[RunManifest] = None, cpu_executor=None):
+        from .async_pipeline import AsyncPipeline
+
+        self.logger.info(f"Running async pipeline for {len(self.config['symbols'])} symbols")
+        report = AsyncPipeline(self, manifest, cpu_executor).run(self.config["symbols"])
+        self.last_report = report
+
+        results = {symbol: r.results.get("predict") for symbol, r in report.symbols.items()}
+        self.logger.info(f"Final prediction snapshot: {results}")
+        self._log_report(report, label="Async")
+        return results
+
+    def run_worker(self, run_id: str, queue: Optional[WorkQueue] = None,
+                   worker_id: Optional[str] = None, manifest: Optional[RunManifest] = None,
+                   poll_seconds: float = 5.0):
+        """Claim and process symbols of ``run_id`` until none are pending or leased.
+
+        Enqueue the run first (``enqueue_run``). Returns this worker's results.
+        """
+        queue = queue or open_queue(self.config)
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        results = {}
+        self.logger.info(f"Worker {worker_id} joining run {run_id}: {queue.status(run_id)}")
+        while True:
+            item = queue.claim(run_id, worker_id)
+            if item is None:
+                if queue.unfinished(run_id) == 0:
+                    break
+                # Other workers hold leases; wait in case one is abandoned
+                time.sleep(poll_seconds)
+                continue
+            results[item.symbol] = self._work_on(queue, item, manifest)
+        self.logger.info(f"Worker {worker_id} done; run {run_id}: {queue.status(run_id)}")
+        return results
+
+    def enqueue_run(self, run_id: str, queue: Optional[WorkQueue] = None) -> int:
+        queue = queue or open_queue(self.config)
+        added = queue.enqueue(run_id, self.config["symbols"])
+        self.logger.info(f"Enqueued {added} symbols for run {run_id}")
+        return added
+
+    def _work_on(self, queue: WorkQueue, item: WorkItem, manifest: Optional[RunManifest]):
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(queue.lease_seconds / 3):
+                if not queue.heartbeat(item):
+                    self.logger.warning(f"{item.symbol}: lease lost to another worker")
+                    lost.set()
+                    return
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            p_up = self.process_symbol(item.symbol, manifest, cancel=lost)
+        except Exception as e:
+            self.logger.error(f"{item.symbol}: attempt {item.attempts} failed: {e}")
+            queue.fail(item, f"{type(e).__name__}: {e}")
+            return None
+        finally:
+            stop.set()
+            beat.join()
+        if lost.is_set():
+            # The new lease holder redoes the symbol; this worker's partial work is dropped
+            self.logger.warning(f"{item.symbol}: stopped after losing the lease")
+            return None
+        if not queue.complete(item, p_up):
+            self.logger.warning(f"{item.symbol}: lease lost before completion; result discarded")
+            return None
+        return p_up
+
+    def process_symbol(self, symbol: str, manifest: Optional[RunManifest] = None,
+                       cancel: Optional[threading.Event] = None):
+        """Run one symbol through fetch → features → train → predict on this thread.
+
+        Returns None without running further stages once ``cancel`` is set.
+        """
+        stages = self.pipeline_stages(manifest)
+        results = {}
+        for stage in stages:
+            if cancel is not None and cancel.is_set():
+                return None
+            value = stage.fn(symbol, results)
+            if value is None:
+                return None
+            results[stage.name] = value
+        return results["predict"]
+
+    def threads_per_model(self, concurrent: int) -> int:
+        """LightGBM threads for each of ``concurrent`` symbols training at once.
+
+        ``training.num_threads`` wins when set; otherwise the cores are shared.
+        """
+        return self.ml_agent.num_threads or max(1, (os.cpu_count() or 1) // concurrent)
+
+    def pipeline_stages(self, manifest: Optional[RunManifest] = None,
+                        num_threads: Optional[int] = None):
+        """The per-symbol stage chain used by ``run_pipelined``; models train on ``num_threads``."""
+
+        def fetch(symbol, _):
+            if manifest is None:
+                return self.data_agent.fetch_symbol(symbol)
+            input_hash = self._fetch_hash(symbol)
+            if manifest.is_done("fetch", symbol, input_hash):
+                # Already stored in this run: reload from S3 instead of asking IBKR again
+                return self.data_agent.s3.read_parquet(manifest.output("fetch", symbol))
+            try:
+                return self.data_agent.fetch_symbol(symbol)
+            except Exception as e:
+                manifest.mark_failed("fetch", symbol, e, input_hash)
+                raise
+
+        def store_raw(symbol, results):
+            return self._step(manifest, "fetch", symbol, self._fetch_hash(symbol),
+                              lambda: self.data_agent.write_raw(symbol, results["fetch"]))
+
+        def features(symbol, results):
+            df_feat = add_features(results["fetch"])
+            if df_feat.empty:
+                self.logger.warning(f"No features available for {symbol}; skipping.")
+                return None
+            return df_feat
+
+        def train(symbol, results):
+            def run_train():
+                model_key = self.ml_agent.train_features(symbol, results["features"], num_threads)
+                self.predict_agent.model_cache.invalidate(model_key)
+                return model_key
+
+            return self._step(manifest, "train", symbol, hash_inputs(results["store_raw"]),
+                              run_train)
+
+        def predict(symbol, results):
+            X = results["features"].drop(columns=["target_up"])
+            return self._step(manifest, "predict", symbol,
+                              self._predict_hash(manifest, symbol, results["store_raw"]),
+                              lambda: self.predict_agent.predict_features(symbol, X))
+
+        return [
+            Stage("fetch", fetch, pool="main"),
+            Stage("store_raw", store_raw, pool="io"),
+            Stage("features", features, pool="cpu"),
+            Stage("train", train, pool="cpu"),
+            Stage("predict", predict, pool="io"),
+        ]
+
+    @staticmethod
+    def _step(manifest: Optional[RunManifest], stage: str, symbol: str, input_hash: str, fn):
+        if manifest is None:
+            return fn()
+        return manifest.checkpoint(stage, symbol, input_hash, fn)
+
+    def _phase_step(self, manifest: Optional[RunManifest], stage: str, symbol: str,
+                    input_hash: str, fn):
+        with span(f"stage.{stage}", symbol=symbol):
+            return self._step(manifest, stage, symbol, input_hash, fn)
+
+    def _fetch_hash(self, symbol: str) -> str:
+        data_cfg = self.config["data"]
+        return hash_inputs(symbol, data_cfg["bar_size"], data_cfg["lookback_days"])
+
+    @staticmethod
+    def _predict_hash(manifest: Optional[RunManifest], symbol: str, raw_key: str) -> str:
+        # Tie the prediction to the exact training it used, so a retrain re-predicts
+        train = manifest.record("train", symbol) if manifest is not None else None
+        return hash_inputs(raw_key, train["at"] if train else None)
+
+    def _log_report(self, report: PipelineReport, label: str = "Pipelined"):
+        summary = report.summary()
+        self.logger.info(
+            f"{label} run wall-clock: {summary['wall_seconds']:.2f}s vs "
+            f"{summary['serial_seconds']:.2f}s summed stage time "
+            f"({summary['overlap_speedup']:.2f}x overlap; compare with a phased run's wall-clock)"
+        )
+        self.logger.info(f"Stage totals: {summary['stage_seconds']}")
+        if summary["failed"]:
+            self.logger.warning(f"Failed symbols: {summary['failed']}")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Wall-clock of SuperAgent.run_daily per pipeline mode with simulated latency.
+
+IBKR and S3 are replaced by in-memory fakes that sleep for a fixed latency
+per request (IB requests, S3 calls), so the comparison shows how much of
+each mode's wall-clock is spent waiting on the network::
+
+    python benchmarks/bench_async_pipeline.py --symbols 200 --ib-latency-ms 250 --s3-latency-ms 30
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yaml  # noqa: E402
+
+from agents.super_agent import SuperAgent  # noqa: E402
+from tests.conftest import make_ohlc  # noqa: E402
+from utils.fake_s3 import FakeS3  # noqa: E402
+from utils.runtime import RuntimeContext  # noqa: E402
+from utils.s3_client import S3Client  # noqa: E402
+
+
+class LatencyIB:
+    """Historical-data fake: each request takes ``latency`` seconds."""
+
+    def __init__(self, latency: float, bars: int):
+        self.latency = latency
+        self.bars = bars
+
+    def get_historical_ohlc(self, symbol, bar_size, lookback_days):
+        time.sleep(self.latency)
+        return make_ohlc(self.bars, seed=sum(map(ord, symbol)))
+
+    async def get_historical_ohlc_async(self, symbol, bar_size, lookback_days):
+        await asyncio.sleep(self.latency)
+        return make_ohlc(self.bars, seed=sum(map(ord, symbol)))
+
+
+def build_config(n_symbols: int, args) -> dict:
+    return {
+        "ibkr": {"host": "127.0.0.1", "port": 7496, "client_id": 1},
+        "aws": {"region": "us-east-1", "s3_bucket": "bench-bucket"},
+        "symbols": [f"S{i:05d}" for i in range(n_symbols)],
+        "data": {"bar_size": "1 day", "lookback_days": args.bars},
+        "training": {"num_threads": 0},
+        "pipeline": {"io_workers": args.io_workers, "cpu_workers": args.cpu_workers,
+                     "ib_concurrency": args.ib_concurrency},
+        "paths": {"raw_prefix": "raw/", "feature_prefix": "features/",
+                  "model_prefix": "model/", "pred_prefix": "predictions/"},
+        "prediction": {"mode": "full", "backend": "native"},
+    }
+
+
+def run_mode(mode: str, config: dict, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "config.yaml"
+        config = dict(config, pipeline=dict(config["pipeline"], mode=mode))
+        config_path.write_text(yaml.safe_dump(config))
+        runtime = RuntimeContext.from_config(
+            str(config_path),
+            s3=S3Client("us-east-1", "bench-bucket",
+                        client=FakeS3(latency=args.s3_latency_ms / 1000.0)),
+            ib=LatencyIB(args.ib_latency_ms / 1000.0, args.bars),
+        )
+        agent = SuperAgent(str(config_path), runtime=runtime)
+
+        start = time.perf_counter()
+        results = agent.run_daily()
+        wall = time.perf_counter() - start
+    return {
+        "wall_seconds": round(wall, 3),
+        "symbols_per_second": round(len(results) / wall, 2),
+        "predicted": sum(p is not None for p in results.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--ib-latency-ms", type=float, default=250.0)
+    parser.add_argument("--s3-latency-ms", type=float, default=30.0)
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--cpu-workers", type=int, default=4)
+    parser.add_argument("--ib-concurrency", type=int, default=6)
+    parser.add_argument("--modes", nargs="+", default=["phased", "pipelined", "async"])
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    config = build_config(args.symbols, args)
+    results = {}
+    for mode in args.modes:
+        results[mode] = run_mode(mode, config, args)
+        print(f"{mode:>10}: {results[mode]['wall_seconds']:8.2f} s  "
+              f"({results[mode]['symbols_per_second']:.1f} symbols/s)")
+    if "phased" in results:
+        base = results["phased"]["wall_seconds"]
+        for mode, r in results.items():
+            r["speedup_vs_phased"] = round(base / r["wall_seconds"], 2)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"args": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""S3 read paths under simulated network conditions, per IO-worker count.
+
+Loads a synthetic universe into ``utils.fake_s3.FakeS3`` configured with
+per-request latency, bandwidth caps, throttling and list page size, then
+times the I/O-bound paths: a ``DataPanel`` preload (one LIST and one GET per
+symbol) and cold and warm ``Inventory`` scans. Everything is in-process
+and seeded, so runs are repeatable on a laptop::
+
+    python benchmarks/bench_s3_io.py --symbols 500 --latency-ms 30 --link-mbps 200 \
+        --io-workers 1 8 32
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import iter_universe, symbol_names  # noqa: E402
+from utils.data_panel import DataPanel  # noqa: E402
+from utils.fake_s3 import FakeS3  # noqa: E402
+from utils.inventory import Inventory  # noqa: E402
+from utils.s3_client import S3Client  # noqa: E402
+
+
+def make_bucket(args) -> FakeS3:
+    loader = S3Client("us-east-1", "bench-bucket", client=FakeS3())
+    for symbol, df in iter_universe(args.symbols, args.bars, seed=args.seed):
+        for snapshot in range(args.snapshots):
+            loader.write_parquet(df, f"raw/{symbol}/2025{snapshot + 1:04d}_0000.parquet")
+    # Same objects behind the simulated network; loading the bucket is not timed
+    fake = FakeS3(
+        page_size=args.page_size,
+        latency=args.latency_ms / 1000.0,
+        jitter=args.jitter_ms / 1000.0,
+        bandwidth=args.bandwidth_mbps * 125_000 or None,
+        link_bandwidth=args.link_mbps * 125_000 or None,
+        max_rps=args.max_rps,
+        throttle_rate=args.throttle_rate,
+        retries=args.retries,
+        seed=args.seed,
+    )
+    fake.objects = loader.s3.objects
+    return fake
+
+
+def timed(fake: FakeS3, fn) -> dict:
+    fake.calls.clear()
+    fake.stats.clear()
+    start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except Exception as e:  # a throttled request that exhausted its retries
+        error = f"{type(e).__name__}: {e}"
+    result = {
+        "seconds": round(time.perf_counter() - start, 3),
+        "requests": sum(fake.calls.values()),
+        "mb_out": round(fake.stats["bytes_out"] / 2**20, 2),
+        "throttled": fake.stats["throttled"],
+        "retries": fake.stats["retries"],
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--snapshots", type=int, default=3, help="Raw snapshots per symbol")
+    parser.add_argument("--io-workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0,
+                        help="Per transfer; 0 = unlimited")
+    parser.add_argument("--link-mbps", type=float, default=0,
+                        help="Shared by all transfers; 0 = unlimited")
+    parser.add_argument("--max-rps", type=float, default=None,
+                        help="Requests/s before 503 SlowDown")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retries", type=int, default=4, help="Client-side retries of SlowDown")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    fake = make_bucket(args)
+    s3 = S3Client("us-east-1", "bench-bucket", client=fake)
+    symbols = symbol_names(args.symbols)
+    results = {}
+    for workers in args.io_workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            inventory = Inventory(s3, cache_file=str(Path(tmp) / "inventory.json"),
+                                  io_workers=workers)
+            panel = DataPanel(s3, io_workers=workers)
+            runs = {
+                "panel_preload": timed(fake, lambda: panel.preload(symbols)),
+                "inventory_cold": timed(fake, lambda: inventory.scan(["raw"])),
+                "inventory_warm": timed(fake, lambda: inventory.scan(["raw"])),
+            }
+        results[workers] = runs
+        for name, r in runs.items():
+            failed = f"  FAILED ({r['error']})" if "error" in r else ""
+            print(f"io_workers={workers:>3}  {name:<15} {r['seconds']:8.3f} s  "
+                  f"{r['requests']:>6} requests  {r['mb_out']:8.2f} MB  "
+                  f"{r['throttled']} throttled{failed}")
+
+    report = {"args": vars(args), "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
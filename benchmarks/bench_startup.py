@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Startup cost of building every agent and analytics utility.
+
+Compares one shared RuntimeContext (the default) against a context per
+component, which reproduces the old behaviour of each component parsing
+config.yaml and building its own boto3 clients::
+
+    python benchmarks/bench_startup.py --config config.yaml --repeats 5
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import botocore.session  # noqa: E402
+
+from agents.super_agent import SuperAgent  # noqa: E402
+from utils.analytics_reporter import AnalyticsReporter  # noqa: E402
+from utils.redshift_client import RedshiftClient  # noqa: E402
+from utils.runtime import RuntimeContext  # noqa: E402
+from utils.trading_dashboard import TradingDashboard  # noqa: E402
+
+_created = {"clients": 0}
+_create_client = botocore.session.Session.create_client
+
+
+def _counting_create_client(self, *args, **kwargs):
+    _created["clients"] += 1
+    return _create_client(self, *args, **kwargs)
+
+
+botocore.session.Session.create_client = _counting_create_client
+
+
+def build_all(config_path: str, shared: bool, log_dir: str) -> dict:
+    def runtime():
+        return shared_runtime if shared else RuntimeContext.from_config(config_path)
+
+    _created["clients"] = 0
+    start = time.perf_counter()
+    shared_runtime = RuntimeContext.from_config(config_path)
+    agent = SuperAgent(config_path, runtime=runtime())
+    if not shared:
+        # The old SuperAgent built each sub-agent from its own config parse
+        for name in ("data_agent", "ml_agent", "predict_agent"):
+            sub = getattr(agent, name)
+            setattr(agent, name, type(sub)(config_path, runtime=runtime()))
+    AnalyticsReporter(config_path, log_dir=log_dir, runtime=runtime())
+    TradingDashboard(config_path, runtime=runtime())
+    RedshiftClient(config_path, runtime=runtime())
+    return {"seconds": time.perf_counter() - start, "boto3_clients": _created["clients"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--log-dir", default="logs")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = {}
+    for label, shared in (("per_component", False), ("shared_runtime", True)):
+        runs = [build_all(args.config, shared, args.log_dir) for _ in range(args.repeats)]
+        results[label] = {
+            "seconds_min": min(r["seconds"] for r in runs),
+            "seconds_median": sorted(r["seconds"] for r in runs)[len(runs) // 2],
+            "boto3_clients": runs[-1]["boto3_clients"],
+        }
+
+    for label, r in results.items():
+        print(f"{label:>15}: {r['seconds_median'] * 1000:8.1f} ms median, "
+              f"{r['boto3_clients']} boto3 clients")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Small-batch latency: lgb.Booster.predict vs the compiled NumPy evaluator.
+
+    python benchmarks/bench_tree_evaluator.py --trees 200 --leaves 32 --output results.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.tree_evaluator import CompiledEnsemble  # noqa: E402
+
+FEATURES = ["open", "high", "low", "close", "volume", "return_1", "return_5", "vol_20"]
+
+
+def _time_per_call(fn, repeats: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--leaves", type=int, default=32)
+    parser.add_argument("--batch-sizes", default="1,4,16,64,256,1024")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", help="Write JSON results here as well")
+    args = parser.parse_args()
+
+    import lightgbm as lgb
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(5_000, len(FEATURES))), columns=FEATURES)
+    X.iloc[::50, 6] = np.nan
+    y = (X["return_1"] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    params = {"objective": "binary", "num_leaves": args.leaves, "learning_rate": 0.02,
+              "feature_fraction": 0.8, "verbose": -1}
+    booster = lgb.train(params, lgb.Dataset(X, label=y), num_boost_round=args.trees)
+
+    start = time.perf_counter()
+    compiled = CompiledEnsemble.from_booster(booster)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    # Correctness is checked on inputs with NaNs and exact zeros; timing uses
+    # NaN-free rows, which is what add_features() produces after dropna().
+    n_max = max(map(int, args.batch_sizes.split(",")))
+    test = pd.DataFrame(rng.normal(size=(n_max, len(FEATURES))), columns=FEATURES)
+    dirty = test.copy()
+    dirty.iloc[::7, 6] = np.nan
+    dirty.iloc[::5, 2] = 0.0
+    native = np.concatenate([booster.predict(test), booster.predict(dirty)])
+    ours = np.concatenate([compiled.predict(test), compiled.predict(dirty)])
+
+    results = {
+        "trees": compiled.num_trees(),
+        "max_depth": len(compiled.level_widths),
+        "compile_ms": compile_ms,
+        "max_abs_diff": float(np.abs(native - ours).max()),
+        "identical_fraction": float((native == ours).mean()),
+        "batches": [],
+    }
+
+    def micros(fn):
+        return _time_per_call(fn, args.repeats) * 1e6
+
+    for n in map(int, args.batch_sizes.split(",")):
+        frame, matrix = test.iloc[:n], test.iloc[:n].to_numpy()
+        row = {
+            "batch_size": n,
+            "native_dataframe_us": micros(lambda: booster.predict(frame)),
+            "native_ndarray_us": micros(lambda: booster.predict(matrix)),
+            "numpy_us": micros(lambda: compiled.predict(matrix)),
+        }
+        row["speedup_vs_dataframe"] = row["native_dataframe_us"] / row["numpy_us"]
+        results["batches"].append(row)
+
+    print(f"{'batch':>6} {'native df (us)':>15} {'native nd (us)':>15} "
+          f"{'numpy (us)':>11} {'speedup':>8}")
+    for row in results["batches"]:
+        print(f"{row['batch_size']:>6} {row['native_dataframe_us']:>15.1f} "
+              f"{row['native_ndarray_us']:>15.1f} {row['numpy_us']:>11.1f} "
+              f"{row['speedup_vs_dataframe']:>7.2f}x")
+    print(f"max |diff| = {results['max_abs_diff']:.3g}, "
+          f"identical = {results['identical_fraction']:.1%}, compile = {compile_ms:.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Per-symbol pandas analytics vs. the vectorized time × symbol engine.
+
+Builds a synthetic universe of ragged OHLCV histories in memory and times
+the report's per-symbol statistics both ways::
+
+    python benchmarks/bench_vector_analytics.py --symbols 1000 5000 --bars 252
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.data_panel import DataPanel  # noqa: E402
+from utils.vector_analytics import panel_stats  # noqa: E402
+
+
+def make_universe(n_symbols: int, n_bars: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n_bars, freq="B", name="time")
+    frames = {}
+    for i in range(n_symbols):
+        # Ragged: some symbols listed later than others
+        start = int(rng.integers(0, n_bars // 5))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars - start)))
+        spread = np.abs(rng.normal(0, 0.01, len(close))) * close
+        frames[f"S{i:05d}"] = pd.DataFrame({
+            "open": close, "high": close + spread, "low": close - spread, "close": close,
+            "volume": rng.integers(1_000, 1_000_000, len(close)).astype(float),
+        }, index=index[start:])
+    return frames
+
+
+def per_symbol(panel: DataPanel, symbols) -> dict:
+    """The previous approach: a separate pandas pass and float() boxing per symbol."""
+    out = {}
+    for symbol in symbols:
+        df = panel.get(symbol)
+        returns = df["close"].pct_change()
+        price_range = df["high"] - df["low"]
+        close = df["close"]
+        out[symbol] = {
+            "current_price": float(close.iloc[-1]),
+            "price_min": float(close.min()),
+            "price_max": float(close.max()),
+            "price_avg": float(close.mean()),
+            "total_return": float((close.iloc[-1] / close.iloc[0] - 1) * 100),
+            "daily_return_avg": float(returns.mean() * 100),
+            "daily_return_std": float(returns.std() * 100),
+            "max_daily_gain": float(returns.max() * 100),
+            "max_daily_loss": float(returns.min() * 100),
+            "avg_price_range": float(price_range.mean()),
+            "max_intraday_range": float(price_range.max()),
+            "avg_volume": float(df["volume"].mean()),
+            "total_volume": float(df["volume"].sum()),
+            "updays": int((returns > 0).sum()),
+            "downdays": int((returns < 0).sum()),
+            "win_rate": float((returns > 0).sum() / len(returns) * 100),
+            "annualized_volatility": float(returns.std() * 252 ** 0.5 * 100),
+            "sharpe_ratio": float(returns.mean() / returns.std() * 252 ** 0.5),
+            "max_drawdown": float((close / close.cummax() - 1).min() * 100),
+        }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.symbols:
+        frames = make_universe(n, args.bars)
+        symbols = list(frames)
+
+        start = time.perf_counter()
+        legacy = per_symbol(DataPanel.from_frames(frames), symbols)
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = panel_stats(DataPanel.from_frames(frames), symbols)
+        records = stats.to_dict(orient="index")
+        vector_s = time.perf_counter() - start
+
+        worst = max(abs(records[s]["sharpe_ratio"] - legacy[s]["sharpe_ratio"]) for s in symbols)
+        row = {"symbols": n, "bars": args.bars, "per_symbol_s": round(legacy_s, 4),
+               "vectorized_s": round(vector_s, 4), "speedup": round(legacy_s / vector_s, 1),
+               "max_sharpe_abs_diff": worst}
+        results.append(row)
+        print(f"{n:>6} symbols: per-symbol {legacy_s:7.3f}s  vectorized {vector_s:7.3f}s  "
+              f"({row['speedup']}x)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
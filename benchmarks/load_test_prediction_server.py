@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Load test for the local prediction server.
+
+By default an in-process server is started with synthetic LightGBM models so
+the test runs fully offline::
+
+    python benchmarks/load_test_prediction_server.py --symbols 500 --clients 64 --seconds 10
+
+Each synthetic symbol gets its own model, as in production. The service
+batches requests per model, so ``--models N`` (fewer models than symbols,
+shared round-robin) shows how much batching a shared model would add. The
+result reports the model count next to the throughput.
+
+Point it at a running ``python -m utils.prediction_server`` instead with
+``--url http://127.0.0.1:8765`` (symbols are then taken from ``--symbol-list``).
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.prediction_server import PredictionService, make_server  # noqa: E402
+
+FEATURES = ["open", "high", "low", "close", "volume", "return_1", "return_5", "vol_20"]
+
+
+def synthetic_service(n_symbols: int, max_batch: int, max_wait_ms: float,
+                      n_models: Optional[int] = None) -> PredictionService:
+    """Service over ``n_symbols`` synthetic tickers and ``n_models`` boosters (default one each)."""
+    import lightgbm as lgb
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2_000, len(FEATURES))), columns=FEATURES)
+    y = (X["return_1"] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    booster = lgb.train({"objective": "binary", "num_leaves": 32, "verbose": -1},
+                        lgb.Dataset(X, label=y), num_boost_round=200)
+
+    symbols = [f"SYM{i:05d}" for i in range(n_symbols)]
+    n_models = min(n_models or n_symbols, n_symbols)
+    # Separate Booster objects (same trees): the service groups a batch by model object
+    model_str = booster.model_to_string()
+    boosters = [booster] + [lgb.Booster(model_str=model_str) for _ in range(n_models - 1)]
+    models = {symbol: boosters[i % n_models] for i, symbol in enumerate(symbols)}
+    service = PredictionService(models.__getitem__, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    for symbol in symbols:
+        service.register_features(symbol, rng.normal(size=len(FEATURES)), as_of="synthetic")
+    return service
+
+
+def _client_loop(host, port, symbols, deadline, latencies, errors, seed, per_request):
+    rng = np.random.default_rng(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    local = []
+    while time.perf_counter() < deadline:
+        picks = rng.choice(symbols, size=per_request)
+        query = "&".join(f"symbol={s}" for s in picks)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", f"/predict?{query}")
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        local.append(time.perf_counter() - start)
+    conn.close()
+    latencies.extend(local)
+
+
+def run_load(host: str, port: int, symbols, clients: int, seconds: float,
+             per_request: int) -> dict:
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_client_loop,
+                         args=(host, port, symbols, deadline, latencies, errors, i, per_request))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1000
+    return {
+        "clients": clients,
+        "symbols_per_request": per_request,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "predictions_per_second": len(latencies) * per_request / elapsed,
+        "client_p50_ms": float(np.percentile(lat, 50)) if lat.size else None,
+        "client_p99_ms": float(np.percentile(lat, 99)) if lat.size else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Existing server to target (default: start one in-process)")
+    parser.add_argument("--symbol-list", default="AAPL,MSFT,TSLA")
+    parser.add_argument("--symbols", type=int, default=500, help="Synthetic symbols to serve")
+    parser.add_argument("--models", type=int, default=0,
+                        help="Distinct synthetic models, shared round-robin; 0 = one per symbol")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--per-request", type=int, default=1, help="Symbols per HTTP request")
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=1.0)
+    parser.add_argument("--output", help="Write the JSON result here as well")
+    args = parser.parse_args()
+
+    server = service = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port
+        symbols = args.symbol_list.split(",")
+    else:
+        service = synthetic_service(args.symbols, args.max_batch, args.max_wait_ms, args.models)
+        service.start()
+        server = make_server(service, port=0)
+        host, port = server.server_address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        symbols = list(service.latest)
+
+    result = run_load(host, port, symbols, args.clients, args.seconds, args.per_request)
+    if service is not None:
+        result["models"] = min(args.models or args.symbols, args.symbols)
+
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/metrics")
+    result["server"] = json.loads(conn.getresponse().read())
+    conn.close()
+
+    if server is not None:
+        server.shutdown()
+        service.stop()
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
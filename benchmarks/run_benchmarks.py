@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Time and memory-profile every pipeline stage on synthetic universes.
+
+Runs fully offline: bars come from ``benchmarks.synthetic`` and S3 is the
+in-memory ``utils.fake_s3.FakeS3``. For each universe size every stage is
+timed once, then (unless ``--no-memory``) run again under ``tracemalloc``
+for its peak Python/numpy allocation; LightGBM's native memory shows only
+in ``max_rss_mb``, the process high-water mark after the stage::
+
+    python benchmarks/run_benchmarks.py --symbols 10 100 1000 10000 --output bench_results.json
+
+Per-symbol stages (features, train, predict) cost the same per symbol at
+any universe size, so they run on ``--sample`` symbols and report a
+projection for the whole universe. Stages whose cost is quadratic in the
+universe are skipped above ``STAGE_LIMITS`` unless ``--no-limits``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lightgbm  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.synthetic import BAR_SIZES, iter_universe, symbol_names  # noqa: E402
+from utils.fake_s3 import FakeS3  # noqa: E402
+from utils.runtime import RuntimeContext  # noqa: E402
+from utils.s3_client import S3Client  # noqa: E402
+
+SAMPLED = {"features", "train", "predict"}
+# Stage -> largest universe it runs on by default (the correlation heatmap is N × N)
+STAGE_LIMITS = {"dashboard": 1000}
+STAGES = ["s3_write", "s3_read", "features", "train", "predict",
+          "analytics.symbol_stats", "analytics.compare_symbols", "analytics.volatility_comparison",
+          "analytics.performance_summary", "analytics.correlation_analysis",
+          "analytics.update_history", "dashboard"]
+
+
+def build_config(n_symbols: int, args, workdir: Path) -> dict:
+    return {
+        "aws": {"region": "us-east-1", "s3_bucket": "bench-bucket"},
+        "symbols": symbol_names(n_symbols),
+        "data": {"bar_size": args.bar_size, "lookback_days": args.bars},
+        "training": {"num_threads": args.threads},
+        "pipeline": {"io_workers": args.io_workers},
+        "paths": {"raw_prefix": "raw/", "feature_prefix": "features/",
+                  "model_prefix": "model/", "pred_prefix": "predictions/"},
+        "prediction": {"mode": "full", "backend": "native"},
+        "dashboard": {"output_dir": str(workdir / "viz"), "workers": args.dashboard_workers},
+        "analytics": {"state_prefix": "analytics/state/"},
+    }
+
+
+class Bench:
+    """One synthetic universe loaded into a fake bucket, and the stages over it."""
+
+    def __init__(self, n_symbols: int, args, workdir: Path):
+        self.args = args
+        self.symbols = symbol_names(n_symbols)
+        self.sample = self.symbols[:args.sample]
+        self.runtime = RuntimeContext(
+            build_config(n_symbols, args, workdir),
+            s3=S3Client("us-east-1", "bench-bucket", client=FakeS3()),
+        )
+        self.s3 = self.runtime.s3
+        self._frames = {}
+        self._trained = False
+        self._analytics = None
+
+    def frames(self):
+        if not self._frames:
+            self._frames = dict(iter_universe(len(self.symbols), self.args.bars, self.args.bar_size,
+                                              self.args.gap_rate, self.args.ragged, self.args.seed))
+        return self._frames
+
+    def run(self, stage: str) -> int:
+        """Run ``stage`` once; returns the number of symbols it processed."""
+        if stage == "s3_write":
+            for symbol, df in self.frames().items():
+                self.s3.write_parquet(df, f"raw/{symbol}/20250101_0000.parquet")
+            return len(self.symbols)
+        if stage == "s3_read":
+            for symbol in self.symbols:
+                self.s3.read_parquet(f"raw/{symbol}/20250101_0000.parquet")
+            return len(self.symbols)
+        if stage == "features":
+            from utils.features import add_features
+
+            for symbol in self.sample:
+                add_features(self.frames()[symbol])
+            return len(self.sample)
+        if stage == "train":
+            from agents.ml_agent import MLAgent
+
+            agent = MLAgent(runtime=self.runtime)
+            for symbol in self.sample:
+                agent.train_symbol(symbol)
+            self._trained = True
+            return len(self.sample)
+        if stage == "predict":
+            from agents.predict_agent import PredictAgent
+
+            if not self._trained:
+                self.run("train")
+            agent = PredictAgent(runtime=self.runtime)
+            for symbol in self.sample:
+                agent.predict_symbol(symbol)
+            return len(self.sample)
+        if stage.startswith("analytics."):
+            getattr(self._analytics, stage.split(".", 1)[1])(self.symbols)
+            return len(self.symbols)
+        if stage == "dashboard":
+            from utils.trading_dashboard import TradingDashboard
+
+            TradingDashboard(runtime=self.runtime).generate_all_visualizations(force=True)
+            return len(self.symbols)
+        raise ValueError(f"Unknown stage: {stage}")
+
+    def prepare(self, stage: str):
+        """Untimed setup: raw data in the bucket, and a loaded panel for analytics stages."""
+        if stage != "s3_write" and not self.s3.s3.objects:
+            self.run("s3_write")
+        if stage.startswith("analytics."):
+            # Each method gets a fresh, preloaded panel, so none reuses another's cached stats
+            from utils.redshift_analytics import RedshiftAnalytics
+
+            self._analytics = RedshiftAnalytics(runtime=self.runtime)
+            self._analytics.panel.preload(self.symbols)
+
+
+def quiet():
+    """Silence the per-chart progress lines stages print."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(bench: Bench, stage: str, memory: bool) -> dict:
+    bench.prepare(stage)
+    start = time.perf_counter()
+    with quiet():
+        items = bench.run(stage)
+    seconds = time.perf_counter() - start
+    result = {"seconds": round(seconds, 4), "items": items,
+              "per_symbol_ms": round(seconds / max(items, 1) * 1000, 3)}
+    if stage in SAMPLED:
+        result["sampled"] = True
+        result["projected_seconds"] = round(seconds / max(items, 1) * len(bench.symbols), 2)
+    if memory:
+        bench.prepare(stage)
+        tracemalloc.start()
+        try:
+            with quiet():
+                bench.run(stage)
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    result["max_rss_mb"] = max_rss_mb()
+    return result
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "lightgbm": lightgbm.__version__,
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--bar-size", default="1 day", choices=list(BAR_SIZES))
+    parser.add_argument("--gap-rate", type=float, default=0.01, help="Probability a bar is missing")
+    parser.add_argument("--ragged", type=float, default=0.2, help="Largest late-listing fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample", type=int, default=20, help="Symbols timed in per-symbol stages")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--threads", type=int, default=0, help="LightGBM threads; 0 = every core")
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--dashboard-workers", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--no-limits", action="store_true", help="Ignore STAGE_LIMITS")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    logging.disable(logging.INFO)  # agents log a line per symbol
+    try:
+        for n_symbols in args.symbols:
+            with tempfile.TemporaryDirectory() as tmp:
+                bench = Bench(n_symbols, args, Path(tmp))
+                for stage in args.stages:
+                    row = {"symbols": n_symbols, "stage": stage}
+                    limit = STAGE_LIMITS.get(stage)
+                    if limit and n_symbols > limit and not args.no_limits:
+                        row["skipped"] = f"more than {limit} symbols"
+                    else:
+                        row.update(measure(bench, stage, memory=not args.no_memory))
+                    results.append(row)
+                    print(_format(row), flush=True)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    report = {"environment": environment(), "args": vars(args), "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return report
+
+
+def _format(row: dict) -> str:
+    head = f"{row['symbols']:>6} symbols  {row['stage']:<34}"
+    if "skipped" in row:
+        return f"{head} skipped ({row['skipped']})"
+    line = f"{head} {row['seconds']:9.3f} s  {row['per_symbol_ms']:9.3f} ms/symbol"
+    if row.get("sampled"):
+        line += f"  (projected {row['projected_seconds']:.1f} s)"
+    if "peak_mb" in row:
+        line += f"  peak {row['peak_mb']:.1f} MB"
+    return line + f"  rss {row['max_rss_mb']:.0f} MB"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Unified command line for Super Agent Trader.
+
+Usage:
+    python cli.py fetch|train|predict [--symbols AAPL MSFT]
+    python cli.py run [--run-id ID | --resume]  # full daily pipeline (run_daily_pipeline.py)
+    python cli.py report
+    python cli.py dashboard
+    python cli.py inventory [--read SYMBOL] [--keys] [--refresh]
+    python cli.py sql "SELECT symbol, count(*) FROM raw GROUP BY symbol"
+    python cli.py serve [--host H] [--port 8765] [--max-batch N] [--max-wait-ms MS]
+    python cli.py enqueue --run-id ID      # sharded run: queue the configured symbols
+    python cli.py worker --run-id ID [--client-id N]   # on each host
+    python cli.py queue-status --run-id ID
+    python cli.py profile-imports [--budget-ms 150]
+    python cli.py perf-check [--run-id ID]  # flag regressions against recent runs
+
+Only the standard library is imported at startup. Each command imports the
+modules it needs inside its handler, so ``inventory`` never loads LightGBM
+and ``fetch`` never loads plotly. ``profile-imports`` measures this with
+``python -X importtime`` and fails when startup exceeds a budget.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Modules each command's handler imports; profiled by ``profile-imports``
+COMMAND_MODULES = {
+    "fetch": ["agents.data_agent"],
+    "train": ["agents.ml_agent"],
+    "predict": ["agents.predict_agent"],
+    "run": ["run_daily_pipeline"],
+    "report": ["utils.analytics_reporter"],
+    "dashboard": ["utils.trading_dashboard"],
+    "inventory": ["query_s3", "utils.s3_client", "utils.inventory"],
+    "sql": ["query_s3", "utils.redshift_client", "utils.duckdb_engine"],
+    "serve": ["utils.prediction_server", "agents.predict_agent"],
+    "enqueue": ["agents.super_agent"],
+    "worker": ["agents.super_agent"],
+    "queue-status": ["utils.work_queue"],
+    "perf-check": ["utils.perf_history"],
+}
+
+
+def _runtime(args):
+    from utils.runtime import get_runtime
+
+    runtime = get_runtime(args.config)
+    if getattr(args, "symbols", None):
+        runtime.config["symbols"] = [s.upper() for s in args.symbols]
+    return runtime
+
+
+def cmd_fetch(args):
+    from agents.data_agent import DataAgent
+
+    DataAgent(args.config, runtime=_runtime(args)).run()
+
+
+def cmd_train(args):
+    from agents.ml_agent import MLAgent
+
+    MLAgent(args.config, runtime=_runtime(args)).run()
+
+
+def cmd_predict(args):
+    from agents.predict_agent import PredictAgent
+
+    results = PredictAgent(args.config, runtime=_runtime(args)).run()
+    print(json.dumps(results, indent=2))
+
+
+def cmd_run(args):
+    _runtime(args)
+    import run_daily_pipeline
+    from utils.run_manifest import RunManifest
+
+    run_id = args.run_id or (RunManifest.latest_run_id() if args.resume else None)
+    return run_daily_pipeline.main(args.config, run_id)
+
+
+def cmd_report(args):
+    from utils.analytics_reporter import AnalyticsReporter
+
+    reporter = AnalyticsReporter(args.config, log_dir=args.log_dir, runtime=_runtime(args))
+    report = reporter.generate_full_report()
+    for fmt, path in reporter.save_report(report).items():
+        print(f"  {fmt}: {path}")
+
+
+def cmd_dashboard(args):
+    from utils.trading_dashboard import TradingDashboard
+
+    dashboard = TradingDashboard(args.config, runtime=_runtime(args))
+    results = dashboard.generate_all_visualizations(force=args.force)
+    for name, path in results["files"].items():
+        print(f"  {name}: {path}")
+
+
+def cmd_inventory(args):
+    _runtime(args)
+    import query_s3
+
+    if args.read:
+        query_s3.read_latest_data(args.read.upper(), args.config)
+    else:
+        query_s3.show_s3_contents(args.config, keys=args.keys, refresh=args.refresh)
+        query_s3.show_redshift_stats(args.config)
+
+
+def cmd_sql(args):
+    _runtime(args)
+    import query_s3
+
+    if args.sync_only:
+        from utils.redshift_client import RedshiftClient
+
+        print(json.dumps(RedshiftClient(args.config).engine.sync(), indent=2))
+        return
+    query_s3.run_sql(args.query, args.config, limit=args.limit)
+
+
+SERVE_OPTIONS = ["host", "port", "max_batch", "max_wait_ms", "refresh_seconds"]
+
+
+def serve_argv(args) -> list:
+    """``prediction_server`` arguments for the ``serve`` options given; others keep its defaults."""
+    argv = ["--config", args.config]
+    for name in SERVE_OPTIONS:
+        value = getattr(args, name)
+        if value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+def cmd_serve(args):
+    from utils.prediction_server import main as serve_main
+
+    serve_main(serve_argv(args))
+
+
+def cmd_enqueue(args):
+    from agents.super_agent import SuperAgent
+
+    SuperAgent(args.config, runtime=_runtime(args)).enqueue_run(args.run_id)
+
+
+def cmd_worker(args):
+    from agents.super_agent import SuperAgent
+    from utils.run_manifest import RunManifest
+
+    runtime = _runtime(args)
+    if args.client_id is not None:
+        # Every worker needs its own IB API client id
+        runtime.config["ibkr"]["client_id"] = args.client_id
+    agent = SuperAgent(args.config, runtime=runtime)
+    agent.run_worker(args.run_id, worker_id=args.worker_id, manifest=RunManifest(args.run_id))
+
+
+def cmd_queue_status(args):
+    from utils.runtime import load_config
+    from utils.work_queue import open_queue
+
+    queue = open_queue(load_config(args.config))
+    print(json.dumps(queue.status(args.run_id), indent=2))
+
+
+def cmd_perf_check(args):
+    from utils.perf_history import PerfHistory
+    from utils.runtime import load_config
+
+    perf_cfg = load_config(args.config).get("perf_history", {})
+    history = PerfHistory(perf_cfg.get("path", "logs/perf_history"))
+    regressions = history.detect_regressions(
+        args.run_id,
+        window=args.window or perf_cfg.get("window", 14),
+        min_runs=perf_cfg.get("min_runs", 5),
+        threshold=args.threshold or perf_cfg.get("threshold", 3.5),
+        min_change=perf_cfg.get("min_change", 0.10),
+        min_seconds=perf_cfg.get("min_seconds", 0.05),
+    )
+    if not regressions:
+        print("No regressions against the rolling baseline")
+        return 0
+    for r in regressions:
+        print(f"{r['metric']:<40} {r['value']:>12.4g} vs {r['baseline_median']:>12.4g} "
+              f"({r['change_pct']:+.1f}%, z={r['z']})")
+    return 1
+
+
+def profile_imports(modules, python: str = sys.executable) -> dict:
+    """Import ``cli`` plus ``modules`` in a fresh interpreter under ``-X importtime``.
+
+    Returns the total cumulative import time and the slowest top-level imports.
+    """
+    code = "import cli" + "".join(f"; import {m}" for m in modules)
+    proc = subprocess.run([python, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    top_level = {}
+    pattern = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+    for line in proc.stderr.splitlines():
+        match = pattern.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level[match.group(4)] = int(match.group(2)) / 1000.0
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "modules": modules,
+        "total_ms": round(sum(top_level.values()), 1),
+        "slowest": [{"module": m, "cumulative_ms": round(ms, 1)} for m, ms in slowest[:10]],
+    }
+
+
+def cmd_profile_imports(args):
+    commands = args.commands or ["cli"] + sorted(COMMAND_MODULES)
+    report = {}
+    for command in commands:
+        report[command] = profile_imports(COMMAND_MODULES.get(command, []))
+        print(f"{command:>10}: {report[command]['total_ms']:8.1f} ms")
+        for item in report[command]["slowest"][:args.top]:
+            print(f"{'':>12}{item['module']:<40} {item['cumulative_ms']:8.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.budget_ms is not None and "cli" in report:
+        startup = report["cli"]["total_ms"]
+        if startup > args.budget_ms:
+            print(f"CLI startup {startup:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+            return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Super Agent Trader")
+    parser.add_argument("--config", default="config.yaml")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, fn, help_text in [
+        ("fetch", cmd_fetch, "Fetch OHLC from IBKR into S3"),
+        ("train", cmd_train, "Train models on the latest raw data"),
+        ("predict", cmd_predict, "Score the latest bars"),
+        ("run", cmd_run, "Run the full daily pipeline and analytics report"),
+    ]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--symbols", nargs="+", help="Override the configured symbols")
+        p.set_defaults(func=fn)
+        if name == "run":
+            p.add_argument("--run-id", help="Resume (or start) the run with this id")
+            p.add_argument("--resume", action="store_true", help="Resume the most recent run")
+
+    p = sub.add_parser("report", help="Generate the analytics report")
+    p.add_argument("--symbols", nargs="+")
+    p.add_argument("--log-dir", default="logs")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("dashboard", help="Generate the Plotly dashboard")
+    p.add_argument("--symbols", nargs="+")
+    p.add_argument("--force", action="store_true", help="Regenerate every chart, even if unchanged")
+    p.set_defaults(func=cmd_dashboard)
+
+    p = sub.add_parser("inventory", help="Show what is stored in S3")
+    p.add_argument("--read", metavar="SYMBOL", help="Print the latest raw data for SYMBOL")
+    p.add_argument("--keys", action="store_true", help="Also print every key")
+    p.add_argument("--refresh", action="store_true",
+                   help="Relist every prefix instead of using the cache")
+    p.set_defaults(func=cmd_inventory)
+
+    p = sub.add_parser("sql", help="Run SQL over the local parquet lake (DuckDB)")
+    p.add_argument("query", nargs="?", default="SHOW TABLES")
+    p.add_argument("--limit", type=int, default=50, help="Rows to print")
+    p.add_argument("--sync-only", action="store_true", help="Only refresh the local cache")
+    p.set_defaults(func=cmd_sql)
+
+    p = sub.add_parser("serve", help="Run the local prediction server")
+    p.add_argument("--host", help="Default 127.0.0.1")
+    p.add_argument("--port", type=int, help="Default 8765")
+    p.add_argument("--max-batch", type=int, help="Requests per predict batch (default 512)")
+    p.add_argument("--max-wait-ms", type=float, help="Batching window (default 1.0)")
+    p.add_argument("--refresh-seconds", type=float, help="Feature reload interval (default 300)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("enqueue", help="Queue the configured symbols for a sharded run")
+    p.add_argument("--run-id", required=True)
+    p.add_argument("--symbols", nargs="+")
+    p.set_defaults(func=cmd_enqueue)
+
+    p = sub.add_parser("worker", help="Process queued symbols until the run is drained")
+    p.add_argument("--run-id", required=True)
+    p.add_argument("--worker-id", help="Defaults to <hostname>-<pid>")
+    p.add_argument("--client-id", type=int, help="IB API client id for this worker")
+    p.set_defaults(func=cmd_worker)
+
+    p = sub.add_parser("queue-status", help="Show item counts for a sharded run")
+    p.add_argument("--run-id", required=True)
+    p.set_defaults(func=cmd_queue_status)
+
+    p = sub.add_parser("perf-check", help="Flag performance regressions in the run history")
+    p.add_argument("--run-id", help="Run to check (default: latest)")
+    p.add_argument("--window", type=int, help="Baseline runs (default: perf_history.window)")
+    p.add_argument("--threshold", type=float, help="Robust z-score threshold")
+    p.set_defaults(func=cmd_perf_check)
+
+    p = sub.add_parser("profile-imports", help="Report import time per command")
+    p.add_argument("commands", nargs="*", help="Commands to profile (default: all)")
+    p.add_argument("--top", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, help="Fail if bare CLI startup exceeds this")
+    p.add_argument("--output", help="Write the JSON report here")
+    p.set_defaults(func=cmd_profile_imports)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,13 +22,76 @@ config = {
     'training': {
         'retrain_days': 1,
         'model_type': 'lightgbm',
-        'target': 'direction'
+        'target': 'direction',
+        'num_threads': 0
+    },
+    'pipeline': {
+        'mode': 'phased',
+        'io_workers': 8,
+        'cpu_workers': 4,
+        'ib_concurrency': 6
+    },
+    'tracing': {
+        'enabled': True,
+        'output_dir': 'logs/traces',
+        'prometheus_file': 'trader.prom'
+    },
+    'perf_history': {
+        'path': 'logs/perf_history',
+        'window': 14,
+        'min_runs': 5,
+        'threshold': 3.5,
+        'min_change': 0.10,
+        'min_seconds': 0.05
+    },
+    'queue': {
+        'backend': 'sqlite',
+        'path': 'logs/work_queue.sqlite',
+        'lease_seconds': 300,
+        'max_attempts': 3
+    },
+    'analytics': {
+        'history': True,
+        'state_prefix': 'analytics/state/',
+        'report_formats': ['json', 'parquet', 'csv'],
+        'correlation': {
+            'top_k': 5,
+            'window': None,
+            'block_size': 512,
+            'min_periods': 10,
+            'save_matrix': True,
+            'matrix_dtype': 'float16'
+        }
+    },
+    'dashboard': {
+        'output_dir': 'visualizations',
+        'days': 30,
+        'workers': 0,
+        'plotlyjs': 'shared',
+        'max_points': 2000,
+        'layout': 'pages'
+    },
+    'duckdb': {
+        'cache_dir': 'data/lake',
+        'threads': 0,
+        'memory_limit': '',
+        'auto_sync': True
+    },
+    'inventory': {
+        'cache_file': 'data/inventory.json',
+        'full_refresh_hours': 24
     },
     'paths': {
         'raw_prefix': 'raw/',
         'feature_prefix': 'features/',
         'model_prefix': 'model/',
         'pred_prefix': 'predictions/'
+    },
+    'prediction': {
+        'mode': 'full',
+        'backend': 'native',
+        'model_cache_mb': 256,
+        'model_revalidate_seconds': 60
     }
 }
 
@@ -1,117 +1,129 @@
 #!/usr/bin/env python3
 """Simple script to query and display S3 data."""
 import sys
-from utils.s3_client import S3Client
-from utils.redshift_client import RedshiftClient
-import yaml
-
-
-def show_s3_contents():
-    """Display what's in your S3 bucket."""
-    
-    # Load config
-    with open("config.yaml") as f:
-        config = yaml.safe_load(f)
-    
-    aws_cfg = config["aws"]
-    s3_client = S3Client(region=aws_cfg["region"], bucket=aws_cfg["s3_bucket"])
-    
+from utils.runtime import get_runtime
+
+
+def _size(n_bytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n_bytes < 1024 or unit == "GB":
+            return f"{n_bytes:.0f} {unit}" if unit == "B" else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+
+
+def show_s3_contents(config_path: str = "config.yaml", keys: bool = False, refresh: bool = False):
+    """Display what's in your S3 bucket: per-symbol counts, sizes and latest keys.
+
+    Summaries come from the incremental ``Inventory``; ``keys`` also streams
+    every key, ``refresh`` forces a full relisting.
+    """
+    from utils.inventory import Inventory
+
+    inventory = Inventory.from_runtime(get_runtime(config_path))
+    summary = inventory.scan(refresh=refresh)
+
     print("=" * 80)
     print("S3 BUCKET CONTENTS")
     print("=" * 80)
-    
-    # Show raw data
-    print("\n📊 RAW DATA (OHLC from IBKR):")
-    print("-" * 80)
-    raw_keys = s3_client.list_keys("raw/")
-    for key in raw_keys:
-        print(f"  ✓ {key}")
-    
-    # Show models
-    print("\n🤖 TRAINED MODELS:")
-    print("-" * 80)
-    model_keys = s3_client.list_keys("model/")
-    for key in model_keys:
-        print(f"  ✓ {key}")
-    
-    # Show predictions
-    print("\n🎯 PREDICTIONS:")
-    print("-" * 80)
-    pred_keys = s3_client.list_keys("predictions/")
-    for key in pred_keys:
-        print(f"  ✓ {key}")
-    
-    # Show features
-    print("\n🔧 FEATURES:")
-    print("-" * 80)
-    feat_keys = s3_client.list_keys("features/")
-    if feat_keys:
-        for key in feat_keys:
-            print(f"  ✓ {key}")
-    else:
-        print("  (no feature files yet)")
-    
+
+    sections = [
+        ("raw", "\n📊 RAW DATA (OHLC from IBKR):"),
+        ("models", "\n🤖 TRAINED MODELS:"),
+        ("predictions", "\n🎯 PREDICTIONS:"),
+        ("features", "\n🔧 FEATURES:"),
+    ]
+    for dataset, title in sections:
+        print(title)
+        print("-" * 80)
+        rows = summary[summary["dataset"] == dataset]
+        if rows.empty:
+            print("  (none yet)")
+        for row in rows.itertuples():
+            print(f"  ✓ {row.symbol}: {row.files} files, {_size(row.bytes)}, "
+                  f"latest {row.latest_key}")
+            if keys:
+                for key in inventory.keys(dataset, row.symbol):
+                    print(f"      {key}")
+
+    totals = summary.groupby("dataset")["files"].sum()
     print("\n" + "=" * 80)
     print("SUMMARY:")
-    print(f"  Raw files: {len(raw_keys)}")
-    print(f"  Models: {len(model_keys)}")
-    print(f"  Predictions: {len(pred_keys)}")
-    print(f"  Features: {len(feat_keys)}")
+    print(f"  Raw files: {totals.get('raw', 0)}")
+    print(f"  Models: {totals.get('models', 0)}")
+    print(f"  Predictions: {totals.get('predictions', 0)}")
+    print(f"  Features: {totals.get('features', 0)}")
+    print(f"  Total size: {_size(int(summary['bytes'].sum()))}")
     print("=" * 80)
+    return summary
+
 
+def show_redshift_stats(config_path: str = "config.yaml"):
+    """Show stats about the configured symbols' raw data, computed with SQL."""
+    from utils.redshift_client import RedshiftClient
 
-def show_redshift_stats():
-    """Show stats about data using Redshift."""
-    
-    print("\n📈 DATA STATISTICS (via Redshift):")
+    print("\n📈 DATA STATISTICS (via DuckDB):")
     print("-" * 80)
-    
-    redshift = RedshiftClient("config.yaml")
-    
-    for symbol in ["AAPL", "MSFT", "TSLA"]:
-        stats = redshift.get_symbol_stats(symbol)
+
+    redshift = RedshiftClient(config_path)
+    summary = redshift.symbol_summary(redshift.config["symbols"]).set_index("symbol")
+
+    for symbol in redshift.config["symbols"]:
         print(f"\n{symbol}:")
-        print(f"  Files stored: {stats['file_count']}")
-        if stats['latest_file']:
-            print(f"  Latest file: {stats['latest_file']}")
+        if symbol not in summary.index:
+            print("  No raw data")
+            continue
+        row = summary.loc[symbol]
+        print(f"  Files stored: {row['snapshots']}")
+        print(f"  Latest snapshot: {row['latest_snapshot']} "
+              f"({row['bars']} bars, {row['first_bar']} to {row['last_bar']})")
+
+
+def run_sql(sql: str, config_path: str = "config.yaml", limit: int = 50):
+    """Run ad hoc SQL over the local parquet lake and print the result."""
+    from utils.redshift_client import RedshiftClient
+
+    redshift = RedshiftClient(config_path)
+    df = redshift.query(sql)
+    print(df.head(limit).to_string())
+    if len(df) > limit:
+        print(f"... {len(df)} rows")
+    return df
 
 
-def read_latest_data(symbol: str):
+def read_latest_data(symbol: str, config_path: str = "config.yaml"):
     """Read and display the latest data for a symbol."""
-    
+
     print(f"\n📥 READING LATEST DATA FOR {symbol}:")
     print("-" * 80)
-    
-    with open("config.yaml") as f:
-        config = yaml.safe_load(f)
-    
-    aws_cfg = config["aws"]
-    s3_client = S3Client(region=aws_cfg["region"], bucket=aws_cfg["s3_bucket"])
-    
+
+    s3_client = get_runtime(config_path).s3
+
     prefix = f"raw/{symbol}/"
     latest_key = s3_client.get_latest_key(prefix)
-    
+
     if latest_key:
         print(f"Reading: {latest_key}")
         df = s3_client.read_parquet(latest_key)
         print(f"\nShape: {df.shape}")
         print(f"\nColumns: {list(df.columns)}")
-        print(f"\nFirst few rows:")
+        print("\nFirst few rows:")
         print(df.head())
     else:
         print(f"No data found for {symbol}")
 
 
 if __name__ == "__main__":
-    
+
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
-        
+
         if command == "read":
             symbol = sys.argv[2].upper() if len(sys.argv) > 2 else "AAPL"
             read_latest_data(symbol)
+        elif command == "sql" and len(sys.argv) > 2:
+            run_sql(" ".join(sys.argv[2:]))
         else:
-            print("Usage: python query_s3.py [read SYMBOL]")
+            print("Usage: python query_s3.py [read SYMBOL | sql QUERY]")
     else:
         # Default: show S3 contents and stats
         show_s3_contents()
@@ -3,84 +3,177 @@
 Daily pipeline runner for Super Agent Trader.
 Executes: DataAgent (fetch) → MLAgent (train) → PredictAgent (predict) → Analytics (report)
 Runs on schedule via Windows Task Scheduler
+
+Progress is checkpointed to logs/runs/<run_id>.jsonl. After a failure, rerun
+with ``--resume`` (latest run) or ``--run-id <id>`` to skip completed work.
 """
+import argparse
 import sys
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from agents.super_agent import SuperAgent
-from utils.analytics_reporter import AnalyticsReporter
+from agents.super_agent import SuperAgent  # noqa: E402
+from utils.analytics_reporter import AnalyticsReporter  # noqa: E402
+from utils.perf_history import PerfHistory, collect_run_metrics  # noqa: E402
+from utils.run_manifest import RunManifest  # noqa: E402
+from utils.runtime import get_runtime  # noqa: E402
+from utils.tracing import get_tracer  # noqa: E402
 
 
 def setup_daily_logger():
     """Setup logger for daily runs."""
     log_dir = Path("logs") / "daily_runs"
     log_dir.mkdir(parents=True, exist_ok=True)
-    
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = log_dir / f"pipeline_{timestamp}.log"
-    
+
     logger = logging.getLogger("DailyPipeline")
     logger.setLevel(logging.DEBUG)
-    
+
     # File handler
     handler = logging.FileHandler(log_file)
     handler.setLevel(logging.DEBUG)
-    
+
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     handler.setFormatter(formatter)
     logger.addHandler(handler)
-    
+
     return logger, log_file
 
 
-def main():
-    """Run daily pipeline."""
+def export_traces(config, run_id: str, logger):
+    """Write this run's spans as JSONL plus a Prometheus textfile and log the hot paths."""
+    tracing_cfg = config.get("tracing", {})
+    tracer = get_tracer()
+    if not tracer.spans:
+        return
+    out_dir = Path(tracing_cfg.get("output_dir", "logs/traces"))
+    jsonl = tracer.export_jsonl(out_dir / f"{run_id}.jsonl")
+    prom = tracer.export_prometheus(out_dir / tracing_cfg.get("prometheus_file", "trader.prom"))
+    logger.info(f"Traces: {jsonl} ({len(tracer.spans)} spans), metrics: {prom}")
+    for name, s in sorted(tracer.summary().items(), key=lambda kv: -kv[1]["total_s"]):
+        logger.info(
+            f"  {name:<22} n={s['count']:<6} total={s['total_s']:9.3f}s "
+            f"p50={s['p50_s'] * 1000:8.2f}ms p99={s['p99_s'] * 1000:8.2f}ms "
+            f"bytes={s['bytes']} rows={s['rows']}"
+        )
+
+
+def record_performance(config, run_id: str, wall_seconds: float, logger) -> list:
+    """Append this run's metrics to the perf history and log any regressions."""
+    perf_cfg = config.get("perf_history", {})
+    history = PerfHistory(perf_cfg.get("path", "logs/perf_history"))
+    metrics = collect_run_metrics(get_tracer().summary(), wall_seconds, len(config["symbols"]))
+    history.record(run_id, metrics)
+    regressions = history.detect_regressions(
+        run_id,
+        window=perf_cfg.get("window", 14),
+        min_runs=perf_cfg.get("min_runs", 5),
+        threshold=perf_cfg.get("threshold", 3.5),
+        min_change=perf_cfg.get("min_change", 0.10),
+        min_seconds=perf_cfg.get("min_seconds", 0.05),
+    )
+    for r in regressions:
+        logger.warning(
+            f"  PERF REGRESSION {r['metric']}: {r['value']:.4g} vs baseline median "
+            f"{r['baseline_median']:.4g} ({r['change_pct']:+.1f}%, z={r['z']})"
+        )
+    return regressions
+
+
+def main(config_path: str = "config.yaml", run_id: str = None, runs_dir: str = "logs/runs"):
+    """Run daily pipeline.
+
+    A new run id is generated unless ``run_id`` is given; reusing an id
+    resumes that run, skipping symbols and phases already completed.
+    """
     logger, log_file = setup_daily_logger()
-    
+    manifest = RunManifest(run_id or RunManifest.new_run_id(), root=runs_dir)
+    tracer = get_tracer()
+    tracer.reset()
+    config = {}
+    start = time.perf_counter()
+    resumed = bool(manifest.items)
+
     try:
+        config = get_runtime(config_path).config
+        tracer.enabled = config.get("tracing", {}).get("enabled", True)
         logger.info("=" * 80)
-        logger.info("STARTING DAILY PIPELINE")
+        logger.info(f"STARTING DAILY PIPELINE (run {manifest.run_id})")
         logger.info("=" * 80)
-        
+        if manifest.items:
+            logger.info(f"Resuming: {manifest.summary()['stages']}")
+
         # Run super agent pipeline (data fetch → model training → predictions)
         logger.info("\n[PHASE 1/2] Running Super Agent Pipeline...")
-        agent = SuperAgent()
-        predictions = agent.run_daily()
+        agent = SuperAgent(config_path)
+        predictions = agent.run_daily(manifest)
+        # Pipelined and async runs contain per-symbol failures instead of raising
+        failed = agent.last_report.failed() if agent.last_report is not None else []
+        if failed:
+            logger.error(f"  Symbols failed: {failed}; retry them with --run-id {manifest.run_id}")
         logger.info(f"  ✓ Predictions generated: {predictions}")
-        
+
         # Generate analytics report
-        logger.info("\n[PHASE 2/2] Generating Analytics Report...")
-        reporter = AnalyticsReporter()
-        report = reporter.generate_full_report()
-        report_json = reporter.save_report_json(report)
-        report_csv = reporter.save_report_csv(report)
-        logger.info(f"  ✓ JSON Report: {report_json}")
-        logger.info(f"  ✓ CSV Report: {report_csv}")
-        
+        if manifest.is_done("phase", "analytics"):
+            logger.info("\n[PHASE 2/2] Analytics report already generated in this run; skipping.")
+        else:
+            logger.info("\n[PHASE 2/2] Generating Analytics Report...")
+            reporter = AnalyticsReporter(config_path)
+            report = reporter.generate_full_report()
+            outputs = reporter.save_report(report)
+            manifest.mark_done("phase", "analytics", outputs)
+            for fmt, path in outputs.items():
+                logger.info(f"  ✓ {fmt.upper()} Report: {path}")
+        logger.info(f"  Runtime: {agent.runtime.stats()}")
+
+        if failed:
+            # The report covers the symbols that succeeded; the run still fails
+            logger.error("=" * 80)
+            logger.error(f"PIPELINE FAILED FOR {len(failed)} SYMBOL(S): {failed}")
+            logger.error("=" * 80)
+            logger.error(f"Log file: {log_file}")
+            logger.error(f"Resume with: python run_daily_pipeline.py --run-id {manifest.run_id}")
+            export_traces(config, manifest.run_id, logger)
+            return 1
+
         logger.info("\n" + "=" * 80)
         logger.info("DAILY PIPELINE COMPLETED SUCCESSFULLY")
         logger.info("=" * 80)
         logger.info(f"Full log: {log_file}")
-        
+        export_traces(config, manifest.run_id, logger)
+        if not resumed:
+            # Resumed runs skip work, so their timings would distort the baseline
+            record_performance(config, manifest.run_id, time.perf_counter() - start, logger)
+
         return 0
-        
+
     except Exception as e:
         logger.error("=" * 80)
         logger.error("PIPELINE FAILED")
         logger.error("=" * 80)
         logger.exception(f"Error: {e}")
         logger.error(f"Log file: {log_file}")
+        logger.error(f"Resume with: python run_daily_pipeline.py --run-id {manifest.run_id}")
+        export_traces(config, manifest.run_id, logger)
         return 1
 
 
 if __name__ == "__main__":
-    exit_code = main()
+    parser = argparse.ArgumentParser(description="Run the daily pipeline")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--run-id", help="Resume (or start) the run with this id")
+    parser.add_argument("--resume", action="store_true", help="Resume the most recent run")
+    args = parser.parse_args()
+    run_id = args.run_id or (RunManifest.latest_run_id() if args.resume else None)
+    exit_code = main(args.config, run_id)
     sys.exit(exit_code)
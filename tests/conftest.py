@@ -0,0 +1,53 @@
+"""Shared fixtures for the Super Agent Trader test suite."""
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from utils.fake_s3 import FakeS3
+
+
+@pytest.fixture
+def fake_s3():
+    return FakeS3()
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write a minimal config.yaml and return its path."""
+    config = {
+        "ibkr": {"host": "127.0.0.1", "port": 7496, "client_id": 1, "market_data_type": 3},
+        "aws": {"region": "us-east-1", "s3_bucket": "test-bucket"},
+        "symbols": ["AAPL", "MSFT"],
+        "data": {"bar_size": "1 day", "lookback_days": 30},
+        "training": {"retrain_days": 1, "model_type": "lightgbm", "target": "direction"},
+        "paths": {
+            "raw_prefix": "raw/",
+            "feature_prefix": "features/",
+            "model_prefix": "model/",
+            "pred_prefix": "predictions/",
+        },
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+def make_ohlc(n_bars: int, seed: int = 0, start: str = "2025-01-01") -> pd.DataFrame:
+    """Deterministic random-walk OHLCV bars indexed by ``time``."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.002, n_bars))
+    df = pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.005,
+        "low": np.minimum(open_, close) * 0.995,
+        "close": close,
+        "volume": rng.integers(1_000, 10_000, n_bars).astype(float),
+    }, index=pd.date_range(start, periods=n_bars, freq="D", name="time"))
+    return df
+
+
+@pytest.fixture
+def ohlc_factory():
+    return make_ohlc
@@ -1,6 +1,37 @@
 """Tests for agent classes."""
+import asyncio
+
 import pytest
 
+from agents.ml_agent import MLAgent
+from agents.predict_agent import PredictAgent
+from agents.super_agent import SuperAgent
+from tests.conftest import make_ohlc
+from utils.run_manifest import RunManifest
+
+
+class _FakeIB:
+    def __init__(self, bad=("BAD",)):
+        self.bad = set(bad)
+        self.requested = []
+
+    def get_historical_ohlc(self, symbol, bar_size, lookback_days):
+        self.requested.append(symbol)
+        if symbol in self.bad:
+            raise ValueError("No security definition")
+        return make_ohlc(120, seed=len(symbol))
+
+    async def get_historical_ohlc_async(self, symbol, bar_size, lookback_days):
+        return self.get_historical_ohlc(symbol, bar_size, lookback_days)
+
+
+def _agents(config_file, fake_s3):
+    ml_agent = MLAgent(config_file)
+    predict_agent = PredictAgent(config_file)
+    ml_agent.s3.s3 = fake_s3
+    predict_agent.s3.s3 = fake_s3
+    return ml_agent, predict_agent
+
 
 class TestDataAgent:
     """DataAgent tests."""
@@ -24,3 +55,182 @@ class TestPredictAgent:
     def test_model_prediction(self):
         """Test model prediction generation."""
         pass
+
+    def test_incremental_scores_only_new_bars(self, config_file, fake_s3, ohlc_factory):
+        """Incremental mode appends new bars and re-scores everything on a new model."""
+        ml_agent, predict_agent = _agents(config_file, fake_s3)
+        predict_agent.mode = "incremental"
+        bars = ohlc_factory(80)
+
+        ml_agent.s3.write_parquet(bars.iloc[:70], "raw/AAPL/20250311_0000.parquet")
+        ml_agent.train_symbol("AAPL")
+        predict_agent.predict_symbol("AAPL")
+        first = predict_agent.store.read("AAPL")
+        assert first.index.is_unique
+
+        ml_agent.s3.write_parquet(bars, "raw/AAPL/20250321_0000.parquet")
+        predict_agent.predict_symbol("AAPL")
+        second = predict_agent.store.read("AAPL")
+        assert len(second) == len(first) + 10
+        assert second.index.is_unique
+        assert (second["scored_at"] > first["scored_at"].max()).sum() == 11
+
+        bars.iloc[-1, bars.columns.get_loc("close")] *= 1.01
+        ml_agent.s3.write_parquet(bars, "raw/AAPL/20250322_0000.parquet")
+        ml_agent.train_symbol("AAPL")
+        predict_agent.model_cache.invalidate()
+        predict_agent.predict_symbol("AAPL")
+        third = predict_agent.store.read("AAPL")
+        assert len(third) == len(second)
+        assert third["model_version"].nunique() == 1
+        assert predict_agent.store.read_manifest("AAPL")["last_time"].startswith("2025-03-21")
+
+
+class TestSuperAgent:
+    """SuperAgent tests."""
+
+    def test_pipelined_matches_phased(self, config_file, fake_s3):
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = _FakeIB()
+        agent.runtime.s3.s3 = fake_s3
+
+        phased = agent.run_phased()
+        pipelined = agent.run_pipelined()
+
+        assert phased == pipelined
+        assert agent.last_report.summary()["ok"] == 2
+
+    def test_pipelined_contains_symbol_failures(self, config_file, fake_s3):
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = _FakeIB()
+        agent.runtime.s3.s3 = fake_s3
+        agent.config["symbols"] = ["AAPL", "BAD"]
+
+        results = agent.run_pipelined()
+
+        assert results["AAPL"] is not None
+        assert results["BAD"] is None
+        assert agent.last_report.failed() == ["BAD"]
+
+    def test_async_matches_phased(self, config_file, fake_s3):
+        """The asyncio pipeline (process-pool training) gives the phased results."""
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = _FakeIB()
+        agent.runtime.s3.s3 = fake_s3
+
+        phased = agent.run_phased()
+        agent.config["symbols"] = ["AAPL", "MSFT", "BAD"]
+        results = agent.run_async()
+
+        assert {s: results[s] for s in phased} == phased
+        assert results["BAD"] is None
+        assert agent.last_report.failed() == ["BAD"]
+        assert agent.last_report.symbols["BAD"].failed_stage == "fetch"
+
+    def test_concurrent_runs_leave_training_threads_unchanged(
+            self, config_file, fake_s3, monkeypatch):
+        """Pipelined/async runs split cores per model without changing the shared MLAgent."""
+        import agents.ml_agent as ml_agent_module
+
+        used = []
+        fit = ml_agent_module.fit_model
+
+        def recording_fit(df, params):
+            used.append(params.get("num_threads"))
+            return fit(df, params)
+
+        monkeypatch.setattr(ml_agent_module, "fit_model", recording_fit)
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = _FakeIB()
+        agent.runtime.s3.s3 = fake_s3
+        agent.config["pipeline"] = {"cpu_workers": 2}
+
+        agent.run_pipelined()
+        agent.run_async()
+        assert agent.ml_agent.num_threads == 0
+        assert agent.ml_agent.params().get("num_threads") is None
+        assert used and all(n == agent.threads_per_model(2) for n in used)
+
+    def test_async_connects_ib_before_starting_the_loop(self, config_file, fake_s3, monkeypatch):
+        """A lazily opened IB connection (a blocking connect) must not happen inside the loop."""
+        from ib_insync import util
+
+        class _LazyIB(_FakeIB):
+            def __init__(self, **kwargs):
+                super().__init__(bad=[])
+                util.run(asyncio.sleep(0))  # what IB.connect does; fails on a running loop
+
+        monkeypatch.setattr("utils.ibkr_client.IBKRClient", _LazyIB)
+        agent = SuperAgent(config_file)
+        agent.runtime.s3.s3 = fake_s3
+
+        results = agent.run_async()
+
+        assert agent.last_report.failed() == []
+        assert all(p is not None for p in results.values())
+
+    @pytest.mark.parametrize("mode", ["phased", "pipelined", "async"])
+    def test_rerun_resumes_from_manifest(self, config_file, fake_s3, tmp_path, mode):
+        """A rerun with the same manifest redoes only the failed symbol."""
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = ib = _FakeIB(bad=["MSFT"])
+        agent.runtime.s3.s3 = fake_s3
+        agent.config["pipeline"] = {"mode": mode}
+        manifest = RunManifest("run1", root=str(tmp_path))
+
+        if mode == "phased":
+            with pytest.raises(ValueError):
+                agent.run_daily(manifest)
+        else:
+            agent.run_daily(manifest)
+        assert manifest.is_done("fetch", "AAPL")
+        assert manifest.record("fetch", "MSFT")["status"] == "failed"
+
+        ib.bad.clear()
+        ib.requested.clear()
+        aapl_train = manifest.record("train", "AAPL")
+        results = agent.run_daily(RunManifest("run1", root=str(tmp_path)))
+
+        assert ib.requested == ["MSFT"]
+        assert set(results) == {"AAPL", "MSFT"}
+        assert all(p is not None for p in results.values())
+        resumed = RunManifest("run1", root=str(tmp_path))
+        if aapl_train is not None:
+            # Trained before the failure elsewhere: not retrained on resume
+            assert resumed.record("train", "AAPL")["at"] == aapl_train["at"]
+        assert resumed.summary()["stages"]["train"] == {"done": 2, "failed": 0}
+
+
+class TestDailyPipeline:
+    """run_daily_pipeline.main tests."""
+
+    @pytest.mark.parametrize("mode", ["pipelined", "async"])
+    def test_failed_symbols_exit_non_zero(self, config_file, fake_s3, tmp_path, monkeypatch, mode):
+        """Contained per-symbol failures still fail the run after the report is written."""
+        import yaml
+
+        import run_daily_pipeline
+        from utils.runtime import get_runtime
+
+        config = yaml.safe_load(open(config_file))
+        config["symbols"] = ["AAPL", "BAD"]
+        config["pipeline"] = {"mode": mode}
+        with open(config_file, "w") as f:
+            yaml.safe_dump(config, f)
+        runtime = get_runtime(config_file)
+        runtime._ib = ib = _FakeIB()
+        runtime.s3.s3 = fake_s3
+        monkeypatch.chdir(tmp_path)
+        runs_dir = str(tmp_path / "runs")
+
+        code = run_daily_pipeline.main(config_file, run_id="run1", runs_dir=runs_dir)
+
+        assert code == 1
+        manifest = RunManifest("run1", root=runs_dir)
+        assert manifest.is_done("phase", "analytics")
+        assert manifest.record("fetch", "BAD")["status"] == "failed"
+
+        # Resuming the run once the symbol fetches again succeeds
+        ib.bad.clear()
+        assert run_daily_pipeline.main(config_file, run_id="run1", runs_dir=runs_dir) == 0
+        assert RunManifest("run1", root=runs_dir).is_done("fetch", "BAD")
@@ -0,0 +1,258 @@
+"""Tests for analytics over the shared data panel."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.analytics_reporter import AnalyticsReporter
+from utils.analytics_state import AnalyticsState
+from utils.correlation import correlate, load_matrix, returns_matrix
+from utils.data_panel import DataPanel
+from utils.report_writer import read_jsonl, read_table
+from utils.runtime import RuntimeContext
+from utils.vector_analytics import _returns, max_drawdown, symbol_stats
+
+
+def _reporter(config_file, fake_s3, ohlc_factory, tmp_path, symbols):
+    runtime = RuntimeContext.from_config(config_file)
+    runtime.config["symbols"] = symbols
+    runtime.s3.s3 = fake_s3
+    for i, symbol in enumerate(symbols):
+        runtime.s3.write_parquet(ohlc_factory(60, seed=i), f"raw/{symbol}/20250101_0000.parquet")
+        runtime.s3.write_parquet(ohlc_factory(80, seed=i + 100),
+                                 f"raw/{symbol}/20250301_0000.parquet")
+    return AnalyticsReporter(config_file, log_dir=str(tmp_path / "logs"), runtime=runtime)
+
+
+class TestDataPanel:
+    """DataPanel tests."""
+
+    def test_full_report_reads_each_symbol_once(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        symbols = ["AAPL", "MSFT", "TSLA", "NVDA"]
+        reporter = _reporter(config_file, fake_s3, ohlc_factory, tmp_path, symbols)
+        reporter.config["analytics"] = {"history": False}
+        fake_s3.calls.clear()
+
+        report = reporter.generate_full_report()
+
+        assert fake_s3.calls["get_object"] == len(symbols)
+        assert fake_s3.calls["list_objects_v2"] == len(symbols)
+        assert reporter.analytics.panel.reads == len(symbols)
+        for symbol in symbols:
+            analysis = report["symbol_analysis"][symbol]
+            assert analysis["file"] == f"raw/{symbol}/20250301_0000.parquet"
+            assert analysis["data_points"] == 80
+        assert set(report["volatility"]) == set(symbols)
+        assert report["correlations"]["data_shape"] == (80, 4)
+        assert set(report["correlations"]["top"]) == set(symbols)
+
+    def test_missing_symbol_and_field_alignment(self, ohlc_factory):
+        panel = DataPanel.from_frames({"A": ohlc_factory(10), "B": ohlc_factory(5)})
+        assert panel.get("C") is None
+        closes = panel.field("close", ["A", "B", "C"])
+        assert closes.shape == (10, 2)
+        assert closes["B"].isna().sum() == 5
+
+    def test_missing_symbols_keep_report_shape(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        """Symbols without data, even an empty bucket, get null metrics and a zero Sharpe."""
+        from utils.redshift_analytics import RedshiftAnalytics
+
+        runtime = RuntimeContext.from_config(config_file)
+        runtime.s3.s3 = fake_s3
+        empty = RedshiftAnalytics(runtime=runtime)
+        comparison = empty.compare_symbols(["AAPL", "MSFT"])
+        assert list(comparison["symbol"]) == ["AAPL", "MSFT"]
+        assert comparison.drop(columns="symbol").isna().all().all()
+        assert empty.performance_summary(["AAPL"]) == {
+            "AAPL": {"price": None, "return": None, "volatility": None,
+                     "sharpe_approx": 0.0, "win_rate": None}
+        }
+
+        runtime.s3.write_parquet(ohlc_factory(30), "raw/AAPL/20250101_0000.parquet")
+        summary = RedshiftAnalytics(runtime=runtime).performance_summary(["AAPL", "NONE"])
+        assert summary["AAPL"]["sharpe_approx"] != 0
+        assert summary["NONE"]["sharpe_approx"] == 0.0
+        assert summary["NONE"]["price"] is None
+
+
+def _reference_analysis(df):
+    """Per-symbol pandas computation the vectorized engine must reproduce."""
+    returns = df["close"].pct_change()
+    price_range = df["high"] - df["low"]
+    return {
+        "data_points": len(df),
+        "current_price": df["close"].iloc[-1],
+        "price_min": df["close"].min(),
+        "price_avg": df["close"].mean(),
+        "total_return": (df["close"].iloc[-1] / df["close"].iloc[0] - 1) * 100,
+        "daily_return_avg": returns.mean() * 100,
+        "daily_return_std": returns.std() * 100,
+        "max_daily_loss": returns.min() * 100,
+        "avg_price_range": price_range.mean(),
+        "total_volume": df["volume"].sum(),
+        "updays": int((returns > 0).sum()),
+        "win_rate": (returns > 0).sum() / len(returns) * 100,
+    }
+
+
+class TestVectorAnalytics:
+    """Vectorized analytics tests."""
+
+    def test_matches_per_symbol_computation_with_ragged_histories(
+            self, config_file, fake_s3, ohlc_factory, tmp_path):
+        reporter = _reporter(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL", "MSFT"])
+        analytics = reporter.analytics
+        short = ohlc_factory(50, seed=7).iloc[::2]  # gaps relative to the other symbols
+        analytics.s3_client.write_parquet(short, "raw/TSLA/20250301_0000.parquet")
+        symbols = ["AAPL", "MSFT", "TSLA", "NONE"]
+
+        analytics.symbol_stats(symbols)
+        for symbol in symbols[:3]:
+            got = analytics.analyze_symbol(symbol)
+            expected = _reference_analysis(analytics.panel.get(symbol))
+            for field, value in expected.items():
+                assert got[field] == pytest.approx(value, rel=1e-12), (symbol, field)
+            assert isinstance(got["data_points"], int) and isinstance(got["current_price"], float)
+        assert "error" in analytics.analyze_symbol("NONE")
+
+        perf = analytics.performance_summary(symbols)
+        assert perf["NONE"]["price"] is None
+        assert list(analytics.compare_symbols(symbols)["symbol"]) == symbols
+
+    def test_true_running_max_drawdown(self):
+        # Peak 120 → trough 60 happens after the global minimum (50) at the start
+        close = np.array([[50.0], [120.0], [60.0], [130.0]])
+        assert max_drawdown(close)[0] == pytest.approx(-50.0)
+
+
+def _aligned(frames):
+    fields = DataPanel.from_frames(frames).fields(["close", "high", "low", "volume"], list(frames))
+    return fields["close"], fields["high"], fields["low"], fields["volume"]
+
+
+class TestAnalyticsState:
+    """Incremental full-history aggregate tests."""
+
+    def test_incremental_matches_full_recompute(self, fake_s3, ohlc_factory):
+        from utils.s3_client import S3Client
+
+        s3 = S3Client("us-east-1", "test-bucket", client=fake_s3)
+        history = {
+            "A": ohlc_factory(120, seed=1),
+            "B": ohlc_factory(120, seed=2).drop(pd.date_range("2025-02-01", periods=8)),
+            "C": ohlc_factory(120, seed=3).iloc[30:],  # listed later
+        }
+        state = AnalyticsState()
+        # Overlapping 20-bar snapshots, as a daily re-fetch of a lookback window produces
+        for end in pd.date_range("2025-01-10", "2025-05-05", freq="6D"):
+            frames = {s: df[df.index <= end].iloc[-20:] for s, df in history.items()}
+            state.update(*_aligned({s: f for s, f in frames.items() if len(f)}))
+            state.save(s3, "analytics/state/")
+            state = AnalyticsState.load(s3, "analytics/state/")
+
+        close, high, low, volume = _aligned(history)
+        expected = symbol_stats(close, high, low, volume)
+        got = state.stats(list(history))
+        assert list(got["date_range"]) == list(expected["date_range"])
+        numeric = expected.columns.drop("date_range")
+        np.testing.assert_allclose(got[numeric].astype(float), expected[numeric].astype(float),
+                                   rtol=1e-9)
+
+        returns = pd.DataFrame(_returns(close.to_numpy()), columns=close.columns)
+        np.testing.assert_allclose(state.correlation(list(history)), returns.corr(), rtol=1e-9)
+
+    def test_report_folds_in_only_new_bars(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        reporter = _reporter(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL", "MSFT"])
+        first = reporter.generate_full_report()["history"]
+        assert first["AAPL"]["data_points"] == 80
+
+        # Rerunning on the same snapshot changes nothing
+        reporter.analytics.new_panel()
+        assert reporter.analytics.history_summary(["AAPL"]) == {"AAPL": first["AAPL"]}
+
+        # A newer snapshot overlapping the last one adds only its 10 later bars
+        later = ohlc_factory(90, seed=100)
+        reporter.runtime.s3.write_parquet(later.iloc[-40:], "raw/AAPL/20250401_0000.parquet")
+        second = reporter.generate_full_report()["history"]
+        assert second["AAPL"]["data_points"] == 90
+        assert second["AAPL"]["current_price"] == pytest.approx(later["close"].iloc[-1])
+        assert second["MSFT"] == first["MSFT"]
+
+
+class TestCorrelation:
+    """Blocked correlation engine tests."""
+
+    def test_blocked_matches_pandas_with_gaps(self, tmp_path):
+        rng = np.random.default_rng(0)
+        returns = rng.normal(0, 0.01, (120, 1)) + rng.normal(0, 0.01, (120, 13))
+        close = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)),
+                             columns=[f"S{i}" for i in range(13)])
+        close.iloc[20:50, 4] = np.nan
+        close.iloc[:60, 9] = np.nan
+
+        result = correlate(close, top_k=3, block_size=4, matrix_path=str(tmp_path / "corr.npy"),
+                           matrix_dtype="float32")
+        expected = pd.DataFrame(returns_matrix(close).astype(float), columns=close.columns).corr()
+        matrix = load_matrix(str(tmp_path / "corr.npy"), result.symbols)
+        np.testing.assert_allclose(matrix.values, expected.values, atol=1e-5)
+
+        for symbol in close.columns:
+            others = expected[symbol].drop(symbol).sort_values()
+            assert [o for o, _ in result.top[symbol]["most"]] == list(others.index[::-1][:3])
+            assert [o for o, _ in result.top[symbol]["least"]] == list(others.index[:3])
+        a, b, value = result.top_pairs(1)[0]
+        assert value == pytest.approx(expected.where(~np.eye(13, dtype=bool)).max().max(), abs=1e-4)
+
+    def test_window_and_min_periods(self):
+        close = pd.DataFrame({"A": np.arange(1.0, 41.0), "B": np.arange(1.0, 41.0) ** 2})
+        close.loc[:34, "B"] = np.nan
+        result = correlate(close, top_k=2, window=20, min_periods=10)
+        assert result.n_bars == 20
+        # Only 5 common returns in the window: below min_periods, so never reported
+        assert result.top["A"]["most"] == []
+
+
+class TestReportWriter:
+    """Columnar and JSON Lines report output tests."""
+
+    def test_tables_and_jsonl_round_trip(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        symbols = ["AAPL", "MSFT", "TSLA"]
+        reporter = _reporter(config_file, fake_s3, ohlc_factory, tmp_path, symbols)
+        reporter.config["analytics"] = {"report_formats": ["parquet", "jsonl", "csv"]}
+        report = reporter.generate_full_report()
+        report["symbol_analysis"]["NONE"] = {"error": "No data found for NONE"}
+
+        outputs = reporter.save_report(report)
+        assert set(outputs) == {"parquet", "jsonl", "csv"}
+
+        index = json.loads(outputs["parquet"].read_text())
+        assert index["errors"] == {"NONE": "No data found for NONE"}
+        assert index["tables"]["symbol_metrics"]["rows"] == 3
+        assert "top" not in index["correlations"]
+        metrics = read_table(outputs["parquet"], "symbol_metrics",
+                             columns=["symbol", "total_return"])
+        assert list(metrics.columns) == ["symbol", "total_return"]
+        assert metrics.set_index("symbol")["total_return"]["MSFT"] == pytest.approx(
+            report["symbol_analysis"]["MSFT"]["total_return"])
+        corr = read_table(outputs["parquet"], "correlations")
+        assert len(corr) == 3 * 2 * 2  # symbols x (most, least) x two partners each
+
+        records = list(read_jsonl(outputs["jsonl"]))
+        assert records[0]["section"] == "meta"
+        vol = {r["symbol"]: r for r in read_jsonl(outputs["jsonl"], sections=["volatility"])}
+        expected = report["volatility"]["TSLA"]["max_drawdown"]
+        assert vol["TSLA"]["max_drawdown"] == pytest.approx(expected)
+
+    def test_default_formats_keep_json(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        reporter = _reporter(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL"])
+        reporter.config["analytics"] = {"history": False}
+        outputs = reporter.save_report(reporter.generate_full_report())
+        assert set(outputs) == {"json", "parquet", "csv"}
+        assert json.loads(outputs["json"].read_text())["symbols"] == ["AAPL"]
+
+    def test_unknown_format_is_rejected(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        reporter = _reporter(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL"])
+        reporter.config["analytics"] = {"report_formats": ["xml"]}
+        with pytest.raises(ValueError, match="xml"):
+            reporter.save_report({})
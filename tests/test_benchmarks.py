@@ -0,0 +1,46 @@
+"""Tests for the synthetic data generator and the benchmark runner."""
+import json
+
+import pytest
+
+from benchmarks import run_benchmarks
+from benchmarks.synthetic import make_bars, make_universe
+
+
+class TestSynthetic:
+    """Synthetic OHLCV generator tests."""
+
+    def test_deterministic_and_prefix_stable(self):
+        small = make_universe(3, 100, seed=4)
+        large = make_universe(20, 100, seed=4)
+        for symbol, df in small.items():
+            assert df.equals(large[symbol])
+        assert not small["S00000"].equals(make_universe(1, 100, seed=5)["S00000"])
+
+    def test_bar_sizes_gaps_and_consistency(self):
+        df = make_bars(0, 1000, bar_size="5 mins", gap_rate=0.1, ragged=0.5)
+        assert 300 < len(df) < 950
+        assert (df.index.to_series().diff().dropna().min()).seconds == 300
+        assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+        assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+        with pytest.raises(ValueError, match="bar_size"):
+            make_bars(0, 10, bar_size="2 days")
+
+
+class TestBenchmarkRunner:
+    """run_benchmarks smoke test."""
+
+    def test_runs_offline_and_writes_results(self, tmp_path):
+        out = tmp_path / "results.json"
+        run_benchmarks.main([
+            "--symbols", "4", "--bars", "120", "--sample", "2", "--no-memory",
+            "--stages", "s3_read", "train", "predict", "analytics.symbol_stats", "dashboard",
+            "--output", str(out),
+        ])
+        results = {row["stage"]: row for row in json.loads(out.read_text())["results"]}
+        assert set(results) == {
+            "s3_read", "train", "predict", "analytics.symbol_stats", "dashboard"}
+        assert results["s3_read"]["items"] == 4
+        assert results["predict"]["items"] == 2
+        assert results["predict"]["projected_seconds"] >= 0
+        assert all(row["seconds"] > 0 for row in results.values())
@@ -0,0 +1,47 @@
+"""Tests for the lazy-importing CLI."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import cli
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ["pandas", "lightgbm", "boto3", "ib_insync", "plotly"]
+
+
+def _loaded_heavy_modules(code: str) -> list:
+    check = f"{code}; import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", check], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+class TestCli:
+    """CLI tests."""
+
+    def test_startup_imports_no_heavy_modules(self):
+        code = "import cli; cli.build_parser().parse_args(['inventory'])"
+        assert _loaded_heavy_modules(code) == []
+
+    @pytest.mark.parametrize("command, forbidden", [
+        ("inventory", ["lightgbm", "ib_insync", "plotly"]),
+        ("fetch", ["lightgbm", "plotly"]),
+        ("train", ["ib_insync", "plotly"]),
+        ("report", ["lightgbm", "ib_insync", "plotly"]),
+    ])
+    def test_commands_import_only_what_they_need(self, command, forbidden):
+        imports = "; ".join(f"import {m}" for m in cli.COMMAND_MODULES[command])
+        assert not set(_loaded_heavy_modules(imports)) & set(forbidden)
+
+    def test_profile_imports_reports_totals(self):
+        profile = cli.profile_imports([])
+        assert profile["total_ms"] > 0
+        assert any(item["module"] == "cli" for item in profile["slowest"])
+
+    def test_serve_forwards_server_options(self):
+        args = cli.build_parser().parse_args(
+            ["serve", "--host", "0.0.0.0", "--max-batch", "64", "--max-wait-ms", "2.5"])
+        assert cli.serve_argv(args) == ["--config", args.config, "--host", "0.0.0.0",
+                                        "--max-batch", "64", "--max-wait-ms", "2.5"]
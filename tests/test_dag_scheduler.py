@@ -0,0 +1,51 @@
+"""Tests for the per-symbol pipelined scheduler."""
+import threading
+import time
+
+from utils.dag_scheduler import Stage, SymbolPipeline
+
+
+class TestSymbolPipeline:
+    """SymbolPipeline tests."""
+
+    def test_failures_are_contained_per_symbol(self):
+        def fetch(symbol, _):
+            if symbol == "BAD":
+                raise RuntimeError("no contract")
+            return symbol.lower()
+
+        def train(symbol, results):
+            return None if symbol == "EMPTY" else results["fetch"] + "-model"
+
+        pipeline = SymbolPipeline([Stage("fetch", fetch, "main"), Stage("train", train, "cpu"),
+                                   Stage("predict", lambda s, r: r["train"] + "-pred", "io")])
+        report = pipeline.run(["AAPL", "BAD", "EMPTY", "MSFT"])
+
+        assert report.symbols["AAPL"].results["predict"] == "aapl-model-pred"
+        assert report.symbols["MSFT"].status == "ok"
+        assert report.symbols["BAD"].status == "failed"
+        assert report.symbols["BAD"].failed_stage == "fetch"
+        assert "no contract" in report.symbols["BAD"].error
+        assert report.symbols["EMPTY"].status == "stopped"
+        assert report.failed() == ["BAD"]
+
+    def test_main_stages_run_on_calling_thread_and_overlap_with_pools(self):
+        caller = threading.get_ident()
+        seen = []
+
+        def fetch(symbol, _):
+            seen.append(threading.get_ident())
+            time.sleep(0.05)
+            return symbol
+
+        def train(symbol, _):
+            time.sleep(0.05)
+            return symbol
+
+        pipeline = SymbolPipeline([Stage("fetch", fetch, "main"), Stage("train", train, "cpu")],
+                                  cpu_workers=4)
+        report = pipeline.run([f"S{i}" for i in range(6)])
+
+        assert set(seen) == {caller}
+        # Training overlaps the remaining fetches instead of waiting for all of them
+        assert report.wall_seconds < 0.8 * report.serial_seconds
@@ -0,0 +1,192 @@
+"""Tests for TradingDashboard chart generation."""
+import json
+
+import numpy as np
+import pytest
+
+from utils.downsample import downsample_ohlc, lttb_indices
+from utils.runtime import RuntimeContext
+from utils.trading_dashboard import TradingDashboard, last_days
+
+
+def _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, symbols, workers=1, **dash_cfg):
+    runtime = RuntimeContext.from_config(config_file)
+    runtime.config["symbols"] = symbols
+    runtime.config["dashboard"] = {
+        "output_dir": str(tmp_path / "viz"), "workers": workers, **dash_cfg}
+    runtime.s3.s3 = fake_s3
+    for i, symbol in enumerate(symbols):
+        runtime.s3.write_parquet(ohlc_factory(40, seed=i), f"raw/{symbol}/20250101_0000.parquet")
+        runtime.s3.write_parquet(ohlc_factory(60, seed=i + 50),
+                                 f"raw/{symbol}/20250301_0000.parquet")
+    return TradingDashboard(config_file, runtime=runtime)
+
+
+class TestTradingDashboard:
+    """TradingDashboard tests."""
+
+    def test_reads_each_symbol_once_and_renders_in_parallel(
+            self, config_file, fake_s3, ohlc_factory, tmp_path):
+        symbols = ["AAPL", "MSFT", "TSLA", "NVDA"]
+        dashboard = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, symbols, workers=2,
+                               layout="pages")
+        fake_s3.calls.clear()
+
+        results = dashboard.generate_all_visualizations()
+
+        assert fake_s3.calls["get_object"] == len(symbols)
+        assert fake_s3.calls["list_objects_v2"] == len(symbols)
+        expected = {f"{s}_price" for s in symbols}
+        expected |= {"comparison", "volatility", "correlation", "dashboard"}
+        assert set(results["files"]) == expected
+        index = (tmp_path / "viz" / "index.html").read_text()
+        assert all(f"{s}_price_chart.html" in index for s in symbols)
+        assert "Return Correlation Matrix" in index
+        heatmap = (tmp_path / "viz" / "correlation_heatmap.html").read_text()
+        assert "Return Correlation Matrix" in heatmap
+
+    def test_missing_symbol_is_skipped(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        dashboard = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL"])
+        dashboard.symbols = ["AAPL", "NONE"]
+
+        results = dashboard.generate_all_visualizations()
+
+        assert "NONE_price" not in results["files"]
+        assert "NONE_price_chart.html" not in (tmp_path / "viz" / "index.html").read_text()
+        assert dashboard.create_price_chart("NONE") is None
+        assert dashboard.create_price_chart("AAPL").exists()
+
+    def test_shared_plotlyjs_and_downsampled_pages(self, config_file, fake_s3, ohlc_factory,
+                                                   tmp_path):
+        dashboard = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL", "MSFT"],
+                               days=60, max_points=20, layout="pages")
+        dashboard.generate_all_visualizations()
+
+        viz = tmp_path / "viz"
+        bundle = viz / "plotly.min.js"
+        assert bundle.stat().st_size > 1_000_000
+        for page in ["AAPL_price_chart.html", "comparison_returns.html", "index.html"]:
+            html = (viz / page).read_text()
+            assert 'src="plotly.min.js"' in html
+            assert "cdn.plot.ly" not in html
+        assert (viz / "AAPL_price_chart.html").stat().st_size < 50_000
+
+        inline = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path / "inline", ["AAPL"],
+                            plotlyjs="inline")
+        assert inline.write_plotlyjs() is None
+        assert inline.create_price_chart("AAPL").stat().st_size > bundle.stat().st_size
+
+    def test_intraday_history_is_downsampled_at_defaults(self, config_file, fake_s3, ohlc_factory,
+                                                         tmp_path):
+        """At the shipped days/max_points, 30 days of minute bars are cut to max_points."""
+        from benchmarks.synthetic import make_bars
+
+        dashboard = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL"],
+                               layout="lazy")
+        bars = make_bars(0, 40 * 1440, bar_size="1 min")
+        dashboard.runtime.s3.write_parquet(bars, "raw/AAPL/20250401_0000.parquet")
+        assert (dashboard.days, dashboard.max_points) == (30, 2000)
+
+        dashboard.generate_all_visualizations()
+        text = (tmp_path / "viz" / "data" / "AAPL.js").read_text()
+        shard = json.loads(text[len("dashboardShard("):-3])
+        assert len(shard["c"]) == 2000
+        window = bars[bars.index.normalize() >= bars.index.normalize().unique()[-30]]
+        assert len(window) > 2000
+        assert shard["t0"] == window.index[0].timestamp()
+        assert shard["t0"] + sum(shard["dt"]) == window.index[-1].timestamp()
+
+        # Daily bars: one bar per day, as before
+        daily = ohlc_factory(60)
+        assert last_days(daily, 30).equals(daily.tail(30))
+
+    def test_regenerates_only_changed_charts(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        symbols = ["AAPL", "MSFT", "TSLA"]
+        dashboard = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, symbols)
+        first = dashboard.generate_all_visualizations()
+        assert len(first["regenerated"]) == 6
+
+        # Unchanged inputs: listings only, nothing read or rendered
+        dashboard = TradingDashboard(runtime=dashboard.runtime)
+        fake_s3.calls.clear()
+        second = dashboard.generate_all_visualizations()
+        assert fake_s3.calls["get_object"] == 0
+        assert second["regenerated"] == []
+        assert set(second["files"]) == set(first["files"])
+
+        # A new MSFT snapshot rebuilds its price chart and the aggregates
+        dashboard.runtime.s3.write_parquet(ohlc_factory(70, seed=9),
+                                           "raw/MSFT/20250401_0000.parquet")
+        dashboard = TradingDashboard(runtime=dashboard.runtime)
+        fake_s3.calls.clear()
+        third = dashboard.generate_all_visualizations()
+        assert third["regenerated"] == ["MSFT_price", "comparison", "correlation", "volatility"]
+        assert fake_s3.calls["get_object"] == len(symbols)
+
+        # Dropped symbols lose their page; --force rebuilds everything
+        dashboard = TradingDashboard(runtime=dashboard.runtime)
+        dashboard.symbols = ["AAPL", "MSFT"]
+        fourth = dashboard.generate_all_visualizations()
+        assert not (tmp_path / "viz" / "TSLA_price_chart.html").exists()
+        assert "TSLA_price" not in fourth["files"]
+        assert "TSLA_price" not in dashboard.load_manifest()
+        assert len(dashboard.generate_all_visualizations(force=True)["regenerated"]) == 5
+
+    def test_lazy_index_with_data_shards(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        dashboard = _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL", "MSFT"],
+                               days=50, max_points=25, layout="lazy")
+        results = dashboard.generate_all_visualizations()
+
+        viz = tmp_path / "viz"
+        assert results["files"]["AAPL_price"] == str(viz / "data" / "AAPL.js")
+        assert not list(viz.glob("*_price_chart.html"))
+        index = (viz / "index.html").read_text()
+        assert "IntersectionObserver" in index
+        assert 'const SYMBOLS = ["AAPL", "MSFT"];' in index
+
+        text = (viz / "data" / "AAPL.js").read_text()
+        assert text.startswith("dashboardShard(") and text.endswith(");\n")
+        shard = json.loads(text[len("dashboardShard("):-3])
+        bars = dashboard.panel.get("AAPL").tail(50)
+        assert shard["symbol"] == "AAPL"
+        assert len(shard["c"]) == len(shard["v"]) == len(shard["dt"]) + 1 == 25
+        assert shard["t0"] == bars.index[0].timestamp()
+        assert max(shard["h"]) == pytest.approx(bars["high"].max(), abs=1e-4)
+
+        # Switching layout replaces shards by pages
+        dashboard = TradingDashboard(runtime=dashboard.runtime)
+        dashboard.layout = "pages"
+        results = dashboard.generate_all_visualizations()
+        assert results["files"]["AAPL_price"] == str(viz / "AAPL_price_chart.html")
+        assert not (viz / "data" / "AAPL.js").exists()
+
+    def test_unknown_plotlyjs_mode(self, config_file, fake_s3, ohlc_factory, tmp_path):
+        with pytest.raises(ValueError, match="plotlyjs"):
+            _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL"], plotlyjs="bundle")
+        with pytest.raises(ValueError, match="layout"):
+            _dashboard(config_file, fake_s3, ohlc_factory, tmp_path, ["AAPL"], layout="grid")
+
+
+class TestDownsample:
+    """LTTB downsampling tests."""
+
+    def test_lttb_keeps_endpoints_and_spikes(self):
+        y = np.sin(np.linspace(0, 12, 5000))
+        y[3210] = 9.0
+        keep = lttb_indices(y, 200)
+        assert len(keep) == 200
+        assert keep[0] == 0 and keep[-1] == 4999
+        assert 3210 in keep
+        assert (np.diff(keep) > 0).all()
+        assert list(lttb_indices(y[:50], 200)) == list(range(50))
+
+    def test_ohlc_buckets_preserve_extremes(self, ohlc_factory):
+        df = ohlc_factory(3000)
+        small = downsample_ohlc(df, 300)
+        assert len(small) == 300
+        assert small.index[0] == df.index[0]
+        assert small["high"].max() == df["high"].max()
+        assert small["low"].min() == df["low"].min()
+        assert small["volume"].sum() == pytest.approx(df["volume"].sum())
+        assert small["close"].iloc[-1] == df["close"].iloc[-1]
+        assert len(downsample_ohlc(df.head(10), 300)) == 10
@@ -0,0 +1,91 @@
+"""Tests for the embedded DuckDB engine over the parquet lake."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.duckdb_engine import DuckDBEngine
+from utils.prediction_store import PredictionStore
+from utils.redshift_client import RedshiftClient
+from utils.runtime import RuntimeContext
+from utils.s3_client import S3Client
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def lake(fake_s3, ohlc_factory):
+    s3 = S3Client("us-east-1", "test-bucket", client=fake_s3)
+    for i, symbol in enumerate(["AAPL", "MSFT"]):
+        s3.write_parquet(ohlc_factory(30, seed=i), f"raw/{symbol}/20250101_0000.parquet")
+        s3.write_parquet(ohlc_factory(45, seed=i + 10), f"raw/{symbol}/20250201_0000.parquet")
+        bars = ohlc_factory(45, seed=i).index
+        PredictionStore(s3, "predictions/").append(
+            symbol, pd.DataFrame({"p_up": np.linspace(0, 1, 45)}, index=bars), "v1"
+        )
+    return s3
+
+
+class TestDuckDBEngine:
+    """DuckDBEngine tests."""
+
+    def test_views_expose_partitions(self, lake, tmp_path):
+        engine = DuckDBEngine(lake, cache_dir=str(tmp_path / "lake"))
+
+        counts = engine.query(
+            "SELECT symbol, count(*) AS n FROM raw GROUP BY symbol ORDER BY symbol")
+        assert counts.to_dict("list") == {"symbol": ["AAPL", "MSFT"], "n": [75, 75]}
+        latest = engine.query("SELECT DISTINCT symbol, snapshot FROM raw_latest ORDER BY symbol")
+        assert list(latest["snapshot"]) == ["20250201_0000", "20250201_0000"]
+        months = engine.query("SELECT month, count(*) AS n FROM predictions "
+                              "WHERE symbol = ? GROUP BY month ORDER BY month", ["AAPL"])
+        assert months.to_dict("list") == {"month": ["2025-01", "2025-02"], "n": [31, 14]}
+        assert "features" not in engine.tables()
+
+    def test_symbol_filter_prunes_files(self, lake, tmp_path):
+        engine = DuckDBEngine(lake, cache_dir=str(tmp_path / "lake"))
+        engine.sync()
+        plan = engine.query("EXPLAIN ANALYZE SELECT count(*) FROM raw WHERE symbol = 'AAPL'")
+        assert "Scanning Files: 2/4" in plan.iloc[0, 1]
+
+    def test_sync_downloads_only_changes(self, lake, fake_s3, ohlc_factory, tmp_path):
+        engine = DuckDBEngine(lake, cache_dir=str(tmp_path / "lake"))
+        assert engine.sync(["raw"]) == {"raw": 4}
+
+        # A second engine on the same cache resumes from the saved sync state
+        engine = DuckDBEngine(lake, cache_dir=str(tmp_path / "lake"))
+        fake_s3.calls.clear()
+        assert engine.sync(["raw"]) == {"raw": 0}
+        assert fake_s3.calls["get_object"] == 0
+
+        lake.write_parquet(ohlc_factory(10, seed=7), "raw/AAPL/20250201_0000.parquet")
+        del fake_s3.objects["raw/MSFT/20250101_0000.parquet"]
+        assert engine.sync(["raw"]) == {"raw": 1}
+        snapshots = engine.query("SELECT symbol, count(DISTINCT snapshot) AS n, count(*) AS rows "
+                                 "FROM raw GROUP BY symbol ORDER BY symbol")
+        assert snapshots.to_dict("list") == {
+            "symbol": ["AAPL", "MSFT"], "n": [2, 1], "rows": [40, 45]}
+
+    def test_redshift_client_queries_raw_data(self, config_file, lake, fake_s3, tmp_path):
+        runtime = RuntimeContext.from_config(config_file)
+        runtime.s3.s3 = fake_s3
+        runtime.config["duckdb"] = {"cache_dir": str(tmp_path / "lake")}
+        client = RedshiftClient(config_file, runtime=runtime)
+
+        fake_s3.calls.clear()
+        bars = client.query_raw_data("AAPL", limit=5)
+        assert len(bars) == 5
+        assert bars["time"].is_monotonic_decreasing
+        # Only AAPL's raw snapshots are mirrored, not the rest of the lake
+        assert fake_s3.calls["get_object"] == 2
+        assert client.engine.files("raw") == client.engine.files("raw", ["AAPL"])
+        assert not client.engine.files("predictions")
+
+        fake_s3.calls.clear()
+        summary = client.symbol_summary(["MSFT"]).set_index("symbol")
+        assert list(summary.index) == ["MSFT"]
+        assert summary.loc["MSFT", "snapshots"] == 2
+        assert summary.loc["MSFT", "bars"] == 45
+        # One listing serves both the sync and the snapshot count
+        assert fake_s3.calls["list_objects_v2"] == 1
+        assert fake_s3.calls["get_object"] == 2
+        assert not client.engine.files("predictions")
@@ -0,0 +1,74 @@
+"""Tests for the in-process S3 stand-in."""
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from utils.fake_s3 import FakeS3
+from utils.s3_client import S3Client
+
+
+class TestFakeS3:
+    """FakeS3 tests."""
+
+    def test_range_reads(self):
+        s3 = FakeS3()
+        s3.put_object(Bucket="b", Key="k", Body=b"0123456789")
+        assert s3.get_object(Bucket="b", Key="k", Range="bytes=2-4")["Body"].read() == b"234"
+        tail = s3.get_object(Bucket="b", Key="k", Range="bytes=-3")
+        assert tail["Body"].read() == b"789"
+        assert tail["ContentRange"] == "bytes 7-9/10"
+        assert s3.get_object(Bucket="b", Key="k", Range="bytes=8-")["Body"].read() == b"89"
+        with pytest.raises(ClientError, match="InvalidRange"):
+            s3.get_object(Bucket="b", Key="k", Range="bytes=10-12")
+
+    def test_multipart_upload(self):
+        s3 = FakeS3()
+        upload = s3.create_multipart_upload(Bucket="b", Key="big")["UploadId"]
+        parts = [
+            {"PartNumber": n, "ETag": s3.upload_part(Bucket="b", Key="big", UploadId=upload,
+                                                     PartNumber=n, Body=body)["ETag"]}
+            for n, body in [(1, b"a" * 10), (2, b"b" * 5)]
+        ]
+        done = s3.complete_multipart_upload(Bucket="b", Key="big", UploadId=upload,
+                                            MultipartUpload={"Parts": parts})
+        assert done["ETag"].endswith('-2"')
+        assert s3.objects["big"] == b"a" * 10 + b"b" * 5
+        with pytest.raises(ClientError, match="NoSuchUpload"):
+            s3.upload_part(Bucket="b", Key="big", UploadId=upload, PartNumber=3, Body=b"c")
+
+    def test_paginated_listings(self):
+        fake = FakeS3(page_size=3)
+        s3 = S3Client("us-east-1", "b", client=fake)
+        for i in range(7):
+            fake.put_object(Bucket="b", Key=f"raw/S{i}/2025.parquet", Body=b"x")
+        fake.calls.clear()
+        assert len(s3.list_keys("raw/")) == 7
+        assert fake.calls["list_objects_v2"] == 3
+        assert list(s3.iter_prefixes("raw/")) == [f"raw/S{i}/" for i in range(7)]
+        assert [o["Key"] for o in s3.iter_objects("raw/", start_after="raw/S4/")] == \
+            ["raw/S4/2025.parquet", "raw/S5/2025.parquet", "raw/S6/2025.parquet"]
+        assert fake.list_objects_v2(Bucket="b", Prefix="raw/", MaxKeys=2)["KeyCount"] == 2
+
+    def test_latency_and_bandwidth(self):
+        s3 = FakeS3(latency=0.02, link_bandwidth=100_000)
+        start = time.perf_counter()
+        s3.put_object(Bucket="b", Key="k", Body=b"x" * 5_000)  # 20 ms + 50 ms on the link
+        assert time.perf_counter() - start >= 0.069
+        assert s3.stats["bytes_in"] == 5_000
+
+    def test_slowdown_throttling_and_retries(self):
+        s3 = FakeS3(max_rps=5)
+        for _ in range(5):
+            s3.put_object(Bucket="b", Key="k", Body=b"x")
+        with pytest.raises(ClientError) as excinfo:
+            s3.head_object(Bucket="b", Key="k")
+        assert excinfo.value.response["Error"]["Code"] == "SlowDown"
+        assert excinfo.value.response["ResponseMetadata"]["HTTPStatusCode"] == 503
+
+        # Retries with backoff ride out the throttling, as botocore's would
+        s3 = FakeS3(throttle_rate=0.5, retries=10, retry_backoff=0.001, seed=1)
+        for i in range(20):
+            s3.put_object(Bucket="b", Key=f"k{i}", Body=b"x")
+        assert len(s3.objects) == 20
+        assert s3.stats["throttled"] == s3.stats["retries"] > 0
@@ -0,0 +1,55 @@
+"""Tests for the incremental S3 inventory."""
+from utils.inventory import Inventory
+from utils.s3_client import S3Client
+
+
+def _put(s3, key, size):
+    s3.s3.put_object(Bucket=s3.bucket, Key=key, Body=b"x" * size)
+
+
+class TestInventory:
+    """Inventory tests."""
+
+    def test_delimiter_listing_and_summaries(self, fake_s3, tmp_path):
+        fake_s3.page_size = 2
+        s3 = S3Client("us-east-1", "test-bucket", client=fake_s3)
+        for symbol in ["AAPL", "MSFT", "TSLA"]:
+            for day in range(3):
+                _put(s3, f"raw/{symbol}/2025010{day + 1}_0000.parquet", 100)
+        _put(s3, "model/AAPL/model.txt", 50)
+
+        inventory = Inventory(s3, cache_file=str(tmp_path / "inventory.json"))
+        assert list(inventory.symbols("raw")) == ["AAPL", "MSFT", "TSLA"]
+        summary = inventory.scan().set_index(["dataset", "symbol"])
+        assert summary.loc[("raw", "MSFT"), "files"] == 3
+        assert summary.loc[("raw", "MSFT"), "bytes"] == 300
+        assert summary.loc[("raw", "MSFT"), "latest_key"] == "raw/MSFT/20250103_0000.parquet"
+        assert summary.loc[("models", "AAPL"), "files"] == 1
+        assert len(list(inventory.keys("raw", "TSLA"))) == 3
+
+    def test_rescan_is_incremental(self, fake_s3, tmp_path):
+        s3 = S3Client("us-east-1", "test-bucket", client=fake_s3)
+        for day in range(1, 10):
+            _put(s3, f"raw/AAPL/2025010{day}_0000.parquet", 10)
+        _put(s3, "predictions/AAPL/dataset/month=2025-01/part.parquet", 40)
+        cache = str(tmp_path / "inventory.json")
+        Inventory(s3, cache_file=cache).scan()
+
+        # A new snapshot and a rewritten latest partition; the rescan resumes
+        # after the cached latest key, one page per prefix
+        _put(s3, "raw/AAPL/20250110_0000.parquet", 10)
+        _put(s3, "predictions/AAPL/dataset/month=2025-01/part.parquet", 70)
+        fake_s3.calls.clear()
+        inventory = Inventory(s3, cache_file=cache)
+        summary = inventory.scan().set_index(["dataset", "symbol"])
+        # one delimiter listing per dataset + 2 prefixes
+        assert fake_s3.calls["list_objects_v2"] == 4 + 2
+        assert inventory.listed == 2
+        assert summary.loc[("raw", "AAPL"), "files"] == 10
+        assert summary.loc[("raw", "AAPL"), "bytes"] == 100
+        assert summary.loc[("predictions", "AAPL"), "bytes"] == 70
+
+        # Deletions are picked up by a full refresh
+        del fake_s3.objects["raw/AAPL/20250101_0000.parquet"]
+        summary = Inventory(s3, cache_file=cache).scan(["raw"], refresh=True).set_index("symbol")
+        assert summary.loc["AAPL", "files"] == 9
@@ -0,0 +1,68 @@
+"""Tests for the in-process booster cache."""
+import lightgbm as lgb
+import numpy as np
+
+from utils.model_cache import ModelCache
+from utils.s3_client import S3Client
+
+
+def _model_text(seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 3))
+    y = (X[:, 0] + rng.normal(scale=0.1, size=200) > 0).astype(int)
+    booster = lgb.train({"objective": "binary", "verbose": -1},
+                        lgb.Dataset(X, label=y), num_boost_round=5)
+    return booster.model_to_string()
+
+
+def _client(fake_s3) -> S3Client:
+    client = S3Client(region="us-east-1", bucket="test-bucket")
+    client.s3 = fake_s3
+    return client
+
+
+class TestModelCache:
+    """ModelCache tests."""
+
+    def test_repeat_get_is_served_from_memory(self, fake_s3):
+        fake_s3.put_object(Bucket="test-bucket", Key="model/AAPL/model.txt", Body=_model_text(0))
+        cache = ModelCache(_client(fake_s3), revalidate_seconds=60)
+
+        first = cache.get("model/AAPL/model.txt")
+        second = cache.get("model/AAPL/model.txt")
+
+        assert first.booster is second.booster
+        assert fake_s3.calls["get_object"] == 1
+        assert fake_s3.calls["head_object"] == 0
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_changed_etag_reloads(self, fake_s3):
+        fake_s3.put_object(Bucket="test-bucket", Key="model/AAPL/model.txt", Body=_model_text(0))
+        cache = ModelCache(_client(fake_s3), revalidate_seconds=0)
+        first = cache.get("model/AAPL/model.txt")
+
+        cache.get("model/AAPL/model.txt")
+        assert fake_s3.calls["get_object"] == 1
+        assert fake_s3.calls["head_object"] == 1
+
+        fake_s3.put_object(Bucket="test-bucket", Key="model/AAPL/model.txt", Body=_model_text(1))
+        reloaded = cache.get("model/AAPL/model.txt")
+        assert reloaded.etag != first.etag
+        assert fake_s3.calls["get_object"] == 2
+        assert cache.stats()["entries"] == 1
+
+    def test_memory_cap_evicts_least_recently_used(self, fake_s3):
+        for symbol, seed in [("AAPL", 0), ("MSFT", 1), ("TSLA", 2)]:
+            fake_s3.put_object(Bucket="test-bucket", Key=f"model/{symbol}/model.txt",
+                               Body=_model_text(seed))
+        size = len(fake_s3.objects["model/AAPL/model.txt"])
+        cache = ModelCache(_client(fake_s3), max_bytes=int(size * 2.5))
+
+        cache.get("model/AAPL/model.txt")
+        cache.get("model/MSFT/model.txt")
+        cache.get("model/AAPL/model.txt")
+        cache.get("model/TSLA/model.txt")
+
+        assert cache.stats()["evictions"] == 1
+        cache.get("model/AAPL/model.txt")
+        assert fake_s3.calls["get_object"] == 3
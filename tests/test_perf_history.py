@@ -0,0 +1,47 @@
+"""Tests for the performance history store."""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils.perf_history import PerfHistory, collect_run_metrics
+
+
+class TestPerfHistory:
+    """PerfHistory tests."""
+
+    def _seed(self, history, n=10, seed=0):
+        rng = np.random.default_rng(seed)
+        start = datetime(2025, 3, 1)
+        for i in range(n):
+            history.record(f"r{i:02d}", {
+                "stage.train.total_seconds": 10 + rng.normal(0, 0.3),
+                "run.symbols_per_second": 5 + rng.normal(0, 0.1),
+            }, recorded_at=start + timedelta(days=i))
+        return start + timedelta(days=n)
+
+    def test_noise_is_not_a_regression(self, tmp_path):
+        history = PerfHistory(str(tmp_path))
+        day = self._seed(history)
+        history.record("today", {"stage.train.total_seconds": 10.4,
+                                 "run.symbols_per_second": 4.9}, recorded_at=day)
+        assert history.detect_regressions() == []
+
+    def test_slowdown_and_throughput_drop_are_flagged(self, tmp_path):
+        history = PerfHistory(str(tmp_path))
+        day = self._seed(history)
+        history.record("today", {"stage.train.total_seconds": 14.0,
+                                 "run.symbols_per_second": 3.5}, recorded_at=day)
+
+        flagged = {r["metric"]: r for r in history.detect_regressions("today", window=7)}
+        assert set(flagged) == {"stage.train.total_seconds", "run.symbols_per_second"}
+        assert flagged["stage.train.total_seconds"]["change_pct"] > 30
+        assert flagged["stage.train.total_seconds"]["baseline_runs"] == 7
+        # Earlier runs are judged against their own (shorter) baseline only
+        assert history.detect_regressions("r03") == []
+
+    def test_collect_run_metrics(self):
+        summary = {"s3.get": {"total_s": 1.0, "p50_s": 0.01, "p99_s": 0.1, "bytes": 500, "rows": 0}}
+        metrics = collect_run_metrics(summary, wall_seconds=2.0, n_symbols=10)
+        assert metrics["run.symbols_per_second"] == 5.0
+        assert metrics["run.s3_bytes_read"] == 500
+        assert metrics["s3.get.p99_seconds"] == 0.1
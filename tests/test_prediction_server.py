@@ -0,0 +1,71 @@
+"""Tests for the micro-batching prediction service."""
+import json
+import threading
+import urllib.request
+
+import numpy as np
+import pytest
+
+from utils.prediction_server import PredictionService, make_server
+
+
+class _CountingModel:
+    """Linear stand-in for a booster that records each predict call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def feature_name(self):
+        return ["a", "b"]
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return X.sum(axis=1)
+
+
+@pytest.fixture
+def service():
+    model = _CountingModel()
+    service = PredictionService({"AAPL": model, "MSFT": model}.__getitem__, max_wait_ms=20)
+    service.register_features("AAPL", np.array([0.1, 0.2]), as_of="2025-01-02")
+    service.register_features("MSFT", np.array([0.3, 0.4]), as_of="2025-01-02")
+    service.model = model
+    service.start()
+    yield service
+    service.stop()
+
+
+class TestPredictionService:
+    """PredictionService tests."""
+
+    def test_concurrent_requests_share_one_predict_call(self, service):
+        futures = [service.submit(s) for s in ["AAPL", "MSFT"] * 10]
+        futures.append(service.submit("AAPL", {"a": 1.0, "b": 2.0}))
+        results = [f.result(timeout=5) for f in futures]
+
+        assert results[0]["p_up"] == pytest.approx(0.3)
+        assert results[1]["p_up"] == pytest.approx(0.7)
+        assert results[-1] == {"symbol": "AAPL", "p_up": pytest.approx(3.0), "as_of": None}
+        assert service.model.calls == [21]
+        assert service.metrics()["requests"] == 21
+
+    def test_unknown_symbol_fails_only_its_request(self, service):
+        bad = service.submit("TSLA")
+        good = service.submit("AAPL")
+        with pytest.raises(KeyError):
+            bad.result(timeout=5)
+        assert good.result(timeout=5)["symbol"] == "AAPL"
+
+    def test_http_endpoints(self, service):
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/predict?symbol=aapl&symbol=MSFT") as resp:
+                body = json.loads(resp.read())
+            assert [p["symbol"] for p in body["predictions"]] == ["AAPL", "MSFT"]
+            with urllib.request.urlopen(f"{base}/metrics") as resp:
+                assert json.loads(resp.read())["requests"] == 2
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,28 @@
+"""Tests for the persisted run manifest."""
+import pytest
+
+from utils.run_manifest import RunManifest, hash_inputs
+
+
+class TestRunManifest:
+    """RunManifest tests."""
+
+    def test_checkpoint_skips_done_items_with_same_inputs(self, tmp_path):
+        """Completed items are replayed from the journal; changed inputs rerun."""
+        manifest = RunManifest("r", root=str(tmp_path))
+        calls = []
+        manifest.checkpoint("train", "AAPL", hash_inputs("raw/a"), lambda: calls.append(1) or "m/a")
+        with pytest.raises(RuntimeError):
+            manifest.checkpoint("train", "MSFT", hash_inputs("raw/m"), self._boom)
+
+        reloaded = RunManifest("r", root=str(tmp_path))
+        out = reloaded.checkpoint("train", "AAPL", hash_inputs("raw/a"), lambda: calls.append(1))
+        assert out == "m/a" and len(calls) == 1
+        assert not reloaded.is_done("train", "AAPL", hash_inputs("raw/b"))
+        assert reloaded.record("train", "MSFT")["error"] == "RuntimeError: boom"
+        assert reloaded.summary()["stages"]["train"] == {"done": 1, "failed": 1}
+        assert RunManifest.latest_run_id(str(tmp_path)) == "r"
+
+    @staticmethod
+    def _boom():
+        raise RuntimeError("boom")
@@ -0,0 +1,31 @@
+"""Tests for the shared runtime context."""
+from agents.super_agent import SuperAgent
+from utils.redshift_analytics import RedshiftAnalytics
+from utils.runtime import RuntimeContext, get_runtime
+
+
+class TestRuntimeContext:
+    """RuntimeContext tests."""
+
+    def test_components_share_one_context(self, config_file):
+        agent = SuperAgent(config_file)
+        analytics = RedshiftAnalytics(config_file)
+
+        assert get_runtime(config_file) is agent.runtime is analytics.runtime
+        assert agent.ml_agent.s3 is agent.predict_agent.s3 is analytics.s3_client
+        assert agent.predict_agent.model_cache is agent.runtime.model_cache
+        assert agent.runtime.stats()["clients_created"] == 1
+
+    def test_ib_connection_is_lazy(self, config_file):
+        runtime = RuntimeContext.from_config(config_file)
+        SuperAgent(config_file, runtime=runtime)
+        assert runtime.stats()["ib_connected"] is False
+
+    def test_injected_s3_client_is_shared(self, config_file, fake_s3):
+        from utils.s3_client import S3Client
+
+        s3 = S3Client("us-east-1", "test-bucket", client=fake_s3)
+        runtime = RuntimeContext.from_config(config_file, s3=s3)
+        agent = SuperAgent(config_file, runtime=runtime)
+        assert agent.ml_agent.s3 is agent.predict_agent.s3 is s3
+        assert runtime.stats()["clients_created"] == 0
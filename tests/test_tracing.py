@@ -0,0 +1,57 @@
+"""Tests for span tracing."""
+import pytest
+
+from tests.conftest import make_ohlc
+from utils.s3_client import S3Client
+from utils.tracing import Tracer, get_tracer, traced
+
+
+class TestTracer:
+    """Tracer tests."""
+
+    def test_spans_nest_and_aggregate(self, tmp_path):
+        tracer = Tracer()
+        with tracer.span("outer") as outer:
+            for i in range(10):
+                with tracer.span("inner", bytes=100) as sp:
+                    sp.set(rows=i)
+            outer.set(rows=1)
+        with pytest.raises(ValueError):
+            with tracer.span("inner"):
+                raise ValueError
+
+        summary = tracer.summary()
+        assert summary["inner"]["count"] == 11
+        assert summary["inner"]["bytes"] == 1000 and summary["inner"]["rows"] == 45
+        assert summary["inner"]["errors"] == 1
+        assert summary["inner"]["p50_s"] <= summary["inner"]["p99_s"] <= summary["inner"]["max_s"]
+        assert {s[3] for s in tracer.spans if s[0] == "inner"} == {"outer", None}
+
+        lines = tracer.export_jsonl(tmp_path / "t.jsonl").read_text().splitlines()
+        assert len(lines) == 12
+        prom = tracer.export_prometheus(tmp_path / "t.prom", labels={"run": "r1"}).read_text()
+        assert 'trader_span_seconds_count{span="inner",run="r1"} 11' in prom
+        assert 'trader_span_bytes_total{span="inner",run="r1"} 1000' in prom
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span("x") as sp:
+            sp.set(rows=1)
+        assert tracer.spans == [] and tracer.summary() == {}
+
+    def test_s3_client_and_decorator_spans(self, fake_s3):
+        tracer = get_tracer()
+        tracer.reset()
+        s3 = S3Client("us-east-1", "test-bucket", client=fake_s3)
+        s3.write_parquet(make_ohlc(50), "raw/AAPL/a.parquet")
+        s3.read_parquet("raw/AAPL/a.parquet")
+
+        @traced("custom", rows_from_result=True)
+        def work():
+            return [1, 2, 3]
+
+        work()
+        summary = tracer.summary()
+        assert summary["s3.put"]["bytes"] == summary["s3.get"]["bytes"] > 0
+        assert summary["parquet.decode"]["rows"] == 50
+        assert summary["custom"]["rows"] == 3
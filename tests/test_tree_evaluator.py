@@ -0,0 +1,53 @@
+"""Tests for the compiled NumPy tree evaluator."""
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.tree_evaluator import CompiledEnsemble
+
+
+def _data(seed: int = 0, n: int = 2_000):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 5)), columns=list("abcde"))
+    X.iloc[::6, 1] = np.nan
+    X.iloc[::4, 2] = 0.0
+    y = X["a"].fillna(0) + 0.5 * X["c"] + rng.normal(scale=0.3, size=n)
+    return X, y
+
+
+class TestCompiledEnsemble:
+    """CompiledEnsemble tests."""
+
+    @pytest.mark.parametrize("params", [
+        {"objective": "binary"},
+        {"objective": "binary", "zero_as_missing": True},
+        {"objective": "binary", "use_missing": False},
+        {"objective": "regression"},
+    ])
+    def test_matches_booster_predict(self, params):
+        X, y = _data()
+        label = (y > 0).astype(int) if params["objective"] == "binary" else y
+        booster = lgb.train({**params, "num_leaves": 16, "verbose": -1},
+                            lgb.Dataset(X, label=label), num_boost_round=50)
+        compiled = CompiledEnsemble.from_booster(booster)
+
+        X_test, _ = _data(seed=1, n=500)
+        np.testing.assert_array_equal(compiled.predict(X_test), booster.predict(X_test))
+        np.testing.assert_array_equal(compiled.predict(X_test.to_numpy()[:1]),
+                                      booster.predict(X_test.iloc[:1]))
+
+    def test_dataframe_columns_are_reordered_by_name(self):
+        X, y = _data()
+        booster = lgb.train({"objective": "binary", "verbose": -1},
+                            lgb.Dataset(X, label=(y > 0).astype(int)), num_boost_round=10)
+        compiled = CompiledEnsemble.from_booster(booster)
+        shuffled = X[["e", "d", "c", "b", "a"]]
+        np.testing.assert_array_equal(compiled.predict(shuffled), booster.predict(X))
+
+    def test_multiclass_is_rejected(self):
+        X, y = _data()
+        booster = lgb.train({"objective": "multiclass", "num_class": 3, "verbose": -1},
+                            lgb.Dataset(X, label=pd.qcut(y, 3, labels=False)), num_boost_round=2)
+        with pytest.raises(ValueError):
+            CompiledEnsemble.from_booster(booster)
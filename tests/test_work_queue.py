@@ -0,0 +1,105 @@
+"""Tests for the sharded work queue."""
+import threading
+import time
+
+from agents.super_agent import SuperAgent
+from tests.test_agents import _FakeIB
+from utils.work_queue import SQLiteWorkQueue
+
+
+class TestSQLiteWorkQueue:
+    """SQLiteWorkQueue tests."""
+
+    def test_leases_retries_and_abandoned_items(self, tmp_path):
+        """Expired leases are reclaimed; repeated failures park the item."""
+        queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), lease_seconds=0.2, max_attempts=2)
+        assert queue.enqueue("r", ["AAPL", "MSFT"]) == 2
+        assert queue.enqueue("r", ["AAPL"]) == 0
+
+        a = queue.claim("r", "w1")
+        b = queue.claim("r", "w2")
+        assert {a.symbol, b.symbol} == {"AAPL", "MSFT"}
+        assert queue.claim("r", "w3") is None
+
+        queue.complete(a, 0.6)
+        queue.fail(b, "boom")
+        retry = queue.claim("r", "w3")
+        assert retry.symbol == b.symbol and retry.attempts == 2
+
+        # w3 dies holding the lease; on its last attempt the item is parked
+        time.sleep(0.3)
+        assert queue.claim("r", "w4") is None
+        assert queue.status("r") == {"pending": 0, "leased": 0, "done": 1, "failed": 1}
+        assert queue.results("r") == {a.symbol: 0.6}
+
+    def test_complete_requires_the_current_lease(self, tmp_path):
+        """A worker whose lease was taken over cannot overwrite the new holder's result."""
+        queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), lease_seconds=0.1)
+        queue.enqueue("r", ["AAPL"])
+        stale = queue.claim("r", "w1")
+        time.sleep(0.15)
+        current = queue.claim("r", "w2")
+
+        assert queue.complete(current, 0.7)
+        assert not queue.complete(stale, 0.1)
+        assert queue.results("r") == {"AAPL": 0.7}
+
+    def test_claims_are_exclusive_across_threads(self, tmp_path):
+        queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"))
+        queue.enqueue("r", [f"S{i}" for i in range(40)])
+        claimed = []
+
+        def worker(n):
+            while (item := queue.claim("r", f"w{n}")) is not None:
+                claimed.append(item.symbol)
+                queue.complete(item)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(claimed) == sorted(f"S{i}" for i in range(40))
+
+
+class TestShardedWorkers:
+    """SuperAgent.run_worker tests."""
+
+    def test_workers_drain_run_and_recover_abandoned_symbol(self, config_file, fake_s3, tmp_path):
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = _FakeIB(bad=[])
+        agent.runtime.s3.s3 = fake_s3
+        queue = SQLiteWorkQueue(str(tmp_path / "q.sqlite"), lease_seconds=0.3)
+        agent.enqueue_run("r", queue)
+
+        # A worker that claims a symbol and dies without heartbeating
+        lost = queue.claim("r", "dead-worker")
+        results = agent.run_worker("r", queue, worker_id="w1", poll_seconds=0.1)
+
+        assert lost.symbol in results
+        assert set(results) == {"AAPL", "MSFT"}
+        assert all(p is not None for p in results.values())
+        assert queue.status("r")["done"] == 2
+
+    def test_worker_stops_after_losing_its_lease(self, config_file, fake_s3, tmp_path):
+        """Once a heartbeat finds the lease gone, later stages are skipped and nothing completes."""
+
+        class _SlowIB(_FakeIB):
+            def get_historical_ohlc(self, symbol, bar_size, lookback_days):
+                time.sleep(0.2)  # spans several heartbeats
+                return super().get_historical_ohlc(symbol, bar_size, lookback_days)
+
+        class _PartitionedQueue(SQLiteWorkQueue):
+            def heartbeat(self, item):
+                return False
+
+        agent = SuperAgent(config_file)
+        agent.runtime._ib = _SlowIB(bad=[])
+        agent.runtime.s3.s3 = fake_s3
+        queue = _PartitionedQueue(str(tmp_path / "q.sqlite"), lease_seconds=0.15)
+        agent.enqueue_run("r", queue)
+        item = queue.claim("r", "w1")
+
+        assert agent._work_on(queue, item, None) is None
+        assert not any(key.startswith("model/") for key in fake_s3.objects)
+        assert queue.status("r")["done"] == 0
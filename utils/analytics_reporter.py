@@ -1,27 +1,29 @@
 """Analytics reporting module with extensible logging."""
 import json
 import logging
-import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from utils.redshift_analytics import RedshiftAnalytics
-import yaml
+from utils.report_writer import JsonlReportWriter, write_tables
+from utils.runtime import RuntimeContext, get_runtime
 
 
 class AnalyticsReporter:
     """Generate structured analytics reports with extensible logging."""
 
-    def __init__(self, config_path: str = "config.yaml", log_dir: str = "logs"):
+    def __init__(self, config_path: str = "config.yaml", log_dir: str = "logs",
+                 runtime: Optional[RuntimeContext] = None):
         self.config_path = config_path
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
-        
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)
-        
+
+        self.runtime = runtime or get_runtime(config_path)
+        self.config = self.runtime.config
+
         self.symbols = self.config.get("symbols", [])
-        self.analytics = RedshiftAnalytics(config_path)
-        
+        self.analytics = RedshiftAnalytics(config_path, runtime=self.runtime)
+
         # Setup logger
         self.logger = self._setup_logger()
 
@@ -29,30 +31,30 @@ class AnalyticsReporter:
         """Setup structured logger."""
         logger = logging.getLogger("AnalyticsReporter")
         logger.setLevel(logging.DEBUG)
-        
+
         # File handler
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_file = self.log_dir / f"analytics_report_{timestamp}.log"
-        
+
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)
-        
+
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        
+
         # Formatter
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        
+
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
-        
+
         logger.addHandler(file_handler)
         logger.addHandler(console_handler)
-        
+
         return logger
 
     def generate_full_report(self) -> dict:
@@ -60,7 +62,7 @@ class AnalyticsReporter:
         self.logger.info("=" * 80)
         self.logger.info("STARTING COMPREHENSIVE ANALYTICS REPORT")
         self.logger.info("=" * 80)
-        
+
         report = {
             "timestamp": datetime.now().isoformat(),
             "symbols": self.symbols,
@@ -69,109 +71,172 @@ class AnalyticsReporter:
             "correlations": {},
             "volatility": {},
             "performance_summary": {},
+            "history": {},
         }
-        
+
+        # Read every symbol's bars once; all five sections compute from this panel
+        panel = self.analytics.new_panel().preload(self.symbols)
+        self.logger.info(f"Loaded {panel.reads} symbol files for {len(self.symbols)} symbols")
+        # One vectorized pass computes the stats every section below reads
+        self.analytics.symbol_stats(self.symbols)
+
         # Symbol-level analysis
-        self.logger.info("\n[1/5] Analyzing individual symbols...")
+        self.logger.info("\n[1/6] Analyzing individual symbols...")
         for symbol in self.symbols:
             self.logger.debug(f"  Analyzing {symbol}...")
             analysis = self.analytics.analyze_symbol(symbol)
             report["symbol_analysis"][symbol] = analysis
-            self.logger.info(f"  ✓ {symbol}: Price=${analysis.get('current_price', 'N/A'):.2f}, Return={analysis.get('total_return', 0):.2f}%")
-        
+            if "error" in analysis:
+                # e.g. a symbol that failed to fetch in a pipelined run
+                self.logger.warning(f"  ✗ {symbol}: {analysis['error']}")
+                continue
+            self.logger.info(f"  ✓ {symbol}: Price=${analysis.get('current_price', 'N/A'):.2f}, "
+                             f"Return={analysis.get('total_return', 0):.2f}%")
+
         # Comparison
-        self.logger.info("\n[2/5] Running comparison analysis...")
+        self.logger.info("\n[2/6] Running comparison analysis...")
         try:
             comparison_df = self.analytics.compare_symbols(self.symbols)
             report["comparison"] = comparison_df.to_dict(orient="records")
             self.logger.info(f"  ✓ Compared {len(self.symbols)} symbols")
         except Exception as e:
             self.logger.error(f"  ✗ Comparison failed: {e}")
-        
+
         # Correlations
-        self.logger.info("\n[3/5] Calculating correlations...")
+        self.logger.info("\n[3/6] Calculating correlations...")
         try:
-            corr = self.analytics.correlation_analysis(self.symbols)
+            matrix_file = None
+            if self.config.get("analytics", {}).get("correlation", {}).get("save_matrix", True):
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                matrix_file = str(self.log_dir / f"correlation_{timestamp}.npy")
+            corr = self.analytics.correlation_analysis(self.symbols, matrix_path=matrix_file)
             report["correlations"] = corr
-            self.logger.info(f"  ✓ Correlation matrix calculated")
-            # Log correlation pairs
-            if "correlations" in corr:
-                for sym1, corrs in corr["correlations"].items():
-                    for sym2, value in corrs.items():
-                        if sym1 < sym2:  # Avoid duplicates
-                            self.logger.debug(f"    {sym1}-{sym2}: {value:.3f}")
+            self.logger.info(f"  ✓ Correlations calculated for {len(corr.get('top', {}))} symbols")
+            # Only the extremes are logged; the full matrix is in the .npy side file
+            for label, key in (("Most", "most_correlated"), ("Least", "least_correlated")):
+                for sym1, sym2, value in corr.get(key, [])[:5]:
+                    self.logger.debug(f"    {label}: {sym1}-{sym2}: {value:.3f}")
         except Exception as e:
             self.logger.error(f"  ✗ Correlation analysis failed: {e}")
-        
+
         # Volatility
-        self.logger.info("\n[4/5] Analyzing volatility...")
+        self.logger.info("\n[4/6] Analyzing volatility...")
         try:
             vol = self.analytics.volatility_comparison(self.symbols)
             report["volatility"] = vol
             for symbol, metrics in vol.items():
                 self.logger.info(f"  {symbol}:")
                 self.logger.info(f"    Daily Volatility: {metrics['daily_volatility']:.2f}%")
-                self.logger.info(f"    Annualized Volatility: {metrics['annualized_volatility']:.2f}%")
+                self.logger.info(
+                    f"    Annualized Volatility: {metrics['annualized_volatility']:.2f}%")
                 self.logger.info(f"    Sharpe Ratio: {metrics['sharpe_ratio']:.3f}")
                 self.logger.info(f"    Max Drawdown: {metrics['max_drawdown']:.2f}%")
         except Exception as e:
             self.logger.error(f"  ✗ Volatility analysis failed: {e}")
-        
+
         # Performance summary
-        self.logger.info("\n[5/5] Generating performance summary...")
+        self.logger.info("\n[5/6] Generating performance summary...")
         try:
             perf = self.analytics.performance_summary(self.symbols)
             report["performance_summary"] = perf
             for symbol, metrics in perf.items():
-                self.logger.info(f"  {symbol}: Return={metrics['return']:.2f}%, Vol={metrics['volatility']:.2f}%, WR={metrics['win_rate']:.1f}%")
+                self.logger.info(f"  {symbol}: Return={metrics['return']:.2f}%, "
+                                 f"Vol={metrics['volatility']:.2f}%, WR={metrics['win_rate']:.1f}%")
         except Exception as e:
             self.logger.error(f"  ✗ Performance summary failed: {e}")
-        
+
+        # Full-history aggregates, updated with today's new bars only
+        if self.config.get("analytics", {}).get("history", True):
+            self.logger.info("\n[6/6] Updating full-history aggregates...")
+            try:
+                history = self.analytics.history_summary(self.symbols)
+                report["history"] = history
+                for symbol, metrics in history.items():
+                    self.logger.info(f"  {symbol}: {metrics['date_range']}, "
+                                     f"Return={metrics['total_return']:.2f}%, "
+                                     f"MaxDD={metrics['max_drawdown']:.2f}%")
+            except Exception as e:
+                self.logger.error(f"  ✗ History update failed: {e}")
+
         self.logger.info("\n" + "=" * 80)
         self.logger.info("REPORT GENERATION COMPLETE")
         self.logger.info("=" * 80)
-        
+
         return report
 
-    def save_report_json(self, report: dict) -> Path:
-        """Save report as JSON for further analysis."""
+    def save_report(self, report: dict) -> dict:
+        """Save the report in each ``analytics.report_formats`` format; returns ``{format: path}``.
+
+        Formats: ``parquet`` (a table per section plus ``index.json``),
+        ``jsonl`` (one record per line), ``json`` (one nested document) and
+        ``csv`` (symbol analysis only).
+        """
+        formats = self.config.get("analytics", {}).get("report_formats", ["json", "parquet", "csv"])
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        savers = {
+            "parquet": self.save_report_tables,
+            "jsonl": self.save_report_jsonl,
+            "json": self.save_report_json,
+            "csv": self.save_report_csv,
+        }
+        unknown = set(formats) - set(savers)
+        if unknown:
+            raise ValueError(f"Unknown report formats: {sorted(unknown)}")
+        return {fmt: savers[fmt](report, timestamp) for fmt in formats}
+
+    def save_report_tables(self, report: dict, timestamp: Optional[str] = None) -> Path:
+        """Save each report section as a parquet table; returns the JSON index."""
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        index_file = write_tables(report, self.log_dir / f"analytics_{timestamp}")
+        self.logger.info(f"Report tables saved to: {index_file.parent}")
+        return index_file
+
+    def save_report_jsonl(self, report: dict, timestamp: Optional[str] = None) -> Path:
+        """Save the report as JSON Lines, one record per symbol/row."""
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        with JsonlReportWriter(self.log_dir / f"analytics_data_{timestamp}.jsonl") as writer:
+            writer.write_report(report)
+        self.logger.info(f"JSONL report saved to: {writer.path} ({writer.records} records)")
+        return writer.path
+
+    def save_report_json(self, report: dict, timestamp: Optional[str] = None) -> Path:
+        """Save report as JSON for further analysis."""
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = self.log_dir / f"analytics_data_{timestamp}.json"
-        
+
         with open(report_file, 'w') as f:
             json.dump(report, f, indent=2, default=str)
-        
+
         self.logger.info(f"Report saved to: {report_file}")
         return report_file
 
-    def save_report_csv(self, report: dict) -> Path:
+    def save_report_csv(self, report: dict, timestamp: Optional[str] = None) -> Path:
         """Save symbol analysis as CSV."""
         import pandas as pd
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         csv_file = self.log_dir / f"analytics_symbols_{timestamp}.csv"
-        
+
         # Convert symbol analysis to CSV
         data = []
         for symbol, analysis in report["symbol_analysis"].items():
             data.append(analysis)
-        
+
         df = pd.DataFrame(data)
         df.to_csv(csv_file, index=False)
-        
+
         self.logger.info(f"CSV report saved to: {csv_file}")
         return csv_file
 
 
 if __name__ == "__main__":
     reporter = AnalyticsReporter()
-    
+
     # Generate full report
     report = reporter.generate_full_report()
-    
-    # Save in multiple formats
-    reporter.save_report_json(report)
-    reporter.save_report_csv(report)
-    
+
+    # Save in the configured formats
+    reporter.save_report(report)
+
     print("\n✓ Report generation complete!")
     print(f"  Logs saved to: {reporter.log_dir}/")
@@ -0,0 +1,275 @@
+"""Persisted running aggregates for full-history analytics.
+
+Reports used to recompute every statistic from the latest raw snapshot, so
+history beyond the snapshot window was lost, and recomputing over all of it
+would grow without bound. ``AnalyticsState`` instead keeps, per symbol, the
+counts, sums, sums of squares, extrema, running peak and deepest drawdown of
+everything seen so far, plus pairwise co-moment sums of returns for
+correlations. Each report folds in only the bars newer than a symbol's
+``last_time`` and saves the state back to S3, so a full-history report costs
+O(new bars) per symbol per day and still matches a from-scratch recompute.
+
+A bar is counted once, when it first appears; later revisions of
+already-counted bars in a re-fetched snapshot are ignored.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.vector_analytics import TRADING_DAYS, _first_last, _returns
+
+# Per-symbol running aggregates; NaN means "no value yet"
+SCALARS = [
+    "n", "close_sum", "price_min", "price_max", "first_close", "last_close",
+    "ret_n", "ret_sum", "ret_sumsq", "ret_max", "ret_min", "up", "down",
+    "range_n", "range_sum", "range_max", "volume_sum", "peak", "max_dd",
+]
+TIMES = ["first_time", "last_time"]
+# Pairwise return co-moments over bars where both symbols have a return:
+# count, sum of the row symbol's returns, sum of its squares, and cross products
+PAIR_MATRICES = ["count", "sum", "sumsq", "cross"]
+
+
+class AnalyticsState:
+    """Running per-symbol and pairwise aggregates over every bar seen so far."""
+
+    def __init__(self, symbols: Optional[List[str]] = None):
+        self.symbols: List[str] = []
+        self._position = {}
+        self.scalars = pd.DataFrame(columns=SCALARS + TIMES, index=pd.Index([], name="symbol"))
+        self.pairs = {name: np.zeros((0, 0)) for name in PAIR_MATRICES}
+        self._ensure(symbols or [])
+
+    def _ensure(self, symbols):
+        new = [s for s in dict.fromkeys(symbols) if s not in self.symbols]
+        if not new:
+            return
+        self.symbols += new
+        self._position = {s: i for i, s in enumerate(self.symbols)}
+        scalars = pd.DataFrame(np.nan, index=pd.Index(new, name="symbol"), columns=SCALARS)
+        for col in ("n", "close_sum", "ret_n", "ret_sum", "ret_sumsq", "up", "down",
+                    "range_n", "range_sum", "volume_sum"):
+            scalars[col] = 0.0
+        for col in TIMES:
+            scalars[col] = pd.NaT
+        self.scalars = pd.concat([self.scalars, scalars]) if len(self.scalars) else scalars
+        n = len(self.symbols)
+        for name, matrix in self.pairs.items():
+            grown = np.zeros((n, n))
+            grown[:matrix.shape[0], :matrix.shape[1]] = matrix
+            self.pairs[name] = grown
+
+    # -- update ----------------------------------------------------------------
+
+    def update(self, close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame,
+               volume: pd.DataFrame) -> int:
+        """Fold in the bars of the aligned time × symbol frames newer than each symbol's state.
+
+        Returns the number of new bars counted.
+        """
+        symbols = list(close.columns)
+        if not symbols:
+            return 0
+        self._ensure(symbols)
+        state = self.scalars.loc[symbols]
+        c = close.to_numpy(dtype="float64")
+        h = high.reindex(columns=symbols).to_numpy(dtype="float64")
+        lo = low.reindex(columns=symbols).to_numpy(dtype="float64")
+        v = volume.reindex(columns=symbols).to_numpy(dtype="float64")
+
+        times = close.index.to_numpy(dtype="datetime64[ns]")
+        last = state["last_time"].to_numpy(dtype="datetime64[ns]")
+        last = np.where(np.isnat(last), np.datetime64(np.iinfo(np.int64).min + 1, "ns"), last)
+        valid = ~np.isnan(c)
+        new = (times[:, None] > last[None, :]) & valid
+        n_new = new.sum(axis=0)
+        if not n_new.any():
+            return 0
+
+        r = _returns(c)
+        # A snapshot that starts exactly at the first new bar has no previous
+        # close in the frame: take it from the state
+        first, last_row = _first_last(valid)
+        cols = np.arange(len(symbols))
+        prev = state["last_close"].to_numpy(dtype="float64")
+        seam = new[first, cols] & np.isnan(r[first, cols]) & ~np.isnan(prev)
+        r[first[seam], cols[seam]] = c[first[seam], cols[seam]] / prev[seam] - 1
+        r_ok = ~np.isnan(r)
+        r_new = new & r_ok
+
+        self._update_pairs(symbols, r, r_ok, r_new)
+
+        def masked(values, mask):
+            return np.where(mask, values, np.nan)
+
+        with np.errstate(invalid="ignore"):
+            rng = h - lo
+            rng_new = new & ~np.isnan(rng)
+            c_new, r_vals, rng_vals = masked(c, new), masked(r, r_new), masked(rng, rng_new)
+            has_new = n_new > 0
+            updates = {
+                "n": n_new,
+                "close_sum": np.nansum(c_new, axis=0),
+                "ret_n": r_new.sum(axis=0),
+                "ret_sum": np.nansum(r_vals, axis=0),
+                "ret_sumsq": np.nansum(r_vals ** 2, axis=0),
+                "up": (r_vals > 0).sum(axis=0),
+                "down": (r_vals < 0).sum(axis=0),
+                "range_n": rng_new.sum(axis=0),
+                "range_sum": np.nansum(rng_vals, axis=0),
+                "volume_sum": np.nansum(masked(v, new), axis=0),
+            }
+            out = {col: state[col].to_numpy(dtype="float64") + np.asarray(add, dtype="float64")
+                   for col, add in updates.items()}
+            for col, values, reduce in (
+                ("price_min", c_new, np.fmin), ("price_max", c_new, np.fmax),
+                ("ret_min", r_vals, np.fmin), ("ret_max", r_vals, np.fmax),
+                ("range_max", rng_vals, np.fmax),
+            ):
+                reduced = np.full(len(symbols), np.nan)
+                reduced[has_new] = reduce.reduce(values[:, has_new], axis=0)
+                out[col] = reduce(state[col].to_numpy(dtype="float64"), reduced)
+
+            # Running peak continues from the stored one; the drawdown keeps its minimum
+            filled = np.vstack([state["peak"].to_numpy(dtype="float64")[None, :], c_new])
+            peak = np.fmax.accumulate(filled, axis=0)
+            drawdown = np.fmin.reduce(c_new / peak[1:] - 1, axis=0)
+            out["peak"] = peak[-1]
+            out["max_dd"] = np.fmin(state["max_dd"].to_numpy(dtype="float64"), drawdown)
+
+        first_new, last_new = _first_last(new)
+        index = close.index
+        is_first = has_new & state["first_time"].isna().to_numpy()
+        out["first_close"] = np.where(is_first, c[first_new, cols],
+                                      state["first_close"].to_numpy(dtype="float64"))
+        out["last_close"] = np.where(has_new, c[last_new, cols], prev)
+        first_time = state["first_time"].copy()
+        first_time[is_first] = index[first_new[is_first]]
+        last_time = state["last_time"].copy()
+        last_time[has_new] = index[last_new[has_new]]
+
+        updated = pd.DataFrame(out, index=state.index)
+        updated["first_time"] = first_time
+        updated["last_time"] = last_time
+        self.scalars.loc[symbols, SCALARS + TIMES] = updated[SCALARS + TIMES]
+        return int(n_new.sum())
+
+    def _update_pairs(self, symbols, r, r_ok, r_new):
+        """Add co-moments for bar times where both symbols have a return and at least one is new.
+
+        A pair observation is counted once, in the run where its later half
+        arrives: all-valid products minus those where both halves are old.
+        """
+        ix = np.array([self._position[s] for s in symbols])
+        valid = r_ok.astype("float64")
+        old = (r_ok & ~r_new).astype("float64")
+        x = np.where(r_ok, r, 0.0)
+        x_old = x * old
+        grid = np.ix_(ix, ix)
+        self.pairs["count"][grid] += valid.T @ valid - old.T @ old
+        self.pairs["sum"][grid] += x.T @ valid - x_old.T @ old
+        self.pairs["sumsq"][grid] += (x * x).T @ valid - (x_old * x_old).T @ old
+        self.pairs["cross"][grid] += x.T @ x - x_old.T @ x_old
+
+    # -- results ---------------------------------------------------------------
+
+    def stats(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Full-history metrics, named and scaled like ``vector_analytics.symbol_stats``."""
+        s = self.scalars if symbols is None else self.scalars.reindex(symbols)
+        s = s[s["n"] > 0]
+        n, ret_n = s["n"].astype(float), s["ret_n"].astype(float)
+        mean = s["ret_sum"] / ret_n
+        var = (s["ret_sumsq"] - ret_n * mean ** 2) / (ret_n - 1)
+        std = np.sqrt(var.clip(lower=0)).where(ret_n > 1)
+        sharpe_approx = (mean / std).where(std > 0, 0.0)
+        first_date = s["first_time"].map(_date)
+        last_date = s["last_time"].map(_date)
+        return pd.DataFrame({
+            "data_points": n.astype(int),
+            "date_range": first_date.astype(str) + " to " + last_date.astype(str),
+            "current_price": s["last_close"],
+            "price_min": s["price_min"],
+            "price_max": s["price_max"],
+            "price_avg": s["close_sum"] / n,
+            "total_return": (s["last_close"] / s["first_close"] - 1) * 100,
+            "daily_return_avg": mean * 100,
+            "daily_return_std": std * 100,
+            "max_daily_gain": s["ret_max"] * 100,
+            "max_daily_loss": s["ret_min"] * 100,
+            "volatility": std * 100,
+            "avg_price_range": s["range_sum"] / s["range_n"],
+            "max_intraday_range": s["range_max"],
+            "avg_volume": s["volume_sum"] / n,
+            "total_volume": s["volume_sum"],
+            "updays": s["up"].astype(int),
+            "downdays": s["down"].astype(int),
+            "win_rate": s["up"] / n * 100,
+            "annualized_volatility": std * TRADING_DAYS ** 0.5 * 100,
+            "sharpe_ratio": sharpe_approx * TRADING_DAYS ** 0.5,
+            "sharpe_approx": sharpe_approx,
+            "max_drawdown": s["max_dd"] * 100,
+        }, index=s.index)
+
+    def correlation(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Pearson correlation of returns over each pair's common bars (as ``DataFrame.corr``)."""
+        symbols = list(symbols or self.symbols)
+        ix = np.array([self._position[s] for s in symbols], dtype=int)
+        grid = np.ix_(ix, ix)
+        n, S = self.pairs["count"][grid], self.pairs["sum"][grid]
+        Q, P = self.pairs["sumsq"][grid], self.pairs["cross"][grid]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * P - S * S.T
+            var = n * Q - S * S
+            corr = cov / np.sqrt(var * var.T)
+        corr[n < 2] = np.nan
+        return pd.DataFrame(np.clip(corr, -1, 1), index=symbols, columns=symbols)
+
+    # -- persistence -----------------------------------------------------------
+
+    def save(self, s3_client, prefix: str):
+        """Write ``symbols.parquet`` and ``pairs.parquet`` (upper triangle) under ``prefix``."""
+        s3_client.write_parquet(self.scalars.astype({c: "float64" for c in SCALARS}),
+                                f"{prefix}symbols.parquet")
+        a, b = np.triu_indices(len(self.symbols), k=1)
+        symbols = np.array(self.symbols, dtype=object)
+        pairs = pd.DataFrame({
+            "a": symbols[a], "b": symbols[b],
+            "n": self.pairs["count"][a, b],
+            "sum_a": self.pairs["sum"][a, b], "sum_b": self.pairs["sum"][b, a],
+            "sum_aa": self.pairs["sumsq"][a, b], "sum_bb": self.pairs["sumsq"][b, a],
+            "sum_ab": self.pairs["cross"][a, b],
+        })
+        pairs = pairs[pairs["n"] > 0].reset_index(drop=True)
+        s3_client.write_parquet(pairs, f"{prefix}pairs.parquet")
+
+    @classmethod
+    def load(cls, s3_client, prefix: str) -> "AnalyticsState":
+        """The saved state under ``prefix``, or an empty one."""
+        state = cls()
+        keys = set(s3_client.list_keys(prefix))
+        if f"{prefix}symbols.parquet" not in keys:
+            return state
+        scalars = s3_client.read_parquet(f"{prefix}symbols.parquet")
+        state._ensure(list(scalars.index))
+        state.scalars = scalars.reindex(columns=SCALARS + TIMES)
+        state.scalars.index.name = "symbol"
+        if f"{prefix}pairs.parquet" in keys:
+            pairs = s3_client.read_parquet(f"{prefix}pairs.parquet")
+            position = state._position
+            a = pairs["a"].map(position).to_numpy(dtype=int)
+            b = pairs["b"].map(position).to_numpy(dtype=int)
+            columns = (("count", "n", "n"), ("sum", "sum_a", "sum_b"),
+                       ("sumsq", "sum_aa", "sum_bb"), ("cross", "sum_ab", "sum_ab"))
+            for name, col_ab, col_ba in columns:
+                state.pairs[name][a, b] = pairs[col_ab].to_numpy()
+                state.pairs[name][b, a] = pairs[col_ba].to_numpy()
+        # Diagonals are never read for correlations; rebuild them from the scalars
+        for name, col in (("count", "ret_n"), ("sum", "ret_sum"), ("sumsq", "ret_sumsq"),
+                          ("cross", "ret_sumsq")):
+            np.fill_diagonal(state.pairs[name], state.scalars[col].to_numpy(dtype="float64"))
+        return state
+
+
+def _date(value):
+    return value.date() if hasattr(value, "date") else value
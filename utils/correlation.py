@@ -0,0 +1,144 @@
+"""Blocked return-correlation engine for large symbol universes.
+
+The report used to correlate raw close prices with ``DataFrame.corr`` and
+embed the full N×N matrix in its JSON, which is quadratic in memory and
+output. ``correlate`` instead:
+
+- works on bar-to-bar returns (price levels trend, so their correlation is
+  mostly spurious), optionally over a trailing ``window`` of bars;
+- computes pairwise-complete Pearson correlations (as ``DataFrame.corr``
+  does with missing bars) with float32 matrix products, one block of rows
+  at a time, so peak memory is O(block × N) rather than O(N²);
+- keeps only each symbol's top-k most and least correlated partners, and
+  optionally streams the full matrix into a float16/float32 ``.npy`` side
+  file that ``np.load(..., mmap_mode="r")`` can read without loading it.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.tracing import span
+from utils.vector_analytics import _returns
+
+
+@dataclass
+class CorrelationResult:
+    symbols: List[str]
+    n_bars: int
+    # symbol -> {"most": [(other, corr), ...], "least": [...]}, best first
+    top: Dict[str, Dict[str, list]] = field(default_factory=dict)
+    matrix_path: Optional[Path] = None
+
+    def top_pairs(self, k: int = 10, kind: str = "most") -> List[tuple]:
+        """The ``k`` most (or least) correlated distinct pairs across all symbols."""
+        pairs = {}
+        for symbol, partners in self.top.items():
+            for other, value in partners[kind]:
+                pairs[tuple(sorted((symbol, other)))] = value
+        ordered = sorted(pairs.items(), key=lambda p: -p[1] if kind == "most" else p[1])
+        return [(a, b, value) for (a, b), value in ordered[:k]]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-format top-k table: symbol, kind, rank, other, corr."""
+        rows = [
+            (symbol, kind, rank, other, value)
+            for symbol, partners in self.top.items()
+            for kind in ("most", "least")
+            for rank, (other, value) in enumerate(partners[kind], start=1)
+        ]
+        return pd.DataFrame(rows, columns=["symbol", "kind", "rank", "other", "corr"])
+
+
+def returns_matrix(close: pd.DataFrame, window: Optional[int] = None) -> np.ndarray:
+    """Aligned bar-to-bar returns (time × symbol, NaN where missing) as float32."""
+    returns = _returns(close.to_numpy(dtype="float64"))[1:]
+    if window:
+        returns = returns[-window:]
+    return returns.astype("float32")
+
+
+def _block_corr(Xb, Vb, X, V, X2, min_periods):
+    """Pairwise-complete correlations of block columns against all columns."""
+    n = Vb.T @ V
+    sx, sy = Xb.T @ V, Vb.T @ X
+    sxx, syy = (Xb * Xb).T @ V, Vb.T @ X2
+    sxy = Xb.T @ X
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        corr = cov / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    corr[n < min_periods] = np.nan
+    return np.clip(corr, -1, 1)
+
+
+def correlate(close: pd.DataFrame, top_k: int = 5, window: Optional[int] = None,
+              block_size: int = 512, min_periods: int = 10,
+              matrix_path: Optional[str] = None,
+              matrix_dtype: str = "float16") -> CorrelationResult:
+    """Top-k correlated partners per symbol from the aligned close prices in ``close``.
+
+    ``window`` limits the computation to the trailing bars; pairs with
+    fewer than ``min_periods`` common returns are NaN and never reported.
+    When ``matrix_path`` is given the full matrix is written there as
+    ``.npy`` (rows/columns in ``close.columns`` order).
+    """
+    symbols = list(close.columns)
+    R = returns_matrix(close, window)
+    valid = ~np.isnan(R)
+    # Centering each column first keeps float32 sums of squares well-conditioned;
+    # correlation is unaffected by the shift
+    with np.errstate(invalid="ignore"):
+        means = np.nanmean(R, axis=0) if len(R) else np.zeros(len(symbols), dtype="float32")
+    X = np.where(valid, R - np.nan_to_num(means), 0).astype("float32")
+    V = valid.astype("float32")
+    X2 = X * X
+
+    n_symbols = len(symbols)
+    k = min(top_k, max(n_symbols - 1, 0))
+    matrix = None
+    if matrix_path:
+        Path(matrix_path).parent.mkdir(parents=True, exist_ok=True)
+        matrix = np.lib.format.open_memmap(matrix_path, mode="w+", dtype=matrix_dtype,
+                                           shape=(n_symbols, n_symbols))
+
+    result = CorrelationResult(symbols, len(R),
+                               matrix_path=Path(matrix_path) if matrix_path else None)
+    names = np.array(symbols, dtype=object)
+    with span("correlation.compute", rows=n_symbols):
+        for start in range(0, n_symbols, block_size):
+            stop = min(start + block_size, n_symbols)
+            corr = _block_corr(X[:, start:stop], V[:, start:stop], X, V, X2, min_periods)
+            if matrix is not None:
+                matrix[start:stop] = corr
+            if k == 0:
+                continue
+            rows = np.arange(stop - start)
+            corr[rows, rows + start] = np.nan  # never report a symbol against itself
+            high = np.where(np.isnan(corr), -np.inf, corr)
+            low = np.where(np.isnan(corr), np.inf, corr)
+            most = np.argpartition(-high, k - 1, axis=1)[:, :k]
+            least = np.argpartition(low, k - 1, axis=1)[:, :k]
+            for i in rows:
+                result.top[symbols[start + i]] = {
+                    "most": _ranked(names, corr[i], most[i], descending=True),
+                    "least": _ranked(names, corr[i], least[i], descending=False),
+                }
+    if matrix is not None:
+        matrix.flush()
+        del matrix
+    return result
+
+
+def _ranked(names, row, candidates, descending: bool) -> list:
+    values = row[candidates]
+    keep = ~np.isnan(values)
+    candidates, values = candidates[keep], values[keep]
+    order = np.argsort(-values if descending else values, kind="stable")
+    return [(names[j], round(float(v), 4)) for j, v in zip(candidates[order], values[order])]
+
+
+def load_matrix(path: str, symbols: List[str]) -> pd.DataFrame:
+    """A saved ``.npy`` matrix as a labelled frame, memory-mapped."""
+    return pd.DataFrame(np.load(path, mmap_mode="r"), index=symbols, columns=symbols)
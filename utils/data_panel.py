@@ -0,0 +1,128 @@
+"""Per-report panel of every symbol's latest raw bars.
+
+Analytics used to list and read each symbol's latest parquet once per
+metric. A ``DataPanel`` reads each symbol at most once (one LIST plus one
+GET) and hands the same frame to every consumer; ``field`` aligns one column
+across symbols into a time × symbol frame. ``locate`` does only the LIST, so
+callers can decide from keys and ETags whether a symbol needs reading at all.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class DataPanel:
+    """Latest raw bars per symbol, loaded on first use and then shared."""
+
+    def __init__(self, s3_client, raw_prefix: str = "raw/", io_workers: int = 8):
+        self.s3 = s3_client
+        self.raw_prefix = raw_prefix
+        self.io_workers = io_workers
+        self.frames: Dict[str, Optional[pd.DataFrame]] = {}
+        self.keys: Dict[str, Optional[str]] = {}
+        self.objects: Dict[str, Optional[dict]] = {}
+        self.reads = 0
+        self._fields: Dict[tuple, pd.DataFrame] = {}
+        self._alignments: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "DataPanel":
+        """A panel over in-memory frames (tests, benchmarks)."""
+        panel = cls(s3_client=None)
+        panel.frames = dict(frames)
+        panel.keys = {symbol: None for symbol in frames}
+        return panel
+
+    def preload(self, symbols: Iterable[str]) -> "DataPanel":
+        """Load every not-yet-loaded symbol concurrently."""
+        missing = [s for s in dict.fromkeys(symbols) if s not in self.frames]
+        if missing:
+            with ThreadPoolExecutor(min(self.io_workers, len(missing))) as pool:
+                list(pool.map(self.get, missing))
+        return self
+
+    def locate(self, symbols: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Listing entry (``Key``, ``ETag``) of each symbol's latest raw object, unread."""
+        missing = [s for s in dict.fromkeys(symbols)
+                   if s not in self.objects and s not in self.frames]
+        if missing and self.s3 is not None:
+            with ThreadPoolExecutor(min(self.io_workers, len(missing))) as pool:
+                found = pool.map(
+                    lambda s: self.s3.get_latest_object(f"{self.raw_prefix}{s}/"), missing)
+                for symbol, obj in zip(missing, found):
+                    self.objects[symbol] = obj
+        return {s: self.objects.get(s) for s in symbols}
+
+    def get(self, symbol: str) -> Optional[pd.DataFrame]:
+        """The symbol's latest bars, or None if it has no raw data."""
+        if symbol in self.frames:
+            return self.frames[symbol]
+        if symbol in self.objects:
+            obj = self.objects[symbol]
+        else:
+            obj = self.s3.get_latest_object(f"{self.raw_prefix}{symbol}/") if self.s3 else None
+        key = obj["Key"] if obj else None
+        df = self.s3.read_parquet(key) if key else None
+        with self._lock:
+            if symbol not in self.frames:
+                self.reads += key is not None
+                self.keys[symbol] = key
+                self.objects[symbol] = obj
+                self.frames[symbol] = df
+                self._fields.clear()
+                self._alignments.clear()
+            return self.frames[symbol]
+
+    def key(self, symbol: str) -> Optional[str]:
+        self.get(symbol)
+        return self.keys[symbol]
+
+    def field(self, column: str, symbols: Iterable[str]) -> pd.DataFrame:
+        """``column`` for ``symbols``, outer-joined on time; symbols without data are left out."""
+        return self.fields([column], symbols)[column]
+
+    def fields(self, columns: Iterable[str], symbols: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """Several aligned columns at once, reading each symbol's frame a single time."""
+        symbols = tuple(symbols)
+        missing = [c for c in columns if (c, symbols) not in self._fields]
+        if missing:
+            index, present, positions = self._alignment(symbols)
+            values = np.full((len(missing), len(index), len(present)), np.nan)
+            column_positions = {}
+            for j, (symbol, rows) in enumerate(zip(present, positions)):
+                frame = self.frames[symbol]
+                # Frames almost always share one column layout: look it up once
+                layout = tuple(frame.columns)
+                if layout not in column_positions:
+                    column_positions[layout] = frame.columns.get_indexer(missing)
+                    if (column_positions[layout] < 0).any():
+                        raise KeyError(f"{symbol} is missing columns {missing}")
+                cols = column_positions[layout]
+                try:
+                    block = frame.to_numpy(dtype="float64")[:, cols]
+                except (TypeError, ValueError):
+                    # Non-numeric extra columns: convert only the requested ones
+                    block = frame[missing].to_numpy(dtype="float64")
+                values[:, rows, j] = block.T
+            for i, column in enumerate(missing):
+                self._fields[(column, symbols)] = pd.DataFrame(
+                    values[i], index=index, columns=present)
+        return {c: self._fields[(c, symbols)] for c in columns}
+
+    def _alignment(self, symbols: tuple):
+        """Union time index plus each symbol's row positions in it, computed once per symbol set."""
+        if symbols not in self._alignments:
+            self.preload(symbols)
+            present = [s for s in symbols if self.frames.get(s) is not None]
+            if not present:
+                return pd.Index([]), [], []
+            indexes = [self.frames[s].index for s in present]
+            index = indexes[0].append(indexes[1:]).unique().sort_values()
+            index.name = indexes[0].name
+            positions = [index.get_indexer(ix) for ix in indexes]
+            self._alignments[symbols] = (index, present, positions)
+        return self._alignments[symbols]
@@ -0,0 +1,59 @@
+"""Shape-preserving downsampling for charts.
+
+``lttb_indices`` implements Largest-Triangle-Three-Buckets (Steinarsson,
+2013): the series is split into equal buckets and from each one the point
+forming the largest triangle with the previously kept point and the next
+bucket's average is kept, so peaks, troughs and trend changes survive a
+reduction to a few thousand points. ``downsample_ohlc`` uses those points as
+bucket boundaries for OHLCV bars, aggregating each bucket into one bar so
+highs and lows are never dropped.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(y: np.ndarray, n_out: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """Positions of the ``n_out`` points LTTB keeps (always including the first and last)."""
+    y = pd.Series(np.asarray(y, dtype="float64")).ffill().bfill().to_numpy()
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype="float64") if x is None else np.asarray(x, dtype="float64")
+
+    # Bucket i covers [edges[i], edges[i + 1]); the first and last points are their own buckets
+    edges = (np.floor(np.arange(n_out - 1) * (n - 2) / (n_out - 2)) + 1).astype(int)
+    edges[-1] = n - 1
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_ohlc(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """At most ``max_points`` bars: LTTB on close picks bucket starts, one bar per bucket."""
+    if len(df) <= max_points:
+        return df
+    x = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else None
+    starts = lttb_indices(df["close"].to_numpy(), max_points, x)
+    bucket = np.searchsorted(starts, np.arange(len(df)), side="right") - 1
+    grouped = df.groupby(bucket, sort=True)
+    out = pd.DataFrame({
+        "open": grouped["open"].first(),
+        "high": grouped["high"].max(),
+        "low": grouped["low"].min(),
+        "close": grouped["close"].last(),
+        "volume": grouped["volume"].sum(),
+    })
+    out.index = df.index[starts]
+    return out
@@ -0,0 +1,273 @@
+"""Embedded DuckDB SQL engine over the parquet lake.
+
+The raw, prediction and feature parquet files are mirrored from S3 into a
+local cache and exposed as DuckDB views, so ad hoc SQL runs at columnar
+speed on one machine with no Redshift cluster::
+
+    engine = DuckDBEngine.from_runtime(get_runtime("config.yaml"))
+    engine.query("SELECT symbol, max(close) FROM raw_latest GROUP BY symbol")
+
+The cache is laid out hive-style (``raw/symbol=AAPL/snapshot=20240105_2100/
+data.parquet``, ``predictions/symbol=AAPL/month=2024-01/part.parquet``), so
+filters on ``symbol``, ``snapshot`` and ``month`` prune whole files before
+any is opened, and DuckDB scans the remaining files in parallel on
+``duckdb.threads`` threads. ``sync`` only downloads objects whose ETag
+changed since the last sync.
+
+Views:
+
+- ``raw``: every raw snapshot (``symbol``, ``snapshot`` plus the bar columns)
+- ``raw_latest``: each symbol's most recent raw snapshot only
+- ``predictions``: the partitioned predictions dataset (``symbol``, ``month``)
+- ``prediction_snapshots``: full-mode prediction files (``symbol``, ``snapshot``)
+- ``features``: feature snapshots, when any have been written
+
+A view exists only once its dataset has files.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from utils.tracing import span
+
+# view name -> (paths config key, shape of the key below the prefix, hive partition columns)
+DATASETS = {
+    "raw": ("raw_prefix", "{symbol}/{snapshot}.parquet", ("symbol", "snapshot")),
+    "features": ("feature_prefix", "{symbol}/{snapshot}.parquet", ("symbol", "snapshot")),
+    "prediction_snapshots": ("pred_prefix", "{symbol}/{snapshot}.parquet", ("symbol", "snapshot")),
+    "predictions": ("pred_prefix", "{symbol}/dataset/month={month}/part.parquet",
+                    ("symbol", "month")),
+}
+
+DEFAULT_PREFIXES = {
+    "raw_prefix": "raw/", "feature_prefix": "features/", "pred_prefix": "predictions/"}
+
+
+def _local_path(dataset: str, relative_key: str) -> Optional[str]:
+    """Cache path (relative to the cache root) for an object key below its dataset prefix."""
+    parts = relative_key.split("/")
+    if dataset == "predictions":
+        if len(parts) != 4 or parts[1] != "dataset" or not parts[2].startswith("month="):
+            return None
+        if parts[3] != "part.parquet":
+            return None
+        return f"predictions/symbol={parts[0]}/{parts[2]}/part.parquet"
+    if len(parts) != 2 or not parts[1].endswith(".parquet"):
+        return None
+    return f"{dataset}/symbol={parts[0]}/snapshot={parts[1][:-len('.parquet')]}/data.parquet"
+
+
+def _sql_str(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBEngine:
+    """Local SQL over the S3 parquet datasets.
+
+    ``query`` syncs the whole cache on first use (``auto_sync``) unless
+    called with ``sync=False``, as callers that just synced the symbols they
+    query do; call ``sync`` again to pick up newer objects.
+    """
+
+    def __init__(self, s3_client, paths: Optional[dict] = None, cache_dir: str = "data/lake",
+                 threads: int = 0, memory_limit: Optional[str] = None,
+                 io_workers: int = 8, auto_sync: bool = True):
+        self.s3 = s3_client
+        self.prefixes = {**DEFAULT_PREFIXES, **(paths or {})}
+        self.cache_dir = Path(cache_dir)
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.io_workers = io_workers
+        self.auto_sync = auto_sync
+        self._conn = None
+        self._synced = False
+        self._lock = threading.Lock()
+        self._state_path = self.cache_dir / "_sync.json"
+        self._state: Dict[str, dict] = (
+            json.loads(self._state_path.read_text()) if self._state_path.exists() else {}
+        )
+
+    @classmethod
+    def from_runtime(cls, runtime) -> "DuckDBEngine":
+        config = runtime.config
+        duck_cfg = config.get("duckdb", {})
+        return cls(
+            runtime.s3,
+            paths=config.get("paths", {}),
+            cache_dir=duck_cfg.get("cache_dir", "data/lake"),
+            threads=duck_cfg.get("threads", 0),
+            memory_limit=duck_cfg.get("memory_limit") or None,
+            io_workers=config.get("pipeline", {}).get("io_workers", 8),
+            auto_sync=duck_cfg.get("auto_sync", True),
+        )
+
+    # -- cache -----------------------------------------------------------------
+
+    def sync(self, datasets: Optional[Iterable[str]] = None,
+             symbols: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Mirror new or changed objects into the cache; returns files downloaded per dataset.
+
+        Restricting ``symbols`` lists and downloads only those symbols'
+        prefixes. Cached files whose objects were deleted are removed.
+        """
+        datasets = list(datasets or DATASETS)
+        unknown = set(datasets) - set(DATASETS)
+        if unknown:
+            raise ValueError(f"Unknown datasets: {sorted(unknown)}")
+
+        # Datasets sharing a prefix (the two prediction layouts) share one listing
+        by_prefix: Dict[str, List[str]] = {}
+        for name in datasets:
+            by_prefix.setdefault(self.prefixes[DATASETS[name][0]], []).append(name)
+        scopes = [
+            (prefix, names, prefix + (f"{symbol}/" if symbol else ""))
+            for prefix, names in by_prefix.items()
+            for symbol in (list(dict.fromkeys(symbols)) if symbols else [None])
+        ]
+
+        downloads, listed, live = [], [], set()
+        for prefix, names, scope in scopes:
+            listed.append((scope, names))
+            for obj in self.s3.list_objects(scope):
+                for name in names:
+                    local = _local_path(name, obj["Key"][len(prefix):])
+                    if local is None:
+                        continue
+                    live.add(local)
+                    cached = self._state.get(local)
+                    if cached is None or cached["etag"] != obj.get("ETag") \
+                            or not (self.cache_dir / local).exists():
+                        downloads.append((name, local, obj["Key"], obj.get("ETag")))
+
+        stale = [
+            local for local, entry in self._state.items()
+            if local not in live and any(
+                entry["key"].startswith(scope) and entry["dataset"] in names
+                for scope, names in listed
+            )
+        ]
+        for local in stale:
+            (self.cache_dir / local).unlink(missing_ok=True)
+            del self._state[local]
+
+        counts = {name: 0 for name in datasets}
+        if downloads:
+            with span("duckdb.sync", rows=len(downloads)):
+                with ThreadPoolExecutor(min(self.io_workers, len(downloads))) as pool:
+                    for name, local, key, etag in pool.map(lambda d: self._download(*d), downloads):
+                        self._state[local] = {"key": key, "etag": etag, "dataset": name}
+                        counts[name] += 1
+        if downloads or stale:
+            self._save_state()
+            self._create_views()
+        if len(datasets) == len(DATASETS) and not symbols:
+            self._synced = True
+        return counts
+
+    def _download(self, name: str, local: str, key: str, etag: Optional[str]):
+        path = self.cache_dir / local
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(self.s3.get_bytes(key))
+        os.replace(tmp, path)
+        return name, local, key, etag
+
+    def _save_state(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._state, indent=0, sort_keys=True))
+        os.replace(tmp, self._state_path)
+
+    def files(self, dataset: str, symbols: Optional[Iterable[str]] = None) -> List[Path]:
+        """Cached files of ``dataset``, optionally only for ``symbols``."""
+        root = self.cache_dir / dataset
+        if symbols is None:
+            return sorted(root.glob("symbol=*/*/*.parquet"))
+        return sorted(f for s in symbols for f in (root / f"symbol={s}").glob("*/*.parquet"))
+
+    # -- SQL -------------------------------------------------------------------
+
+    @property
+    def connection(self):
+        """The DuckDB connection (created on first use, with the dataset views)."""
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    import duckdb
+
+                    conn = duckdb.connect(":memory:")
+                    if self.threads:
+                        conn.execute(f"SET threads = {int(self.threads)}")
+                    if self.memory_limit:
+                        conn.execute(f"SET memory_limit = {_sql_str(self.memory_limit)}")
+                    self._conn = conn
+                    self._create_views()
+        return self._conn
+
+    @staticmethod
+    def _scan(source: str, partitions) -> str:
+        """``read_parquet`` over ``source`` (a glob or list literal), partition columns as text."""
+        types = ", ".join(f"{_sql_str(c)}: 'VARCHAR'" for c in partitions)
+        return (f"read_parquet({source}, hive_partitioning = true, "
+                f"hive_types = {{{types}}}, union_by_name = true)")
+
+    def _create_views(self):
+        if self._conn is None:
+            return
+        for name, (_, _, partitions) in DATASETS.items():
+            root = (self.cache_dir / name).as_posix()
+            depth = "/".join("*" for _ in partitions)
+            if self.files(name):
+                scan = self._scan(_sql_str(f"{root}/{depth}/*.parquet"), partitions)
+                self._conn.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {scan}")
+            else:
+                self._conn.execute(f"DROP VIEW IF EXISTS {name}")
+
+        # The newest snapshot per symbol, listed explicitly so older files are never opened
+        latest = [
+            max(d.glob("snapshot=*/data.parquet"))
+            for d in sorted((self.cache_dir / "raw").glob("symbol=*"))
+            if any(d.glob("snapshot=*/data.parquet"))
+        ]
+        if latest:
+            files = "[" + ", ".join(_sql_str(f.as_posix()) for f in latest) + "]"
+            scan = self._scan(files, DATASETS["raw"][2])
+            self._conn.execute(f"CREATE OR REPLACE VIEW raw_latest AS SELECT * FROM {scan}")
+        else:
+            self._conn.execute("DROP VIEW IF EXISTS raw_latest")
+
+    def tables(self) -> List[str]:
+        """Views available for querying."""
+        rows = self.connection.execute(
+            "SELECT view_name FROM duckdb_views() WHERE NOT internal ORDER BY view_name"
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def query(self, sql: str, params: Optional[list] = None, sync: bool = True) -> pd.DataFrame:
+        """Run ``sql`` (``?`` placeholders bound from ``params``) and return a DataFrame.
+
+        ``sync=False`` queries the cache as it is, without the first-use sync.
+        """
+        if sync and self.auto_sync and not self._synced:
+            self.sync()
+        conn = self.connection
+        with span("duckdb.query") as sp:
+            # A cursor per call lets threads query the same views concurrently
+            with self._lock:
+                cursor = conn.cursor()
+            try:
+                df = cursor.execute(sql, params or []).df()
+            finally:
+                cursor.close()
+            sp.set(rows=len(df))
+        return df
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,255 @@
+"""In-process stand-in for a boto3 S3 client, with injectable network conditions.
+
+``FakeS3`` implements the subset of the S3 API the pipeline uses (get with
+``Range``, put, head, delete, paginated ``list_objects_v2`` with
+``Delimiter``/``StartAfter``/``MaxKeys``, multipart uploads) over an
+in-memory dict, so ``S3Client(..., client=FakeS3())`` runs without AWS.
+
+For I/O benchmarks it can also behave like a remote bucket:
+
+- ``latency``: seconds per request (plus up to ``jitter`` more);
+- ``bandwidth``: bytes/second per transfer, and ``link_bandwidth``: bytes/
+  second shared by all concurrent transfers (they queue for the link);
+- ``max_rps``: requests per second before requests fail with 503
+  ``SlowDown``, and ``throttle_rate``: probability any request does;
+- ``page_size``: keys per ``list_objects_v2`` page (S3 returns 1,000);
+- ``retries``: throttled requests retried inside the client with jittered
+  exponential backoff from ``retry_backoff`` seconds, as botocore does,
+  before ``SlowDown`` reaches the caller.
+
+Randomness comes from a seeded generator, so a run is reproducible.
+``calls`` counts requests by operation and ``stats`` bytes moved, throttles
+and time spent waiting.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import Counter
+from io import BytesIO
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+
+def _error(code: str, message: str, operation: str, status: int = 400) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": message},
+         "ResponseMetadata": {"HTTPStatusCode": status}},
+        operation,
+    )
+
+
+class FakeS3:
+    """Minimal in-memory S3 client with optional latency, bandwidth and throttling."""
+
+    def __init__(self, page_size: int = 1000, latency: float = 0.0, jitter: float = 0.0,
+                 bandwidth: Optional[float] = None, link_bandwidth: Optional[float] = None,
+                 max_rps: Optional[float] = None, throttle_rate: float = 0.0,
+                 retries: int = 0, retry_backoff: float = 0.05, seed: int = 0):
+        self.objects = {}
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.link_bandwidth = link_bandwidth
+        self.max_rps = max_rps
+        self.throttle_rate = throttle_rate
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.calls = Counter()
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._uploads = {}
+        self._link_free = 0.0
+        self._tokens = max_rps or 0.0
+        self._refilled = time.monotonic()
+
+    # -- network model ---------------------------------------------------------
+
+    def _request(self, operation: str):
+        """Count the call, apply per-request latency and throttling (with client-side retries)."""
+        for attempt in range(self.retries + 1):
+            try:
+                return self._attempt(operation)
+            except ClientError:
+                if attempt == self.retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                    backoff = self._rng.uniform(0, self.retry_backoff * 2 ** attempt)
+                self._wait(backoff)
+
+    def _attempt(self, operation: str):
+        with self._lock:
+            self.calls[operation] += 1
+            throttled = self._rng.random() < self.throttle_rate if self.throttle_rate else False
+            if self.max_rps:
+                now = time.monotonic()
+                refill = (now - self._refilled) * self.max_rps
+                self._tokens = min(self.max_rps, self._tokens + refill)
+                self._refilled = now
+                if self._tokens < 1:
+                    throttled = True
+                else:
+                    self._tokens -= 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            if throttled:
+                self.stats["throttled"] += 1
+        self._wait(delay)
+        if throttled:
+            raise _error("SlowDown", "Please reduce your request rate.", operation, 503)
+
+    def _transfer(self, n_bytes: int, direction: str):
+        """Sleep for the time ``n_bytes`` take at the per-transfer and shared link rates."""
+        with self._lock:
+            self.stats[direction] += n_bytes
+            now = time.monotonic()
+            done = now + (n_bytes / self.bandwidth if self.bandwidth else 0.0)
+            if self.link_bandwidth:
+                start = max(now, self._link_free)
+                self._link_free = start + n_bytes / self.link_bandwidth
+                done = max(done, self._link_free)
+        self._wait(done - time.monotonic())
+
+    def _wait(self, seconds: float):
+        if seconds > 0:
+            with self._lock:
+                self.stats["wait_seconds"] += seconds
+            time.sleep(seconds)
+
+    # -- objects ---------------------------------------------------------------
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._request("put_object")
+        data = self._bytes(Body)
+        self._transfer(len(data), "bytes_in")
+        self.objects[Key] = data
+        return {"ETag": self._etag(data)}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self._request("get_object")
+        data = self._data(Key, "GetObject")
+        size = len(data)
+        resp = {"ETag": self._etag(data)}
+        if Range:
+            start, end = self._range(Range, size)
+            data = data[start:end + 1]
+            resp["ContentRange"] = f"bytes {start}-{end}/{size}"
+        self._transfer(len(data), "bytes_out")
+        resp.update({"Body": BytesIO(data), "ContentLength": len(data)})
+        return resp
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._request("head_object")
+        data = self._data(Key, "HeadObject")
+        return {"ETag": self._etag(data), "ContentLength": len(data)}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._request("delete_object")
+        self.objects.pop(Key, None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None, StartAfter="",
+                        Delimiter=None, MaxKeys=None, **kwargs):
+        self._request("list_objects_v2")
+        entries = {}  # sort key -> listing entry; keys under a delimiter collapse into one prefix
+        for k in sorted(k for k in list(self.objects) if k.startswith(Prefix) and k > StartAfter):
+            cut = k.find(Delimiter, len(Prefix)) if Delimiter else -1
+            if cut >= 0:
+                entries.setdefault(k[:cut + 1], {"Prefix": k[:cut + 1]})
+            else:
+                body = self.objects[k]
+                entries[k] = {"Key": k, "Size": len(body), "ETag": self._etag(body)}
+        page_size = min(self.page_size, MaxKeys or self.page_size)
+        start = int(ContinuationToken or 0)
+        page = [entries[k] for k in sorted(entries)][start:start + page_size]
+        resp = {
+            "Contents": [e for e in page if "Key" in e],
+            "CommonPrefixes": [e for e in page if "Prefix" in e],
+            "KeyCount": len(page),
+            "IsTruncated": start + page_size < len(entries),
+        }
+        if resp["IsTruncated"]:
+            resp["NextContinuationToken"] = str(start + page_size)
+        return resp
+
+    # -- multipart uploads -----------------------------------------------------
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self._request("create_multipart_upload")
+        with self._lock:
+            upload_id = f"upload-{len(self._uploads) + 1}-{self._rng.getrandbits(32):08x}"
+            self._uploads[upload_id] = {"Key": Key, "parts": {}}
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._request("upload_part")
+        upload = self._upload(UploadId, "UploadPart")
+        data = self._bytes(Body)
+        self._transfer(len(data), "bytes_in")
+        upload["parts"][PartNumber] = data
+        return {"ETag": self._etag(data)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._request("complete_multipart_upload")
+        upload = self._upload(UploadId, "CompleteMultipartUpload")
+        parts = MultipartUpload["Parts"]
+        numbers = [p["PartNumber"] for p in parts]
+        if numbers != sorted(numbers) or any(
+                n not in upload["parts"] or self._etag(upload["parts"][n]) != p["ETag"]
+                for n, p in zip(numbers, parts)):
+            raise _error("InvalidPart", "One or more parts could not be found.",
+                         "CompleteMultipartUpload")
+        chunks = [upload["parts"][n] for n in numbers]
+        self.objects[Key] = b"".join(chunks)
+        del self._uploads[UploadId]
+        # S3's multipart ETag: md5 of the part digests, plus the part count
+        digest = hashlib.md5(b"".join(hashlib.md5(c).digest() for c in chunks)).hexdigest()
+        return {"Bucket": Bucket, "Key": Key, "ETag": f'"{digest}-{len(chunks)}"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._request("abort_multipart_upload")
+        self._uploads.pop(UploadId, None)
+        return {}
+
+    # -- helpers ---------------------------------------------------------------
+
+    def _upload(self, upload_id: str, operation: str) -> dict:
+        if upload_id not in self._uploads:
+            raise _error("NoSuchUpload", upload_id, operation, 404)
+        return self._uploads[upload_id]
+
+    def _data(self, key: str, operation: str) -> bytes:
+        if key not in self.objects:
+            raise _error("NoSuchKey", key, operation, 404)
+        return self.objects[key]
+
+    @staticmethod
+    def _range(header: str, size: int) -> tuple:
+        """Inclusive byte positions of a ``bytes=a-b``, ``bytes=a-`` or ``bytes=-n`` header."""
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", header)
+        if not match or match.groups() == ("", ""):
+            raise _error("InvalidRange", header, "GetObject", 416)
+        first, last = match.groups()
+        if first == "":
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            raise _error("InvalidRange", header, "GetObject", 416)
+        return start, end
+
+    @staticmethod
+    def _bytes(body) -> bytes:
+        if isinstance(body, bytes):
+            return body
+        if isinstance(body, str):
+            return body.encode("utf-8")
+        return body.read()
+
+    @staticmethod
+    def _etag(data: bytes) -> str:
+        return f'"{hashlib.md5(data).hexdigest()}"'
@@ -1,6 +1,9 @@
 import pandas as pd
 
+from utils.tracing import traced
 
+
+@traced("features.add", rows_from_result=True)
 def add_features(df: pd.DataFrame) -> pd.DataFrame:
     """Basic feature engineering for price prediction.
 
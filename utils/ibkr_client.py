@@ -13,9 +13,20 @@ class IBKRClient:
         self.ib.reqMarketDataType(market_data_type)
 
     def get_historical_ohlc(self, symbol: str, bar_size: str, lookback_days: int) -> pd.DataFrame:
-        contract = Stock(symbol, "SMART", "USD")
-        bars = self.ib.reqHistoricalData(
-            contract,
+        bars = self.ib.reqHistoricalData(Stock(symbol, "SMART", "USD"),
+                                         **self._history_args(bar_size, lookback_days))
+        return self._bars_to_df(bars)
+
+    async def get_historical_ohlc_async(self, symbol: str, bar_size: str,
+                                        lookback_days: int) -> pd.DataFrame:
+        """Awaitable variant; many requests can be in flight on the IB event loop."""
+        bars = await self.ib.reqHistoricalDataAsync(Stock(symbol, "SMART", "USD"),
+                                                    **self._history_args(bar_size, lookback_days))
+        return self._bars_to_df(bars)
+
+    @staticmethod
+    def _history_args(bar_size: str, lookback_days: int) -> dict:
+        return dict(
             endDateTime="",
             durationStr=f"{lookback_days} D",
             barSizeSetting=bar_size,
@@ -23,6 +34,9 @@ class IBKRClient:
             useRTH=True,
             formatDate=1
         )
+
+    @staticmethod
+    def _bars_to_df(bars) -> pd.DataFrame:
         df = util.df(bars)
         # Normalize column names
         df.rename(columns={
@@ -0,0 +1,169 @@
+"""Incremental inventory of the bucket's datasets.
+
+``show_s3_contents`` used to list every dataset serially and print every
+key. ``Inventory`` instead:
+
+- enumerates each dataset's symbol prefixes (``raw/AAPL/``, ...) with a
+  delimiter listing, one request per 1,000 symbols rather than per key;
+- lists the symbol prefixes concurrently, folding each listing page by page
+  into a count, byte total and latest key without keeping the keys;
+- caches those summaries in a local JSON file. Later scans list each prefix
+  only from its cached latest key onward, which picks up new snapshots and a
+  rewritten latest object (the current prediction month, a retrained
+  model). Deleted or rewritten older keys are caught by the full relisting
+  done once a prefix's summary is older than ``full_refresh_hours``, or on
+  ``scan(refresh=True)``.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from utils.tracing import span
+
+# Dataset name -> paths key of its prefix
+DATASETS = {
+    "raw": "raw_prefix",
+    "models": "model_prefix",
+    "predictions": "pred_prefix",
+    "features": "feature_prefix",
+}
+DEFAULT_PREFIXES = {"raw_prefix": "raw/", "model_prefix": "model/",
+                    "pred_prefix": "predictions/", "feature_prefix": "features/"}
+COLUMNS = ["dataset", "symbol", "files", "bytes", "latest_key"]
+
+
+@dataclass
+class PrefixSummary:
+    """Object count, bytes and latest key under one prefix."""
+
+    prefix: str
+    count: int = 0
+    bytes: int = 0
+    latest_key: Optional[str] = None
+    latest_size: int = 0
+    listed_at: Optional[str] = None  # time of the last full listing
+
+    def add(self, obj: dict):
+        self.count += 1
+        self.bytes += obj.get("Size", 0)
+        if self.latest_key is None or obj["Key"] > self.latest_key:
+            self.latest_key, self.latest_size = obj["Key"], obj.get("Size", 0)
+
+
+def summarize(objects: Iterable[dict], prefix: str = "") -> PrefixSummary:
+    """Fold a stream of listing entries into a ``PrefixSummary``."""
+    summary = PrefixSummary(prefix, listed_at=datetime.now().isoformat())
+    for obj in objects:
+        summary.add(obj)
+    return summary
+
+
+class Inventory:
+    """Per-symbol object counts, sizes and latest keys for each dataset."""
+
+    def __init__(self, s3_client, paths: Optional[dict] = None,
+                 cache_file: str = "data/inventory.json", io_workers: int = 8,
+                 full_refresh_hours: float = 24):
+        self.s3 = s3_client
+        self.prefixes = {**DEFAULT_PREFIXES, **(paths or {})}
+        self.cache_file = Path(cache_file)
+        self.io_workers = io_workers
+        self.full_refresh = timedelta(hours=full_refresh_hours)
+        self.cache: Dict[str, Dict[str, PrefixSummary]] = {}
+        if self.cache_file.exists():
+            for dataset, entries in json.loads(self.cache_file.read_text()).items():
+                self.cache[dataset] = {
+                    symbol: PrefixSummary(**entry) for symbol, entry in entries.items()}
+        self.listed = 0
+
+    @classmethod
+    def from_runtime(cls, runtime) -> "Inventory":
+        config = runtime.config
+        inv_cfg = config.get("inventory", {})
+        return cls(
+            runtime.s3,
+            paths=config.get("paths", {}),
+            cache_file=inv_cfg.get("cache_file", "data/inventory.json"),
+            io_workers=config.get("pipeline", {}).get("io_workers", 8),
+            full_refresh_hours=inv_cfg.get("full_refresh_hours", 24),
+        )
+
+    def root(self, dataset: str) -> str:
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+        return self.prefixes[DATASETS[dataset]]
+
+    def symbols(self, dataset: str) -> Iterator[str]:
+        """Stream the symbols that have objects in ``dataset`` (delimiter listing only)."""
+        root = self.root(dataset)
+        for prefix in self.s3.iter_prefixes(root):
+            yield prefix[len(root):-1]
+
+    def keys(self, dataset: str, symbol: Optional[str] = None) -> Iterator[str]:
+        """Stream the keys of ``dataset`` (or of one symbol in it) without collecting them."""
+        prefix = self.root(dataset) + (f"{symbol}/" if symbol else "")
+        for obj in self.s3.iter_objects(prefix):
+            yield obj["Key"]
+
+    def scan(self, datasets: Optional[Iterable[str]] = None, refresh: bool = False) -> pd.DataFrame:
+        """Bring the cached summaries up to date and return them (see ``summary``)."""
+        datasets = list(datasets or DATASETS)
+        for dataset in datasets:
+            root = self.root(dataset)
+            cached = self.cache.get(dataset, {})
+            symbols = list(self.symbols(dataset))
+            with span("inventory.scan", rows=len(symbols)):
+                with ThreadPoolExecutor(max(1, min(self.io_workers, len(symbols)))) as pool:
+                    summaries = pool.map(
+                        lambda s: self._scan_prefix(
+                            f"{root}{s}/", None if refresh else cached.get(s)),
+                        symbols,
+                    )
+                    # Symbols no longer listed drop out of the cache
+                    self.cache[dataset] = dict(zip(symbols, summaries))
+            self.listed += len(symbols)
+        self._save()
+        return self.summary(datasets)
+
+    def _scan_prefix(self, prefix: str, cached: Optional[PrefixSummary]) -> PrefixSummary:
+        stale = cached is None or cached.listed_at is None or \
+            datetime.now() - datetime.fromisoformat(cached.listed_at) > self.full_refresh
+        if stale or cached.latest_key is None:
+            return summarize(self.s3.iter_objects(prefix), prefix)
+
+        # Relist from the latest key on: trimming its last character makes
+        # StartAfter include it, so a rewrite of it is seen too
+        summary = PrefixSummary(**asdict(cached))
+        latest, latest_size = cached.latest_key, cached.latest_size
+        for obj in self.s3.iter_objects(prefix, start_after=latest[:-1]):
+            if obj["Key"] == latest:
+                summary.bytes += obj.get("Size", 0) - latest_size
+                summary.latest_size = obj.get("Size", 0)
+            elif obj["Key"] > latest:
+                summary.add(obj)
+        return summary
+
+    def summary(self, datasets: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Cached summaries as a frame: dataset, symbol, files, bytes, latest_key."""
+        rows = [
+            (dataset, symbol, entry.count, entry.bytes, entry.latest_key)
+            for dataset in (datasets or DATASETS)
+            for symbol, entry in sorted(self.cache.get(dataset, {}).items())
+        ]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def _save(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            dataset: {symbol: asdict(entry) for symbol, entry in entries.items()}
+            for dataset, entries in self.cache.items()
+        }
+        tmp = self.cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, indent=0, sort_keys=True))
+        os.replace(tmp, self.cache_file)
@@ -0,0 +1,135 @@
+"""In-process LRU cache of LightGBM boosters loaded from S3."""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import lightgbm as lgb
+
+from utils.tracing import span
+
+
+@dataclass
+class CachedModel:
+    """A loaded booster plus the S3 object version it was built from."""
+
+    key: str
+    etag: str
+    booster: lgb.Booster
+    size_bytes: int
+    validated_at: float
+    compiled: Optional[Any] = None
+
+
+class ModelCache:
+    """LRU cache of boosters keyed by (model key, ETag).
+
+    A cached entry is served without any S3 traffic while it is younger than
+    ``revalidate_seconds``. After that a HEAD request compares ETags: an
+    unchanged object is simply re-stamped, a changed one is reloaded. Total
+    size is capped by the model text size, evicting least recently used
+    entries first.
+    """
+
+    def __init__(self, s3_client, max_bytes: int = 256 * 1024 * 1024,
+                 revalidate_seconds: float = 60.0):
+        self.s3 = s3_client
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[Tuple[str, str], CachedModel]" = OrderedDict()
+        self._etags = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def get(self, key: str) -> CachedModel:
+        """Return the current booster for ``key``, loading it if needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None and now - entry.validated_at < self.revalidate_seconds:
+                self.hits += 1
+                return entry
+
+        if entry is not None:
+            head = self.s3.s3.head_object(Bucket=self.s3.bucket, Key=key)
+            with self._lock:
+                self.revalidations += 1
+                if head["ETag"] == entry.etag:
+                    entry.validated_at = time.monotonic()
+                    self.hits += 1
+                    return entry
+
+        return self._load(key)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one model (or every model) so the next ``get`` reloads it."""
+        with self._lock:
+            for cache_key in list(self._entries):
+                if key is None or cache_key[0] == key:
+                    self._remove(cache_key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "load_seconds_total": self.load_seconds,
+            "load_ms_avg": self.load_seconds / self.misses * 1000 if self.misses else 0.0,
+        }
+
+    def _lookup(self, key: str) -> Optional[CachedModel]:
+        etag = self._etags.get(key)
+        if etag is None:
+            return None
+        entry = self._entries[(key, etag)]
+        self._entries.move_to_end((key, etag))
+        return entry
+
+    def _load(self, key: str) -> CachedModel:
+        start = time.perf_counter()
+        with span("s3.get") as sp:
+            obj = self.s3.s3.get_object(Bucket=self.s3.bucket, Key=key)
+            body = obj["Body"].read()
+            sp.set(bytes=len(body))
+        with span("model.parse", bytes=len(body)):
+            booster = lgb.Booster(model_str=body.decode("utf-8"))
+        elapsed = time.perf_counter() - start
+
+        entry = CachedModel(
+            key=key,
+            etag=obj["ETag"],
+            booster=booster,
+            size_bytes=len(body),
+            validated_at=time.monotonic(),
+        )
+        with self._lock:
+            self.misses += 1
+            self.load_seconds += elapsed
+            for cache_key in [k for k in self._entries if k[0] == key]:
+                self._remove(cache_key)
+            self._entries[(key, entry.etag)] = entry
+            self._etags[key] = entry.etag
+            self._bytes += entry.size_bytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def _remove(self, cache_key: Tuple[str, str]):
+        entry = self._entries.pop(cache_key)
+        self._bytes -= entry.size_bytes
+        if self._etags.get(cache_key[0]) == cache_key[1]:
+            del self._etags[cache_key[0]]
@@ -0,0 +1,128 @@
+"""Per-run performance history and regression detection.
+
+Every daily run appends its metrics (stage and span timings from
+``utils.tracing``, wall-clock, symbols/sec, peak RSS, S3 bytes moved) as one
+parquet file under ``perf_history.path``; the directory reads back as a single
+long-format table (run_id, recorded_at, metric, value).
+
+``detect_regressions`` compares a run against the median of the preceding
+``window`` runs using a robust z-score (deviation over 1.4826 × MAD), so one
+noisy day in the baseline does not mask or fake a slowdown.
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Metrics where a drop, not a rise, is the regression
+HIGHER_IS_BETTER = ("per_second",)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, or None where unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def collect_run_metrics(tracer_summary: Dict[str, dict], wall_seconds: float,
+                        n_symbols: int) -> Dict[str, float]:
+    """Flatten a tracer summary plus run totals into ``{metric: value}``."""
+    metrics = {
+        "run.wall_seconds": wall_seconds,
+        "run.symbols_per_second": n_symbols / wall_seconds if wall_seconds else 0.0,
+        "run.s3_bytes_read": sum(s["bytes"] for n, s in tracer_summary.items() if n == "s3.get"),
+        "run.s3_bytes_written": sum(s["bytes"] for n, s in tracer_summary.items() if n == "s3.put"),
+    }
+    rss = peak_rss_mb()
+    if rss is not None:
+        metrics["run.peak_rss_mb"] = rss
+    for name, s in tracer_summary.items():
+        metrics[f"{name}.total_seconds"] = s["total_s"]
+        metrics[f"{name}.p50_seconds"] = s["p50_s"]
+        metrics[f"{name}.p99_seconds"] = s["p99_s"]
+    return metrics
+
+
+class PerfHistory:
+    """Append-only parquet history of run metrics."""
+
+    def __init__(self, path: str = "logs/perf_history"):
+        self.path = Path(path)
+
+    def record(self, run_id: str, metrics: Dict[str, float],
+               recorded_at: Optional[datetime] = None) -> Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        recorded_at = recorded_at or datetime.now()
+        df = pd.DataFrame({
+            "run_id": run_id,
+            "recorded_at": pd.Timestamp(recorded_at),
+            "metric": list(metrics),
+            "value": [float(v) for v in metrics.values()],
+        })
+        out = self.path / f"run_{run_id}.parquet"
+        df.to_parquet(out, index=False)
+        return out
+
+    def load(self) -> pd.DataFrame:
+        files = sorted(self.path.glob("run_*.parquet"))
+        if not files:
+            return pd.DataFrame(columns=["run_id", "recorded_at", "metric", "value"])
+        return pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+    def detect_regressions(self, run_id: Optional[str] = None, window: int = 14,
+                           min_runs: int = 5, threshold: float = 3.5,
+                           min_change: float = 0.10, min_seconds: float = 0.05) -> List[dict]:
+        """Metrics of ``run_id`` (default: latest run) that regressed against the baseline.
+
+        A metric is flagged when its robust z-score exceeds ``threshold`` in the
+        bad direction and it moved by at least ``min_change`` (relative) from
+        the baseline median. Timing metrics must also move by ``min_seconds``,
+        so sub-millisecond jitter is never reported; metrics with fewer than
+        ``min_runs`` baseline runs are skipped.
+        """
+        history = self.load()
+        if history.empty:
+            return []
+        wide = history.pivot_table(
+            index=["recorded_at", "run_id"], columns="metric", values="value")
+        wide = wide.sort_index()
+        run_ids = wide.index.get_level_values("run_id")
+        if run_id is None:
+            run_id = run_ids[-1]
+        if run_id not in run_ids:
+            raise ValueError(f"No perf history for run {run_id}")
+        position = list(run_ids).index(run_id)
+        current = wide.iloc[position]
+        baseline = wide.iloc[max(0, position - window):position]
+
+        regressions = []
+        for metric, value in current.dropna().items():
+            past = baseline[metric].dropna()
+            if len(past) < min_runs:
+                continue
+            median = past.median()
+            mad = (past - median).abs().median()
+            # Floor the spread so a perfectly flat baseline still needs a real change
+            scale = max(1.4826 * mad, abs(median) * 0.01, 1e-9)
+            sign = -1 if metric.endswith(HIGHER_IS_BETTER) else 1
+            z = sign * (value - median) / scale
+            change = sign * (value - median) / abs(median) if median else float("inf")
+            if metric.endswith("_seconds") and sign * (value - median) < min_seconds:
+                continue
+            if z > threshold and change >= min_change:
+                regressions.append({
+                    "metric": metric,
+                    "value": float(value),
+                    "baseline_median": float(median),
+                    "change_pct": round(100 * change, 1),
+                    "z": round(float(z), 2),
+                    "baseline_runs": len(past),
+                })
+        return sorted(regressions, key=lambda r: -r["z"])
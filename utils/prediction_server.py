@@ -0,0 +1,316 @@
+"""Long-running local prediction service with request micro-batching.
+
+Models and each symbol's latest feature row stay resident in memory. Requests
+arriving within a short window are coalesced per model into a single
+``Booster.predict`` call, so many concurrent callers share one C API round-trip.
+
+Run with::
+
+    python -m utils.prediction_server --port 8765
+
+Endpoints (all on 127.0.0.1):
+
+- ``GET /predict?symbol=AAPL&symbol=MSFT`` - score the latest bar of each symbol
+- ``POST /predict`` - ``{"requests": [{"symbol": "AAPL", "features": {...}}]}``
+- ``GET /metrics`` - p50/p99 latency, throughput, batch sizes, model cache stats
+- ``GET /health``
+"""
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+logger = logging.getLogger("PredictionServer")
+
+
+@dataclass
+class _Request:
+    symbol: str
+    row: Optional[np.ndarray]
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class PredictionService:
+    """Micro-batching scorer over a set of resident per-symbol models.
+
+    ``model_lookup(symbol)`` must return a booster (anything with ``predict``
+    and ``feature_name``). When a request carries no features the symbol's
+    registered latest feature row is scored.
+    """
+
+    def __init__(self, model_lookup: Callable, max_batch: int = 512,
+                 max_wait_ms: float = 1.0, latency_window: int = 50_000):
+        self.model_lookup = model_lookup
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.latest: Dict[str, dict] = {}
+        self.cache_stats: Optional[Callable[[], dict]] = None
+
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._completed_at = deque(maxlen=latency_window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.predict_calls = 0
+        self.started_at = time.time()
+        self._started_perf = time.perf_counter()
+
+    def register_features(self, symbol: str, row: np.ndarray, as_of=None):
+        """Make ``row`` (ordered like the model's features) the symbol's latest bar."""
+        self.latest[symbol] = {"row": np.asarray(row, dtype=np.float64), "as_of": str(as_of)}
+
+    def start(self):
+        self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+
+    def submit(self, symbol: str, features: Optional[dict] = None) -> Future:
+        row = None
+        if features is not None:
+            names = self.model_lookup(symbol).feature_name()
+            row = np.array([float(features[name]) for name in names], dtype=np.float64)
+        request = _Request(symbol=symbol, row=row)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, symbol: str, features: Optional[dict] = None, timeout: float = 5.0) -> dict:
+        return self.submit(symbol, features).result(timeout=timeout)
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            latencies = np.array(self._latencies, dtype=np.float64)
+            now = time.perf_counter()
+            window = max(min(10.0, now - self._started_perf), 1e-9)
+            recent = sum(1 for t in self._completed_at if now - t <= window)
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if latencies.size else (0.0, 0.0)
+        metrics = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "predict_calls": self.predict_calls,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "throughput_rps": recent / window,
+            "uptime_seconds": time.time() - self.started_at,
+            "symbols": len(self.latest),
+        }
+        if self.cache_stats is not None:
+            metrics["model_cache"] = self.cache_stats()
+        return metrics
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._score(batch)
+
+    def _score(self, batch: List[_Request]):
+        # Group by model object rather than symbol so symbols sharing a model
+        # are scored in the same predict call.
+        groups: Dict[int, tuple] = {}
+        for request in batch:
+            try:
+                model = self.model_lookup(request.symbol)
+            except Exception as e:
+                request.future.set_exception(e)
+                continue
+            groups.setdefault(id(model), (model, []))[1].append(request)
+
+        for model, requests in groups.values():
+            try:
+                rows = []
+                for request in requests:
+                    if request.row is not None:
+                        rows.append(request.row)
+                    elif request.symbol in self.latest:
+                        rows.append(self.latest[request.symbol]["row"])
+                    else:
+                        raise KeyError(f"No features loaded for {request.symbol}")
+                probs = model.predict(np.vstack(rows))
+                self.predict_calls += 1
+                for request, prob in zip(requests, probs):
+                    as_of = self.latest[request.symbol]["as_of"] if request.row is None else None
+                    request.future.set_result(
+                        {"symbol": request.symbol, "p_up": float(prob), "as_of": as_of}
+                    )
+            except Exception as e:
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+        done = time.perf_counter()
+        with self._stats_lock:
+            self.batches += 1
+            for request in batch:
+                self.requests += 1
+                if request.future.exception() is not None:
+                    self.errors += 1
+                self._latencies.append(done - request.enqueued)
+                self._completed_at.append(done)
+
+
+def service_from_agent(predict_agent, symbols: List[str], **kwargs) -> PredictionService:
+    """Build a service whose models come from ``predict_agent``'s model cache."""
+    service = PredictionService(predict_agent.scorer, **kwargs)
+    service.cache_stats = predict_agent.model_cache.stats
+    refresh_features(service, predict_agent, symbols)
+    return service
+
+
+def refresh_features(service: PredictionService, predict_agent, symbols: List[str]):
+    """Reload each symbol's latest feature row from S3 into the service."""
+    for symbol in symbols:
+        try:
+            X = predict_agent.load_features(symbol)
+            if X is None:
+                continue
+            names = service.model_lookup(symbol).feature_name()
+            service.register_features(symbol, X[names].iloc[-1].to_numpy(), as_of=X.index[-1])
+        except Exception as e:
+            logger.error(f"Could not load {symbol}: {e}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this Nagle's
+    # algorithm plus delayed ACKs adds ~40ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    service: PredictionService = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/predict":
+            symbols = parse_qs(url.query).get("symbol", [])
+            self._respond_predictions([(s.upper(), None) for s in symbols])
+        elif url.path == "/metrics":
+            self._send(200, self.service.metrics())
+        elif url.path == "/health":
+            self._send(200, {"status": "ok"})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/predict":
+            self._send(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            items = payload.get("requests", [payload])
+            requests = [(item["symbol"].upper(), item.get("features")) for item in items]
+        except (ValueError, KeyError, AttributeError) as e:
+            self._send(400, {"error": f"bad request: {e}"})
+            return
+        self._respond_predictions(requests)
+
+    def _respond_predictions(self, requests):
+        if not requests:
+            self._send(400, {"error": "no symbols given"})
+            return
+        try:
+            futures = [self.service.submit(symbol, features) for symbol, features in requests]
+            results = [f.result(timeout=5.0) for f in futures]
+        except Exception as e:
+            self._send(422, {"error": str(e)})
+            return
+        self._send(200, {"predictions": results})
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def make_server(service: PredictionService, host: str = "127.0.0.1",
+                port: int = 8765) -> ThreadingHTTPServer:
+    handler = type("PredictionHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve PredictAgent models over local HTTP.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=1.0)
+    parser.add_argument("--refresh-seconds", type=float, default=300.0,
+                        help="How often to reload the latest features from S3")
+    args = parser.parse_args(argv)
+
+    from agents.predict_agent import PredictAgent
+
+    agent = PredictAgent(args.config)
+    symbols = agent.config["symbols"]
+    service = service_from_agent(agent, symbols, max_batch=args.max_batch,
+                                 max_wait_ms=args.max_wait_ms)
+    service.start()
+
+    def _refresh_loop():
+        while True:
+            time.sleep(args.refresh_seconds)
+            refresh_features(service, agent, symbols)
+
+    threading.Thread(target=_refresh_loop, name="feature-refresh", daemon=True).start()
+
+    server = make_server(service, args.host, args.port)
+    logger.info(f"Serving {len(service.latest)} symbols on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        logger.info(f"Final metrics: {service.metrics()}")
+        logger.info(f"Model cache: {agent.model_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
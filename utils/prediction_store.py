@@ -0,0 +1,88 @@
+"""Partitioned, deduplicated per-symbol predictions dataset in S3."""
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from utils.s3_client import S3Client
+
+
+class PredictionStore:
+    """Append-only view of ``<pred_prefix><SYMBOL>/dataset/``.
+
+    Rows are partitioned by calendar month (``month=YYYY-MM/part.parquet``)
+    and indexed by bar time, so appending a bar only rewrites the partition it
+    falls in. A small ``_manifest.json`` next to the partitions records the
+    last scored bar and the model version that scored it, which is all an
+    incremental run needs to decide what to score.
+    """
+
+    def __init__(self, s3_client: S3Client, pred_prefix: str):
+        self.s3 = s3_client
+        self.pred_prefix = pred_prefix
+
+    def dataset_prefix(self, symbol: str) -> str:
+        return f"{self.pred_prefix}{symbol}/dataset/"
+
+    def _manifest_key(self, symbol: str) -> str:
+        return f"{self.dataset_prefix(symbol)}_manifest.json"
+
+    def _partition_key(self, symbol: str, month: str) -> str:
+        return f"{self.dataset_prefix(symbol)}month={month}/part.parquet"
+
+    def read_manifest(self, symbol: str) -> Optional[dict]:
+        return self.s3.read_json(self._manifest_key(symbol))
+
+    def append(self, symbol: str, preds: pd.DataFrame, model_version: str) -> dict:
+        """Upsert ``preds`` (indexed by time, column ``p_up``) and update the manifest.
+
+        Rows already present for the same bar time are replaced, so re-scoring
+        a bar never produces duplicates.
+        """
+        manifest = self.read_manifest(symbol) or {"partitions": []}
+        if preds.empty:
+            return manifest
+
+        preds = preds.copy()
+        preds.index = pd.to_datetime(preds.index)
+        preds.index.name = "time"
+        preds["model_version"] = model_version
+        preds["scored_at"] = datetime.utcnow().isoformat()
+
+        months = preds.index.strftime("%Y-%m")
+        for month in sorted(set(months)):
+            key = self._partition_key(symbol, month)
+            new_rows = preds[months == month]
+            if month in manifest["partitions"]:
+                existing = self.s3.read_parquet(key)
+                existing.index = pd.to_datetime(existing.index)
+                new_rows = pd.concat([existing, new_rows])
+                new_rows = new_rows[~new_rows.index.duplicated(keep="last")].sort_index()
+            self.s3.write_parquet(new_rows, key)
+
+        last_time = preds.index.max()
+        if manifest.get("last_time") and pd.Timestamp(manifest["last_time"]) > last_time:
+            last_time = pd.Timestamp(manifest["last_time"])
+            last_p_up = manifest["last_p_up"]
+        else:
+            last_p_up = float(preds.loc[last_time, "p_up"])
+
+        manifest = {
+            "symbol": symbol,
+            "last_time": last_time.isoformat(),
+            "last_p_up": last_p_up,
+            "model_version": model_version,
+            "partitions": sorted(set(manifest["partitions"]) | set(months)),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        self.s3.write_json(manifest, self._manifest_key(symbol))
+        return manifest
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        """Load the full predictions dataset for ``symbol``."""
+        manifest = self.read_manifest(symbol)
+        if not manifest or not manifest["partitions"]:
+            return pd.DataFrame(columns=["p_up", "model_version", "scored_at"])
+        frames = [self.s3.read_parquet(self._partition_key(symbol, month))
+                  for month in manifest["partitions"]]
+        return pd.concat(frames).sort_index()
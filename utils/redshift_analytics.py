@@ -1,156 +1,172 @@
 """Analytics queries for Redshift data analysis."""
-import boto3
 import pandas as pd
-from utils.s3_client import S3Client
-import yaml
-from datetime import datetime
+from typing import Optional
+from utils.analytics_state import AnalyticsState
+from utils.correlation import correlate
+from utils.data_panel import DataPanel
+from utils.runtime import RuntimeContext, get_runtime
+from utils.vector_analytics import panel_stats
+
+# analyze_symbol's output fields after "symbol" and "file", in report order
+ANALYSIS_FIELDS = [
+    "data_points", "date_range",
+    "current_price", "price_min", "price_max", "price_avg",
+    "total_return", "daily_return_avg", "daily_return_std", "max_daily_gain", "max_daily_loss",
+    "volatility", "avg_price_range", "max_intraday_range",
+    "avg_volume", "total_volume",
+    "updays", "downdays", "win_rate",
+]
 
 
 class RedshiftAnalytics:
     """Advanced analytics for trading data."""
 
-    def __init__(self, config_path: str = "config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)
-        
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        self.runtime = runtime or get_runtime(config_path)
+        self.config = self.runtime.config
+
         aws_cfg = self.config["aws"]
-        self.s3_client = S3Client(region=aws_cfg["region"], bucket=aws_cfg["s3_bucket"])
+        self.s3_client = self.runtime.s3
         self.s3_bucket = aws_cfg["s3_bucket"]
         self.region = aws_cfg["region"]
+        self._engine = None
+        self.new_panel()
+
+    def sql(self, query: str, params: Optional[list] = None) -> pd.DataFrame:
+        """Ad hoc SQL over the parquet lake via the embedded DuckDB engine."""
+        if self._engine is None:
+            from utils.duckdb_engine import DuckDBEngine
+
+            self._engine = DuckDBEngine.from_runtime(self.runtime)
+        return self._engine.query(query, params)
+
+    def new_panel(self) -> DataPanel:
+        """Start a fresh panel so the next queries see the latest raw data."""
+        self.panel = DataPanel(
+            self.s3_client,
+            raw_prefix=self.config.get("paths", {}).get("raw_prefix", "raw/"),
+            io_workers=self.config.get("pipeline", {}).get("io_workers", 8),
+        )
+        self._stats = {}
+        return self.panel
+
+    def symbol_stats(self, symbols: list) -> pd.DataFrame:
+        """Every per-symbol metric for ``symbols``, computed in one vectorized pass.
+
+        Cached per panel, so the report's sections share a single computation.
+        """
+        key = tuple(symbols)
+        if key not in self._stats:
+            self._stats[key] = panel_stats(self.panel, symbols)
+        return self._stats[key]
+
+    def _stats_row(self, symbol: str) -> Optional[pd.Series]:
+        for stats in self._stats.values():
+            if symbol in stats.index:
+                return stats.loc[symbol]
+        stats = self.symbol_stats([symbol])
+        return stats.loc[symbol] if symbol in stats.index else None
 
     def analyze_symbol(self, symbol: str) -> dict:
         """Comprehensive analysis of a symbol."""
-        prefix = f"raw/{symbol}/"
-        latest_key = self.s3_client.get_latest_key(prefix)
-        
-        if not latest_key:
+        row = self._stats_row(symbol)
+        if row is None:
             return {"error": f"No data found for {symbol}"}
-        
-        df = self.s3_client.read_parquet(latest_key)
-        
-        # Calculate metrics
-        returns = df['close'].pct_change()
-        price_range = df['high'] - df['low']
-        
-        # Handle date formatting (index might already be date or datetime)
-        first_date = df.index[0]
-        last_date = df.index[-1]
-        if hasattr(first_date, 'date'):
-            first_date = first_date.date()
-        if hasattr(last_date, 'date'):
-            last_date = last_date.date()
-        
-        analysis = {
-            "symbol": symbol,
-            "file": latest_key,
-            "data_points": len(df),
-            "date_range": f"{first_date} to {last_date}",
-            
-            # Price metrics
-            "current_price": float(df['close'].iloc[-1]),
-            "price_min": float(df['close'].min()),
-            "price_max": float(df['close'].max()),
-            "price_avg": float(df['close'].mean()),
-            
-            # Returns
-            "total_return": float((df['close'].iloc[-1] / df['close'].iloc[0] - 1) * 100),
-            "daily_return_avg": float(returns.mean() * 100),
-            "daily_return_std": float(returns.std() * 100),
-            "max_daily_gain": float(returns.max() * 100),
-            "max_daily_loss": float(returns.min() * 100),
-            
-            # Volatility
-            "volatility": float(returns.std() * 100),
-            "avg_price_range": float(price_range.mean()),
-            "max_intraday_range": float(price_range.max()),
-            
-            # Volume
-            "avg_volume": float(df['volume'].mean()),
-            "total_volume": float(df['volume'].sum()),
-            
-            # Trend
-            "updays": int((returns > 0).sum()),
-            "downdays": int((returns < 0).sum()),
-            "win_rate": float((returns > 0).sum() / len(returns) * 100),
-        }
-        
+        analysis = {"symbol": symbol, "file": self.panel.key(symbol)}
+        analysis.update(row[ANALYSIS_FIELDS].to_dict())
+        analysis["data_points"] = int(analysis["data_points"])
+        analysis["updays"] = int(analysis["updays"])
+        analysis["downdays"] = int(analysis["downdays"])
         return analysis
 
     def compare_symbols(self, symbols: list) -> pd.DataFrame:
         """Compare multiple symbols side by side."""
-        results = []
-        for symbol in symbols:
-            analysis = self.analyze_symbol(symbol)
-            results.append(analysis)
-        
-        df = pd.DataFrame(results)
-        return df[["symbol", "current_price", "total_return", "volatility", 
-                   "daily_return_avg", "avg_volume", "win_rate"]]
-
-    def correlation_analysis(self, symbols: list) -> dict:
-        """Analyze correlations between symbols."""
-        price_data = {}
-        
-        for symbol in symbols:
-            prefix = f"raw/{symbol}/"
-            latest_key = self.s3_client.get_latest_key(prefix)
-            if latest_key:
-                df = self.s3_client.read_parquet(latest_key)
-                price_data[symbol] = df['close']
-        
-        if not price_data:
+        columns = ["current_price", "total_return", "volatility",
+                   "daily_return_avg", "avg_volume", "win_rate"]
+        # Explicit columns keep the shape when no symbol has data (empty stats frame)
+        df = self.symbol_stats(symbols).reindex(index=symbols, columns=columns)
+        df = df.reset_index(drop=True)
+        df.insert(0, "symbol", symbols)
+        return df
+
+    def correlation_analysis(self, symbols: list, matrix_path: Optional[str] = None) -> dict:
+        """Return each symbol's top-k most and least correlated partners.
+
+        Settings come from ``analytics.correlation``; the full matrix is only
+        written (as ``.npy``) when ``matrix_path`` is given.
+        """
+        prices_df = self.panel.field("close", symbols)
+        if prices_df.empty:
             return {"error": "No data available"}
-        
-        prices_df = pd.DataFrame(price_data)
-        correlations = prices_df.corr().to_dict()
-        
+
+        corr_cfg = self.config.get("analytics", {}).get("correlation", {})
+        result = correlate(
+            prices_df,
+            top_k=corr_cfg.get("top_k", 5),
+            window=corr_cfg.get("window"),
+            block_size=corr_cfg.get("block_size", 512),
+            min_periods=corr_cfg.get("min_periods", 10),
+            matrix_path=matrix_path,
+            matrix_dtype=corr_cfg.get("matrix_dtype", "float16"),
+        )
         return {
-            "correlations": correlations,
+            "method": "pearson_returns",
+            "window": corr_cfg.get("window"),
             "data_shape": prices_df.shape,
+            "top": result.top,
+            "most_correlated": result.top_pairs(10, "most"),
+            "least_correlated": result.top_pairs(10, "least"),
+            "matrix_file": str(result.matrix_path) if result.matrix_path else None,
+            "matrix_symbols": result.symbols if result.matrix_path else None,
         }
 
+    def update_history(self, symbols: list) -> AnalyticsState:
+        """Fold the panel's new bars into the persisted full-history aggregates.
+
+        Only bars newer than each symbol's saved state are read, so the cost
+        per report is bounded by the snapshot, not the history.
+        """
+        prefix = self.config.get("analytics", {}).get("state_prefix", "analytics/state/")
+        state = AnalyticsState.load(self.s3_client, prefix)
+        fields = self.panel.fields(["close", "high", "low", "volume"], symbols)
+        if state.update(fields["close"], fields["high"], fields["low"], fields["volume"]):
+            state.save(self.s3_client, prefix)
+        return state
+
+    def history_summary(self, symbols: list) -> dict:
+        """Full-history metrics per symbol, as in ``analyze_symbol``, from the saved aggregates."""
+        stats = self.update_history(symbols).stats(symbols)
+        stats = stats[ANALYSIS_FIELDS + ["annualized_volatility", "sharpe_ratio", "max_drawdown"]]
+        return stats.astype(object).where(stats.notna(), None).to_dict(orient="index")
+
     def volatility_comparison(self, symbols: list) -> dict:
-        """Compare volatility metrics."""
-        volatility_data = {}
-        
-        for symbol in symbols:
-            prefix = f"raw/{symbol}/"
-            latest_key = self.s3_client.get_latest_key(prefix)
-            
-            if latest_key:
-                df = self.s3_client.read_parquet(latest_key)
-                returns = df['close'].pct_change()
-                
-                volatility_data[symbol] = {
-                    "daily_volatility": float(returns.std() * 100),
-                    "annualized_volatility": float(returns.std() * (252 ** 0.5) * 100),
-                    "sharpe_ratio": float((returns.mean() / returns.std() * (252 ** 0.5)) if returns.std() > 0 else 0),
-                    "max_drawdown": float((df['close'].min() - df['close'].max()) / df['close'].max() * 100),
-                }
-        
-        return volatility_data
+        """Compare volatility metrics.
+
+        ``max_drawdown`` is the deepest fall from a running peak, in percent.
+        """
+        stats = self.symbol_stats(symbols)
+        if stats.empty:
+            return {}
+        vol = stats[["volatility", "annualized_volatility", "sharpe_ratio", "max_drawdown"]]
+        vol = vol.rename(columns={"volatility": "daily_volatility"})
+        return vol.to_dict(orient="index")
 
     def performance_summary(self, symbols: list) -> dict:
         """Generate overall performance summary."""
-        summary = {}
-        
-        for symbol in symbols:
-            analysis = self.analyze_symbol(symbol)
-            summary[symbol] = {
-                "price": analysis.get("current_price"),
-                "return": analysis.get("total_return"),
-                "volatility": analysis.get("volatility"),
-                "sharpe_approx": analysis.get("daily_return_avg", 0) / analysis.get("daily_return_std", 1) if analysis.get("daily_return_std", 1) > 0 else 0,
-                "win_rate": analysis.get("win_rate"),
-            }
-        
-        return summary
+        perf = self.symbol_stats(symbols).reindex(
+            index=symbols,
+            columns=["current_price", "total_return", "volatility", "sharpe_approx", "win_rate"],
+        )
+        perf = perf.rename(columns={"current_price": "price", "total_return": "return"})
+        # Symbols without data keep the old shape: present, with null metrics and a zero Sharpe
+        perf["sharpe_approx"] = perf["sharpe_approx"].fillna(0.0)
+        return perf.astype(object).where(perf.notna(), None).to_dict(orient="index")
 
 
 if __name__ == "__main__":
     analytics = RedshiftAnalytics("config.yaml")
     symbols = ["AAPL", "MSFT", "TSLA"]
-    
+
     print("\n" + "=" * 80)
     print("SYMBOL ANALYSIS")
     print("=" * 80)
@@ -159,19 +175,19 @@ if __name__ == "__main__":
         print(f"\n{symbol}:")
         for key, value in analysis.items():
             print(f"  {key}: {value}")
-    
+
     print("\n" + "=" * 80)
     print("COMPARISON")
     print("=" * 80)
     comparison = analytics.compare_symbols(symbols)
     print(comparison.to_string())
-    
+
     print("\n" + "=" * 80)
     print("CORRELATION ANALYSIS")
     print("=" * 80)
     corr = analytics.correlation_analysis(symbols)
     print(corr)
-    
+
     print("\n" + "=" * 80)
     print("VOLATILITY COMPARISON")
     print("=" * 80)
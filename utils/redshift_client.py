@@ -1,84 +1,91 @@
-"""Redshift client for querying S3 data."""
-import boto3
+"""SQL over the S3 parquet data.
+
+Queries run on the embedded DuckDB engine (``utils.duckdb_engine``) against a
+local mirror of the bucket, so no Redshift cluster is needed; the class keeps
+its name for existing callers.
+"""
 import pandas as pd
 from typing import Optional
-import yaml
+from utils.runtime import RuntimeContext, get_runtime
 
 
 class RedshiftClient:
-    """Connect to Redshift and query S3 data stored as parquet files."""
+    """Query S3 data stored as parquet files."""
+
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        self.runtime = runtime or get_runtime(config_path)
+        self.config = self.runtime.config
 
-    def __init__(self, config_path: str = "config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)
-        
         aws_cfg = self.config["aws"]
-        self.redshift = boto3.client("redshift-data", region_name=aws_cfg["region"])
         self.s3_bucket = aws_cfg["s3_bucket"]
         self.region = aws_cfg["region"]
+        self._engine = None
+
+    @property
+    def engine(self):
+        """The DuckDB engine, created on first query."""
+        if self._engine is None:
+            from utils.duckdb_engine import DuckDBEngine
+
+            self._engine = DuckDBEngine.from_runtime(self.runtime)
+        return self._engine
+
+    def query(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        """Run ad hoc SQL over the ``raw``, ``raw_latest``, ``predictions``, ``features`` views."""
+        return self.engine.query(sql, params)
 
     def query_raw_data(self, symbol: str, limit: int = 100) -> pd.DataFrame:
+        """The newest ``limit`` bars of a symbol's latest raw snapshot."""
+        self.engine.sync(["raw"], symbols=[symbol])
+        if "raw_latest" not in self.engine.tables():
+            return pd.DataFrame()
+        # Only this symbol was synced; skip the engine's full first-use sync
+        return self.engine.query(
+            "SELECT * FROM raw_latest WHERE symbol = ? ORDER BY time DESC LIMIT ?",
+            [symbol, limit], sync=False,
+        )
+
+    def symbol_summary(self, symbols: Optional[list] = None) -> pd.DataFrame:
+        """Per symbol: raw snapshot count, bars in the latest snapshot and its time span.
+
+        Snapshot counts come from the mirror, which the sync just reconciled
+        with the S3 listing, so no second listing is needed.
         """
-        Query raw OHLC data for a symbol from S3.
-        Uses Redshift Spectrum to query parquet files directly.
-        """
-        # Construct S3 path
-        s3_path = f"s3://{self.s3_bucket}/raw/{symbol}/"
-        
-        # SQL query using Redshift Spectrum (queries S3 directly)
-        query = f"""
-        SELECT *
-        FROM s3object
-        WHERE '$path' LIKE '{s3_path}%.parquet'
-        LIMIT {limit}
-        """
-        
-        print(f"Querying S3 path: {s3_path}")
-        print(f"Query: {query}")
-        
-        # For now, just return the path info
-        # In production, you'd execute this against Redshift
-        return {"status": "ready", "s3_path": s3_path, "query": query}
+        columns = ["symbol", "snapshots", "latest_snapshot", "bars", "first_bar", "last_bar"]
+        self.engine.sync(["raw"], symbols=symbols)
+        if "raw_latest" not in self.engine.tables():
+            return pd.DataFrame(columns=columns)
+        where = f"WHERE symbol IN ({', '.join('?' for _ in symbols)})" if symbols else ""
+        latest = self.engine.query(f"""
+            SELECT symbol, max(snapshot) AS latest_snapshot, count(*) AS bars,
+                   min(time) AS first_bar, max(time) AS last_bar
+            FROM raw_latest {where} GROUP BY symbol ORDER BY symbol
+        """, list(symbols or []), sync=False)
+
+        latest["snapshots"] = [len(self.engine.files("raw", [s])) for s in latest["symbol"]]
+        return latest[columns]
 
     def list_s3_files(self, prefix: str) -> list:
         """List all files in S3 with given prefix."""
-        s3 = boto3.client("s3", region_name=self.region)
-        keys = []
-        continuation_token = None
-        
-        while True:
-            kwargs = {"Bucket": self.s3_bucket, "Prefix": prefix}
-            if continuation_token:
-                kwargs["ContinuationToken"] = continuation_token
-            
-            resp = s3.list_objects_v2(**kwargs)
-            for item in resp.get("Contents", []):
-                keys.append(item["Key"])
-            
-            if resp.get("IsTruncated"):
-                continuation_token = resp.get("NextContinuationToken")
-            else:
-                break
-        
-        return keys
+        return self.runtime.s3.list_keys(prefix)
 
     def get_symbol_stats(self, symbol: str) -> dict:
-        """Get statistics about a symbol's data in S3."""
-        prefix = f"raw/{symbol}/"
-        files = self.list_s3_files(prefix)
-        
+        """Get statistics about a symbol's data in S3 (streamed; keys are not kept)."""
+        from utils.inventory import summarize
+
+        summary = summarize(self.runtime.s3.iter_objects(f"raw/{symbol}/"))
         return {
             "symbol": symbol,
-            "file_count": len(files),
-            "latest_file": files[-1] if files else None,
-            "all_files": files
+            "file_count": summary.count,
+            "bytes": summary.bytes,
+            "latest_file": summary.latest_key,
         }
 
 
 if __name__ == "__main__":
     # Example usage
     redshift = RedshiftClient("config.yaml")
-    
+
     # List stats for each symbol
     for symbol in ["AAPL", "MSFT", "TSLA"]:
         stats = redshift.get_symbol_stats(symbol)
@@ -0,0 +1,138 @@
+"""Columnar and streaming writers for analytics reports.
+
+``save_report_json`` writes one nested document that must be built, written
+and parsed whole. These writers split a report into flat sections instead:
+
+- ``write_tables``: one parquet file per section (symbol metrics, comparison,
+  volatility, performance, history, correlations) plus a small
+  ``index.json`` naming the files and carrying the scalar metadata, so a
+  reader loads only the tables it needs, with column pruning.
+- ``JsonlReportWriter`` / ``read_jsonl``: one JSON object per line, tagged
+  with its ``section``. The writer serializes one record at a time from the
+  built report, so no whole-document string is produced, and the reader
+  yields records lazily, so it never holds the whole report in memory.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+# Report section -> table name; sections keyed by symbol become a "symbol" column
+SYMBOL_SECTIONS = {
+    "symbol_analysis": "symbol_metrics",
+    "volatility": "volatility",
+    "performance_summary": "performance",
+    "history": "history",
+}
+
+
+def iter_tables(report: dict) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """The report's tabular sections as ``(name, DataFrame)``, built one at a time.
+
+    Empty sections are skipped.
+    """
+    for section, name in SYMBOL_SECTIONS.items():
+        rows = report.get(section) or {}
+        records = [{"symbol": symbol, **metrics} for symbol, metrics in rows.items()
+                   if isinstance(metrics, dict) and "error" not in metrics]
+        if records:
+            yield name, pd.DataFrame.from_records(records)
+    if report.get("comparison"):
+        yield "comparison", pd.DataFrame.from_records(report["comparison"])
+    top = (report.get("correlations") or {}).get("top") or {}
+    if top:
+        yield "correlations", pd.DataFrame.from_records(
+            [
+                {"symbol": symbol, "kind": kind, "rank": rank, "other": other, "corr": value}
+                for symbol, partners in top.items()
+                for kind in ("most", "least")
+                for rank, (other, value) in enumerate(partners[kind], start=1)
+            ],
+            columns=["symbol", "kind", "rank", "other", "corr"],
+        )
+
+
+def report_tables(report: dict) -> Dict[str, pd.DataFrame]:
+    return dict(iter_tables(report))
+
+
+def _metadata(report: dict) -> dict:
+    """Everything that is not a table: timestamps, symbol list, correlation summary."""
+    corr = report.get("correlations") or {}
+    return {
+        "timestamp": report.get("timestamp"),
+        "symbols": report.get("symbols", []),
+        "errors": {
+            symbol: analysis["error"]
+            for symbol, analysis in (report.get("symbol_analysis") or {}).items()
+            if isinstance(analysis, dict) and "error" in analysis
+        },
+        "correlations": {k: v for k, v in corr.items() if k != "top"},
+    }
+
+
+def write_tables(report: dict, out_dir: Path) -> Path:
+    """Write each section to ``out_dir/<table>.parquet`` plus ``index.json``; returns the index."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = {**_metadata(report), "tables": {}}
+    for name, df in iter_tables(report):
+        path = out_dir / f"{name}.parquet"
+        df.to_parquet(path, index=False)
+        index["tables"][name] = {"file": path.name, "rows": len(df), "columns": list(df.columns)}
+    index_file = out_dir / "index.json"
+    index_file.write_text(json.dumps(index, indent=2, default=str))
+    return index_file
+
+
+def read_table(index_file: Path, name: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """Load one table of a report written by ``write_tables``."""
+    index_file = Path(index_file)
+    entry = json.loads(index_file.read_text())["tables"][name]
+    return pd.read_parquet(index_file.parent / entry["file"], columns=columns)
+
+
+class JsonlReportWriter:
+    """Write report records to a JSON Lines file, one line per record.
+
+    NaN values are written as ``null`` so every line is strict JSON.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w")
+        self.records = 0
+
+    def write(self, section: str, record: dict):
+        self._file.write(json.dumps({"section": section, **record}, default=str) + "\n")
+        self.records += 1
+
+    def write_report(self, report: dict):
+        """Write a whole report: metadata first, then every table row."""
+        self.write("meta", _metadata(report))
+        for name, df in iter_tables(report):
+            df = df.astype(object).where(df.notna(), None)
+            for record in df.to_dict(orient="records"):
+                self.write(name, record)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "JsonlReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def read_jsonl(path: Path, sections: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """Yield records lazily, optionally only those of ``sections``."""
+    wanted = set(sections) if sections is not None else None
+    with Path(path).open() as f:
+        for line in f:
+            record = json.loads(line)
+            if wanted is None or record["section"] in wanted:
+                yield record
@@ -0,0 +1,98 @@
+"""Persisted run manifest for checkpointed, resumable pipeline runs.
+
+Every completed or failed work item is appended as one JSON line to
+``logs/runs/<run_id>.jsonl``. Appending keeps checkpoints O(1) per item and
+survives a crash mid-run; loading replays the journal, with later lines
+winning. An item counts as done only when its recorded input hash matches the
+current one, so changed inputs (new raw data, different config) are redone
+even within the same run id.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+
+def hash_inputs(*parts) -> str:
+    """Stable short hash of JSON-serializable inputs."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class RunManifest:
+    """Per-stage, per-item completion record for one run id."""
+
+    def __init__(self, run_id: str, root: str = "logs/runs"):
+        self.run_id = run_id
+        self.path = Path(root) / f"{run_id}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.items = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with self.path.open() as f:
+                for line in f:
+                    if line.strip():
+                        self._apply(json.loads(line))
+
+    @staticmethod
+    def new_run_id() -> str:
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    @classmethod
+    def latest_run_id(cls, root: str = "logs/runs") -> Optional[str]:
+        runs = sorted(Path(root).glob("*.jsonl"))
+        return runs[-1].stem if runs else None
+
+    def is_done(self, stage: str, item: str, input_hash: Optional[str] = None) -> bool:
+        record = self.items.get((stage, item))
+        if record is None or record["status"] != "done":
+            return False
+        return input_hash is None or record.get("input_hash") == input_hash
+
+    def output(self, stage: str, item: str) -> Any:
+        return self.items[(stage, item)].get("output")
+
+    def record(self, stage: str, item: str) -> Optional[dict]:
+        return self.items.get((stage, item))
+
+    def mark_done(self, stage: str, item: str, output: Any = None,
+                  input_hash: Optional[str] = None):
+        self._append({"stage": stage, "item": item, "status": "done",
+                      "output": output, "input_hash": input_hash})
+
+    def mark_failed(self, stage: str, item: str, error: Exception,
+                    input_hash: Optional[str] = None):
+        self._append({"stage": stage, "item": item, "status": "failed",
+                      "error": f"{type(error).__name__}: {error}", "input_hash": input_hash})
+
+    def checkpoint(self, stage: str, item: str, input_hash: str, fn):
+        """The recorded output if ``(stage, item)`` is done for these inputs, else run ``fn``."""
+        if self.is_done(stage, item, input_hash):
+            return self.output(stage, item)
+        try:
+            output = fn()
+        except Exception as e:
+            self.mark_failed(stage, item, e, input_hash)
+            raise
+        self.mark_done(stage, item, output, input_hash)
+        return output
+
+    def summary(self) -> dict:
+        stages = {}
+        for (stage, _), record in self.items.items():
+            counts = stages.setdefault(stage, {"done": 0, "failed": 0})
+            counts[record["status"]] += 1
+        return {"run_id": self.run_id, "path": str(self.path), "stages": stages}
+
+    def _append(self, record: dict):
+        record["at"] = datetime.now().isoformat()
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with self.path.open("a") as f:
+                f.write(line + "\n")
+            self._apply(record)
+
+    def _apply(self, record: dict):
+        self.items[(record["stage"], record["item"])] = record
@@ -0,0 +1,145 @@
+"""Process-wide runtime context shared by every agent and utility.
+
+Parsing ``config.yaml``, creating a boto3 session and building clients are
+done once per process here instead of once per component. Agents and
+utilities take an optional ``runtime``; when omitted they share the context
+registered for their config path via :func:`get_runtime`.
+"""
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+
+def load_config(path: str) -> dict:
+    cfg_path = Path(path)
+    if not cfg_path.exists():
+        raise FileNotFoundError(f"Config file not found: {cfg_path}")
+    with cfg_path.open("r") as f:
+        return yaml.safe_load(f)
+
+
+class RuntimeContext:
+    """Parsed config plus lazily created, shared clients and caches.
+
+    Everything heavy (boto3, the IB connection, the model cache) is created on
+    first use, so constructing a context, or an agent holding one, is cheap.
+    ``s3`` (an ``S3Client``) and ``ib`` replace the clients that would be
+    created, e.g. with fakes in benchmarks.
+    """
+
+    def __init__(self, config: dict, config_path: Optional[str] = None, s3=None, ib=None):
+        self.config = config
+        self.config_path = config_path
+        self._lock = threading.RLock()
+        self._session = None
+        self._clients: Dict[str, object] = {}
+        self._s3 = s3
+        self._ib = ib
+        self._model_cache = None
+        self.clients_created = 0
+        self.client_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config_path: str = "config.yaml", s3=None, ib=None) -> "RuntimeContext":
+        return cls(load_config(config_path), config_path, s3=s3, ib=ib)
+
+    @property
+    def region(self) -> str:
+        return self.config["aws"]["region"]
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                import boto3
+
+                self._session = boto3.session.Session(region_name=self.region)
+            return self._session
+
+    def client(self, service: str):
+        """Return the process's single boto3 client for ``service``.
+
+        boto3 clients are thread-safe; the connection pool is sized so the
+        pipeline's IO workers do not queue behind each other.
+        """
+        with self._lock:
+            if service not in self._clients:
+                from botocore.config import Config
+
+                start = time.perf_counter()
+                pool_size = max(10, self.config.get("pipeline", {}).get("io_workers", 8) * 2)
+                self._clients[service] = self.session.client(
+                    service, config=Config(max_pool_connections=pool_size)
+                )
+                self.client_seconds += time.perf_counter() - start
+                self.clients_created += 1
+            return self._clients[service]
+
+    @property
+    def s3(self):
+        """Shared ``S3Client`` over the configured bucket."""
+        with self._lock:
+            if self._s3 is None:
+                from utils.s3_client import S3Client
+
+                self._s3 = S3Client(
+                    region=self.region,
+                    bucket=self.config["aws"]["s3_bucket"],
+                    client=self.client("s3"),
+                )
+            return self._s3
+
+    @property
+    def ib(self):
+        """Shared IB connection, opened on first use from the calling thread."""
+        with self._lock:
+            if self._ib is None:
+                from utils.ibkr_client import IBKRClient
+
+                ib_cfg = self.config["ibkr"]
+                self._ib = IBKRClient(
+                    host=ib_cfg["host"],
+                    port=ib_cfg["port"],
+                    client_id=ib_cfg["client_id"],
+                    market_data_type=ib_cfg.get("market_data_type", 1),
+                )
+            return self._ib
+
+    @property
+    def model_cache(self):
+        with self._lock:
+            if self._model_cache is None:
+                from utils.model_cache import ModelCache
+
+                pred_cfg = self.config.get("prediction", {})
+                self._model_cache = ModelCache(
+                    self.s3,
+                    max_bytes=int(pred_cfg.get("model_cache_mb", 256) * 1024 * 1024),
+                    revalidate_seconds=pred_cfg.get("model_revalidate_seconds", 60),
+                )
+            return self._model_cache
+
+    def stats(self) -> dict:
+        return {
+            "config_path": self.config_path,
+            "clients_created": self.clients_created,
+            "client_seconds": round(self.client_seconds, 4),
+            "clients": sorted(self._clients),
+            "ib_connected": self._ib is not None,
+        }
+
+
+_runtimes: Dict[str, RuntimeContext] = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_runtime(config_path: str = "config.yaml") -> RuntimeContext:
+    """Return the process-wide context for ``config_path``, creating it once."""
+    key = str(Path(config_path).resolve())
+    with _runtimes_lock:
+        if key not in _runtimes:
+            _runtimes[key] = RuntimeContext.from_config(config_path)
+        return _runtimes[key]
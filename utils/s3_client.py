@@ -1,51 +1,104 @@
+import json
 import boto3
 import pandas as pd
+from botocore.exceptions import ClientError
 from io import BytesIO
-from typing import List, Optional
+from typing import Iterator, List, Optional
+
+from utils.tracing import span
 
 
 class S3Client:
-    def __init__(self, region: str, bucket: str):
-        self.s3 = boto3.client("s3", region_name=region)
+    def __init__(self, region: str, bucket: str, client=None):
+        # Pass a shared client (see utils.runtime) to avoid building one per component
+        self.s3 = client or boto3.client("s3", region_name=region)
         self.bucket = bucket
 
     def write_parquet(self, df: pd.DataFrame, key: str):
-        buf = BytesIO()
-        df.to_parquet(buf, index=True)
-        buf.seek(0)
-        self.s3.put_object(Bucket=self.bucket, Key=key, Body=buf.getvalue())
+        with span("parquet.encode", rows=len(df)):
+            buf = BytesIO()
+            df.to_parquet(buf, index=True)
+        body = buf.getvalue()
+        with span("s3.put", bytes=len(body)):
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
 
     def read_parquet(self, key: str) -> pd.DataFrame:
         """
         Read a parquet file from S3 into a pandas DataFrame.
-        
+
         We must fully read the StreamingBody into BytesIO because pyarrow
         expects a seekable file-like object, and the raw StreamingBody is not.
         """
-        obj = self.s3.get_object(Bucket=self.bucket, Key=key)
-        data = obj["Body"].read()  # bytes
-        buf = BytesIO(data)
-        return pd.read_parquet(buf)
+        data = self.get_bytes(key)
+        with span("parquet.decode") as sp:
+            df = pd.read_parquet(BytesIO(data))
+            sp.set(rows=len(df))
+        return df
+
+    def get_bytes(self, key: str) -> bytes:
+        """The object's full body."""
+        with span("s3.get") as sp:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=key)
+            data = obj["Body"].read()
+            sp.set(bytes=len(data))
+        return data
+
+    def write_json(self, obj: dict, key: str):
+        body = json.dumps(obj, default=str).encode("utf-8")
+        with span("s3.put", bytes=len(body)):
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=body)
+
+    def read_json(self, key: str) -> Optional[dict]:
+        """Read a small JSON document, returning None if the key does not exist."""
+        with span("s3.get") as sp:
+            try:
+                obj = self.s3.get_object(Bucket=self.bucket, Key=key)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                    return None
+                raise
+            data = obj["Body"].read()
+            sp.set(bytes=len(data))
+        return json.loads(data)
 
     def list_keys(self, prefix: str) -> List[str]:
-        keys = []
+        return [item["Key"] for item in self.iter_objects(prefix)]
+
+    def list_objects(self, prefix: str) -> List[dict]:
+        """Listing entries (``Key``, ``Size``, ``ETag``, ...) under ``prefix``."""
+        return list(self.iter_objects(prefix))
+
+    def iter_objects(self, prefix: str, start_after: Optional[str] = None) -> Iterator[dict]:
+        """Stream listing entries under ``prefix`` (keys after ``start_after``), page by page."""
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        if start_after:
+            kwargs["StartAfter"] = start_after
+        for page in self._pages(kwargs):
+            yield from page.get("Contents", [])
+
+    def iter_prefixes(self, prefix: str, delimiter: str = "/") -> Iterator[str]:
+        """Stream the "subdirectories" just under ``prefix`` (``raw/AAPL/``) without their keys."""
+        for page in self._pages({"Bucket": self.bucket, "Prefix": prefix, "Delimiter": delimiter}):
+            for item in page.get("CommonPrefixes", []):
+                yield item["Prefix"]
+
+    def _pages(self, kwargs: dict) -> Iterator[dict]:
         continuation_token = None
         while True:
-            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
             if continuation_token:
                 kwargs["ContinuationToken"] = continuation_token
-            resp = self.s3.list_objects_v2(**kwargs)
-            for item in resp.get("Contents", []):
-                keys.append(item["Key"])
+            with span("s3.list"):
+                resp = self.s3.list_objects_v2(**kwargs)
+            yield resp
             if resp.get("IsTruncated"):
                 continuation_token = resp.get("NextContinuationToken")
             else:
                 break
-        return keys
+
+    def get_latest_object(self, prefix: str) -> Optional[dict]:
+        """Listing entry (``Key``, ``ETag``, ...) of the last key under ``prefix``, or None."""
+        return max(self.iter_objects(prefix), key=lambda item: item["Key"], default=None)
 
     def get_latest_key(self, prefix: str) -> Optional[str]:
-        keys = self.list_keys(prefix)
-        if not keys:
-            return None
-        keys.sort()
-        return keys[-1]
+        latest = self.get_latest_object(prefix)
+        return latest["Key"] if latest else None
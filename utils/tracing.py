@@ -0,0 +1,213 @@
+"""Lightweight span tracing for the pipeline's hot paths.
+
+Wrap work in a span to record its duration plus optional byte and row
+counts::
+
+    from utils.tracing import span, traced
+
+    with span("s3.get", key=key) as sp:
+        data = obj["Body"].read()
+        sp.set(bytes=len(data))
+
+    @traced("features.add")
+    def add_features(df): ...
+
+Spans nest per thread/task (each records its parent's name) and are kept in
+memory as tuples, so a span costs a few microseconds and tracing can stay on
+in production. ``summary()`` aggregates per span name (count, percentiles,
+bytes, rows); ``export_jsonl`` and ``export_prometheus`` write them out, the
+latter in the node_exporter textfile-collector format.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_current: ContextVar = ContextVar("current_span", default=None)
+
+
+class Span:
+    """An open span; use ``set(bytes=..., rows=..., **attrs)`` to annotate it."""
+
+    __slots__ = ("tracer", "name", "attrs", "start_ns", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs) -> "Span":
+        self.attrs.update(attrs)
+        return self
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        _current.reset(self._token)
+        parent = _current.get()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._record(self.name, self.start_ns, duration_ns,
+                            parent.name if parent is not None else None, self.attrs)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """Collects finished spans for one process.
+
+    At most ``max_spans`` spans are kept; later ones are counted in
+    ``dropped`` so a runaway loop cannot exhaust memory.
+    """
+
+    def __init__(self, enabled: bool = True, max_spans: int = 1_000_000):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.spans: List[tuple] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return Span(self, name, attrs)
+
+    def _record(self, name, start_ns, duration_ns, parent, attrs):
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return
+        # list.append is atomic under the GIL; no lock on the hot path
+        thread = threading.current_thread().name
+        self.spans.append((name, start_ns, duration_ns, parent, thread, attrs))
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self.dropped = 0
+
+    def summary(self) -> Dict[str, dict]:
+        """Per span name: count, total/mean/p50/p90/p99/max seconds, bytes and rows."""
+        grouped: Dict[str, list] = {}
+        totals: Dict[str, dict] = {}
+        for name, _, duration_ns, _, _, attrs in list(self.spans):
+            grouped.setdefault(name, []).append(duration_ns)
+            t = totals.setdefault(name, {"bytes": 0, "rows": 0, "errors": 0})
+            t["bytes"] += attrs.get("bytes", 0)
+            t["rows"] += attrs.get("rows", 0)
+            t["errors"] += "error" in attrs
+
+        result = {}
+        for name, durations in sorted(grouped.items()):
+            durations.sort()
+            n = len(durations)
+            total = sum(durations) / 1e9
+            result[name] = {
+                "count": n,
+                "total_s": round(total, 6),
+                "mean_s": round(total / n, 6),
+                "p50_s": _quantile(durations, 0.50),
+                "p90_s": _quantile(durations, 0.90),
+                "p99_s": _quantile(durations, 0.99),
+                "max_s": round(durations[-1] / 1e9, 6),
+                **totals[name],
+            }
+        return result
+
+    def export_jsonl(self, path: str) -> Path:
+        """Write one JSON object per span."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            for name, start_ns, duration_ns, parent, thread, attrs in list(self.spans):
+                f.write(json.dumps({
+                    "name": name, "start_ns": start_ns, "duration_s": duration_ns / 1e9,
+                    "parent": parent, "thread": thread, **attrs,
+                }, default=str) + "\n")
+        return path
+
+    def export_prometheus(self, path: str, labels: Optional[dict] = None) -> Path:
+        """Write the summary as a Prometheus textfile (written atomically via rename)."""
+        extra = "".join(f',{k}="{v}"' for k, v in (labels or {}).items())
+        lines = [
+            "# HELP trader_span_seconds Duration of traced pipeline spans.",
+            "# TYPE trader_span_seconds summary",
+        ]
+        summary = self.summary()
+        for name, s in summary.items():
+            for key, q in (("p50_s", "0.5"), ("p90_s", "0.9"), ("p99_s", "0.99")):
+                lines.append(f'trader_span_seconds{{span="{name}",quantile="{q}"{extra}}} {s[key]}')
+            lines.append(f'trader_span_seconds_sum{{span="{name}"{extra}}} {s["total_s"]}')
+            lines.append(f'trader_span_seconds_count{{span="{name}"{extra}}} {s["count"]}')
+        for metric, key, help_text in (
+            ("trader_span_bytes_total", "bytes", "Bytes moved by traced spans."),
+            ("trader_span_rows_total", "rows", "Rows processed by traced spans."),
+            ("trader_span_errors_total", "errors", "Traced spans that raised."),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{span="{name}"{extra}}} {s[key]}' for name, s in summary.items()]
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+        tmp.write_text("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+        return path
+
+
+def _quantile(sorted_ns: list, q: float) -> float:
+    index = min(len(sorted_ns) - 1, int(round(q * (len(sorted_ns) - 1))))
+    return round(sorted_ns[index] / 1e9, 6)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer used by ``span`` and ``traced``."""
+    return _tracer
+
+
+def span(name: str, **attrs):
+    return _tracer.span(name, **attrs)
+
+
+def traced(name: Optional[str] = None, rows_from_result: bool = False):
+    """Decorator form of ``span``; ``rows_from_result`` records ``len(result)`` as rows."""
+
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(span_name) as sp:
+                result = fn(*args, **kwargs)
+                if rows_from_result and result is not None:
+                    sp.set(rows=len(result))
+                return result
+
+        return wrapper
+
+    return decorate
@@ -1,230 +1,619 @@
-"""Generate lightweight Plotly visualizations for trading data."""
+"""Generate lightweight Plotly visualizations for trading data.
+
+All symbols are read once into a shared ``DataPanel``; the aggregate charts
+take their inputs from one vectorized statistics pass over it. Figures are
+then built and written to HTML in a pool of ``dashboard.workers`` processes,
+since building a Plotly figure and serializing it is CPU-bound Python.
+
+With ``dashboard.plotlyjs: shared`` every page references one local
+``plotly.min.js`` instead of inlining the multi-megabyte bundle (``inline``)
+or fetching it from the CDN (``cdn``). Price charts show the last
+``dashboard.days`` days of bars; with intraday bars that is far more bars
+than a chart can show (30 days of 1-minute bars is ~12,000), so series
+longer than ``dashboard.max_points`` are downsampled (LTTB-chosen OHLC
+buckets) and large dashboards stay small on disk and render offline.
+
+With ``dashboard.layout: lazy`` no per-symbol page is built at all. Each
+symbol's bars are written as a compact data shard (``data/<SYMBOL>.js``:
+columnar OHLCV arrays, delta-encoded timestamps) and the index draws a
+symbol's chart in the browser only when its card scrolls into view or the
+symbol is selected, purging charts that scroll far away. Cards themselves
+are added in batches while scrolling, so opening the index costs the same
+for ten symbols as for ten thousand. Shards are loaded with ``<script>``
+tags so the index still works when opened from disk (``file://``), where
+``fetch`` is blocked. ``layout: pages``, the default, keeps one Plotly page
+per symbol.
+
+Regeneration is incremental: each chart's inputs (the S3 key and ETag of
+every symbol it draws, plus the chart settings) are hashed from LIST calls
+alone and recorded in ``_manifest.json`` next to the pages. A run reads and
+re-renders only charts whose hash changed or whose file is missing; the
+index is always rewritten.
+"""
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import yaml
-from utils.s3_client import S3Client
+from typing import Dict, Iterable, List, Optional
+from utils.correlation import returns_matrix
+from utils.data_panel import DataPanel
+from utils.downsample import downsample_ohlc
+from utils.run_manifest import hash_inputs
+from utils.runtime import RuntimeContext, get_runtime
+from utils.tracing import span
+from utils.vector_analytics import panel_stats
+
+
+# dashboard.plotlyjs mode -> write_html's include_plotlyjs
+PLOTLYJS_MODES = {"shared": "plotly.min.js", "inline": True, "cdn": "cdn"}
+SHARED_PLOTLYJS = "plotly.min.js"
+# Bump when figure code changes so existing pages are rebuilt
+CHART_VERSION = 2
+MANIFEST_FILE = "_manifest.json"
+# Cross-symbol charts -> output file
+AGGREGATE_CHARTS = {
+    "comparison": "comparison_returns.html",
+    "volatility": "volatility_comparison.html",
+    "correlation": "correlation_heatmap.html",
+}
+# dashboard.layout values; see the module docstring
+LAYOUTS = ("pages", "lazy")
+SHARD_DIR = "data"
+# Above this many cells the heatmap drops its per-cell labels
+HEATMAP_LABEL_LIMIT = 900
+
+
+def last_days(df: pd.DataFrame, days: int) -> pd.DataFrame:
+    """Bars of the last ``days`` dates with data; for daily bars the same as ``tail(days)``.
+
+    Intraday bars keep every bar of those days, which is where
+    ``max_points`` downsampling comes in.
+    """
+    dates = pd.DatetimeIndex(df.index).normalize()
+    unique = dates.unique().sort_values()
+    if len(unique) <= days:
+        return df
+    return df[dates >= unique[-days]]
+
+
+def price_figure(symbol: str, df: pd.DataFrame, days: int = 30,
+                 max_points: Optional[int] = None) -> go.Figure:
+    """Candlestick + volume figure of the last ``days`` days, at most ``max_points`` bars."""
+    df = last_days(df, days)
+    if max_points:
+        df = downsample_ohlc(df, max_points)
+
+    # Create figure with secondary y-axis
+    fig = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.1,
+        row_heights=[0.7, 0.3],
+        specs=[[{"secondary_y": False}], [{"secondary_y": False}]]
+    )
+
+    # Add candlestick
+    fig.add_trace(
+        go.Candlestick(
+            x=df.index,
+            open=df['open'],
+            high=df['high'],
+            low=df['low'],
+            close=df['close'],
+            name=symbol,
+            increasing_line_color='#00CC96',
+            decreasing_line_color='#FF6D6D'
+        ),
+        row=1, col=1
+    )
+
+    # Add volume bars
+    colors = ['#00CC96' if close >= open_ else '#FF6D6D'
+              for close, open_ in zip(df['close'], df['open'])]
+    fig.add_trace(
+        go.Bar(
+            x=df.index,
+            y=df['volume'],
+            name='Volume',
+            marker_color=colors,
+            opacity=0.6,
+            showlegend=False
+        ),
+        row=2, col=1
+    )
+
+    fig.update_xaxes(title_text="Date", row=2, col=1)
+    fig.update_yaxes(title_text="Price ($)", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+
+    fig.update_layout(
+        title=f"{symbol} - Price & Volume (Last {days} Days)",
+        hovermode='x unified',
+        height=600,
+        template='plotly_dark',
+        font=dict(size=11)
+    )
+    return fig
+
+
+def comparison_figure(total_return: pd.Series) -> go.Figure:
+    """Bar chart of total return (%) per symbol."""
+    fig = go.Figure()
+
+    colors = ['#00CC96' if x >= 0 else '#FF6D6D' for x in total_return]
+
+    fig.add_trace(
+        go.Bar(
+            x=total_return.index,
+            y=total_return.values,
+            marker_color=colors,
+            text=[f"{x:.2f}%" for x in total_return],
+            textposition='outside',
+            name='Total Return'
+        )
+    )
+
+    fig.update_layout(
+        title="Total Return Comparison (30-Day Period)",
+        xaxis_title="Symbol",
+        yaxis_title="Return (%)",
+        hovermode='x',
+        height=500,
+        template='plotly_dark',
+        font=dict(size=12),
+        showlegend=False
+    )
+
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    return fig
+
+
+def volatility_figure(volatility: pd.Series) -> go.Figure:
+    """Bar chart of daily volatility (%) per symbol, highest first."""
+    volatility = volatility.sort_values(ascending=False)
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Bar(
+            x=volatility.index,
+            y=volatility.values,
+            marker_color=['#FF6D6D' if x > 2 else '#FFA500' if x > 1.5 else '#00CC96'
+                          for x in volatility],
+            text=[f"{x:.2f}%" for x in volatility],
+            textposition='outside',
+            name='Daily Volatility'
+        )
+    )
+
+    fig.update_layout(
+        title="Daily Volatility Comparison",
+        xaxis_title="Symbol",
+        yaxis_title="Daily Volatility (%)",
+        hovermode='x',
+        height=500,
+        template='plotly_dark',
+        font=dict(size=12),
+        showlegend=False
+    )
+    return fig
+
+
+def correlation_figure(corr_df: pd.DataFrame) -> go.Figure:
+    """Heatmap of a correlation matrix."""
+    labels = {}
+    if corr_df.size <= HEATMAP_LABEL_LIMIT:
+        labels = dict(text=corr_df.values, texttemplate='%{text:.3f}', textfont={"size": 14})
+    fig = go.Figure(
+        data=go.Heatmap(
+            z=corr_df.values.astype("float32"),
+            x=corr_df.columns,
+            y=corr_df.columns,
+            colorscale='RdBu',
+            zmid=0,
+            colorbar=dict(title="Correlation"),
+            **labels
+        )
+    )
+
+    fig.update_layout(
+        title="Return Correlation Matrix",
+        height=500,
+        width=600,
+        template='plotly_dark'
+    )
+    return fig
+
+
+def shard_payload(symbol: str, df: pd.DataFrame, days: int = 30,
+                  max_points: Optional[int] = None) -> dict:
+    """The bars ``price_figure`` would draw, as compact columnar arrays.
+
+    ``t0`` is the first bar's epoch second and ``dt`` the gaps between bars
+    (constant for regular bars, so it compresses to almost nothing); prices
+    are rounded to 4 decimals and missing values are ``null``.
+    """
+    df = last_days(df, days)
+    if max_points:
+        df = downsample_ohlc(df, max_points)
+    seconds = pd.DatetimeIndex(df.index).as_unit("s").asi8.tolist()
+
+    def column(name, decimals):
+        values = df[name].round(decimals)
+        return values.astype(object).where(values.notna(), None).tolist()
+
+    return {
+        "symbol": symbol,
+        "t0": seconds[0] if seconds else None,
+        "dt": [b - a for a, b in zip(seconds, seconds[1:])],
+        "o": column("open", 4),
+        "h": column("high", 4),
+        "l": column("low", 4),
+        "c": column("close", 4),
+        "v": [int(v) for v in df["volume"].fillna(0).round()],
+    }
+
+
+def write_shard(symbol: str, df: pd.DataFrame, days: int, max_points: Optional[int],
+                shard_file: str) -> str:
+    """Write ``symbol``'s shard as a script calling ``dashboardShard(...)``."""
+    payload = json.dumps(shard_payload(symbol, df, days, max_points), separators=(",", ":"))
+    Path(shard_file).write_text(f"dashboardShard({payload});\n", encoding="utf-8")
+    return shard_file
+
+
+# Index-page script for ``layout: lazy``; expects a global ``SYMBOLS`` array
+LAZY_INDEX_SCRIPT = """
+const BATCH = 24;
+const grid = document.getElementById("symbol-cards");
+const sentinel = document.getElementById("symbol-sentinel");
+const carded = new Set();
+const shards = new Map();   // symbol -> Promise of its shard
+const waiting = new Map();  // symbol -> resolve of a pending shard script
+let next = 0;
+
+function dashboardShard(data) {
+    const resolve = waiting.get(data.symbol);
+    waiting.delete(data.symbol);
+    if (resolve) resolve(data);
+}
+
+function loadShard(symbol) {
+    if (!shards.has(symbol)) {
+        shards.set(symbol, new Promise((resolve, reject) => {
+            waiting.set(symbol, resolve);
+            const script = document.createElement("script");
+            script.src = "data/" + encodeURIComponent(symbol) + ".js";
+            script.onload = () => script.remove();
+            script.onerror = () => {
+                shards.delete(symbol);
+                script.remove();
+                reject(new Error("No data for " + symbol));
+            };
+            document.head.appendChild(script);
+        }));
+    }
+    return shards.get(symbol);
+}
+
+function draw(el, d) {
+    const x = [];
+    let t = d.t0;
+    for (let i = 0; i < d.c.length; i++) {
+        x.push(new Date(t * 1000));
+        t += d.dt[i] || 0;
+    }
+    const colors = d.c.map((c, i) => c >= d.o[i] ? "#00CC96" : "#FF6D6D");
+    Plotly.newPlot(el, [
+        {type: "candlestick", x: x, open: d.o, high: d.h, low: d.l, close: d.c, name: d.symbol,
+         increasing: {line: {color: "#00CC96"}}, decreasing: {line: {color: "#FF6D6D"}}},
+        {type: "bar", x: x, y: d.v, yaxis: "y2", name: "Volume", opacity: 0.6,
+         marker: {color: colors}}
+    ], {
+        height: 500, hovermode: "x unified", showlegend: false,
+        paper_bgcolor: "rgba(0,0,0,0)", plot_bgcolor: "#111111",
+        font: {color: "#e0e0e0", size: 11}, margin: {l: 60, r: 20, t: 20, b: 40},
+        xaxis: {rangeslider: {visible: false}, gridcolor: "#283442"},
+        yaxis: {domain: [0.3, 1], title: {text: "Price ($)"}, gridcolor: "#283442"},
+        yaxis2: {domain: [0, 0.22], title: {text: "Volume"}, gridcolor: "#283442"}
+    }, {responsive: true});
+}
+
+// Draw cards near the viewport; purge (and forget the data of) cards far from it
+const charts = new IntersectionObserver(entries => {
+    for (const entry of entries) {
+        const card = entry.target;
+        const plot = card.querySelector(".plot");
+        const symbol = card.dataset.symbol;
+        if (entry.isIntersecting && !card.dataset.drawn) {
+            card.dataset.drawn = "1";
+            loadShard(symbol)
+                .then(d => { if (card.dataset.drawn) draw(plot, d); })
+                .catch(err => { plot.textContent = err.message; });
+        } else if (!entry.isIntersecting && card.dataset.drawn) {
+            delete card.dataset.drawn;
+            Plotly.purge(plot);
+            shards.delete(symbol);
+        }
+    }
+}, {rootMargin: "600px 0px"});
+
+function addCard(symbol, before) {
+    const card = document.createElement("div");
+    card.className = "chart-card";
+    card.dataset.symbol = symbol;
+    card.innerHTML = '<h3></h3><div class="plot"></div>';
+    card.querySelector("h3").textContent = symbol + " - Price & Volume";
+    grid.insertBefore(card, before || null);
+    carded.add(symbol);
+    charts.observe(card);
+    return card;
+}
+
+// Cards are added a batch at a time as the end of the list nears the viewport
+function fill() {
+    while (next < SYMBOLS.length
+           && sentinel.getBoundingClientRect().top < window.innerHeight + 800) {
+        const end = Math.min(next + BATCH, SYMBOLS.length);
+        for (; next < end; next++) {
+            if (!carded.has(SYMBOLS[next])) addCard(SYMBOLS[next]);
+        }
+    }
+    document.getElementById("symbol-count").textContent =
+        carded.size + " of " + SYMBOLS.length + " symbols loaded";
+}
+new IntersectionObserver(fill, {rootMargin: "800px 0px"}).observe(sentinel);
+
+function select(symbol) {
+    symbol = symbol.trim().toUpperCase();
+    if (!SYMBOLS.includes(symbol)) return;
+    const card = carded.has(symbol)
+        ? grid.querySelector('[data-symbol="' + CSS.escape(symbol) + '"]')
+        : addCard(symbol, grid.firstChild);
+    card.scrollIntoView({behavior: "smooth", block: "center"});
+}
+document.getElementById("symbol-search").addEventListener("change", e => select(e.target.value));
+"""
+
+
+FIGURES = {
+    "price": price_figure,
+    "comparison": comparison_figure,
+    "volatility": volatility_figure,
+    "correlation": correlation_figure,
+}
+
+
+def render_chart(kind: str, args: tuple, html_file: str, include_plotlyjs=True) -> str:
+    """Build one figure and write its HTML, or write a ``shard`` (runs in a worker process)."""
+    with span(f"dashboard.{kind}"):
+        if kind == "shard":
+            write_shard(*args, html_file)
+        else:
+            FIGURES[kind](*args).write_html(html_file, include_plotlyjs=include_plotlyjs)
+    return html_file
 
 
 class TradingDashboard:
     """Create interactive Plotly dashboards and store in S3."""
 
-    def __init__(self, config_path: str = "config.yaml"):
-        with open(config_path) as f:
-            self.config = yaml.safe_load(f)
-        
-        self.s3_client = S3Client(
-            region=self.config["aws"]["region"],
-            bucket=self.config["aws"]["s3_bucket"]
-        )
+    def __init__(self, config_path: str = "config.yaml", runtime: Optional[RuntimeContext] = None):
+        self.runtime = runtime or get_runtime(config_path)
+        self.config = self.runtime.config
+
+        self.s3_client = self.runtime.s3
         self.symbols = self.config.get("symbols", [])
-        self.viz_dir = Path("visualizations")
-        self.viz_dir.mkdir(exist_ok=True)
+        dash_cfg = self.config.get("dashboard", {})
+        self.viz_dir = Path(dash_cfg.get("output_dir", "visualizations"))
+        self.viz_dir.mkdir(parents=True, exist_ok=True)
+        self.days = dash_cfg.get("days", 30)
+        self.max_points = dash_cfg.get("max_points", 2000)
+        self.plotlyjs = dash_cfg.get("plotlyjs", "shared")
+        if self.plotlyjs not in PLOTLYJS_MODES:
+            raise ValueError(f"dashboard.plotlyjs must be one of {sorted(PLOTLYJS_MODES)}")
+        self.layout = dash_cfg.get("layout", "pages")
+        if self.layout not in LAYOUTS:
+            raise ValueError(f"dashboard.layout must be one of {list(LAYOUTS)}")
+        if self.layout == "lazy":
+            (self.viz_dir / SHARD_DIR).mkdir(exist_ok=True)
+        self.workers = dash_cfg.get("workers") or os.cpu_count() or 1
+        self.panel = DataPanel(
+            self.s3_client,
+            raw_prefix=self.config.get("paths", {}).get("raw_prefix", "raw/"),
+            io_workers=self.config.get("pipeline", {}).get("io_workers", 8),
+        )
+        self._stats = None
 
-    def create_price_chart(self, symbol: str, days: int = 30) -> Path:
-        """Create candlestick + volume chart."""
-        # Get latest parquet file
-        s3_path = f"raw/{symbol}"
-        latest_file = self.s3_client.get_latest_key(s3_path)
-        
-        if not latest_file:
+    def load_data(self) -> DataPanel:
+        """Read every symbol's latest bars once (concurrently); all charts share them."""
+        self.panel.preload(self.symbols)
+        return self.panel
+
+    def stats(self) -> pd.DataFrame:
+        """Per-symbol statistics for the aggregate charts, computed once."""
+        if self._stats is None:
+            self._stats = panel_stats(self.panel, self.symbols)
+        return self._stats
+
+    def _price_job(self, symbol: str, days: int, shard: bool = False) -> Optional[tuple]:
+        df = self.panel.get(symbol)
+        if df is None:
             print(f"No data found for {symbol}")
             return None
-        
-        df = self.s3_client.read_parquet(latest_file)
-        df = df.tail(days)
-        
-        # Create figure with secondary y-axis
-        fig = make_subplots(
-            rows=2, cols=1,
-            shared_xaxes=True,
-            vertical_spacing=0.1,
-            row_heights=[0.7, 0.3],
-            specs=[[{"secondary_y": False}], [{"secondary_y": False}]]
-        )
-        
-        # Add candlestick
-        fig.add_trace(
-            go.Candlestick(
-                x=df.index,
-                open=df['open'],
-                high=df['high'],
-                low=df['low'],
-                close=df['close'],
-                name=symbol,
-                increasing_line_color='#00CC96',
-                decreasing_line_color='#FF6D6D'
-            ),
-            row=1, col=1
-        )
-        
-        # Add volume bars
-        colors = ['#00CC96' if close >= open_ else '#FF6D6D' 
-                  for close, open_ in zip(df['close'], df['open'])]
-        fig.add_trace(
-            go.Bar(
-                x=df.index,
-                y=df['volume'],
-                name='Volume',
-                marker_color=colors,
-                opacity=0.6,
-                showlegend=False
-            ),
-            row=2, col=1
-        )
-        
-        fig.update_xaxes(title_text="Date", row=2, col=1)
-        fig.update_yaxes(title_text="Price ($)", row=1, col=1)
-        fig.update_yaxes(title_text="Volume", row=2, col=1)
-        
-        fig.update_layout(
-            title=f"{symbol} - Price & Volume (Last {days} Days)",
-            hovermode='x unified',
-            height=600,
-            template='plotly_dark',
-            font=dict(size=11)
-        )
-        
-        # Save locally
-        html_file = self.viz_dir / f"{symbol}_price_chart.html"
-        fig.write_html(html_file)
-        
-        return html_file
+        if shard:
+            return ("shard", (symbol, df, days, self.max_points),
+                    self.viz_dir / SHARD_DIR / f"{symbol}.js")
+        return ("price", (symbol, df, days, self.max_points),
+                self.viz_dir / f"{symbol}_price_chart.html")
+
+    def _aggregate_jobs(self, names: Iterable[str] = tuple(AGGREGATE_CHARTS)) -> Dict[str, tuple]:
+        """Jobs for the cross-symbol charts, as name -> (figure kind, figure args, output file)."""
+        self.load_data()
+        stats = self.stats()
+        if stats.empty:
+            return {}
+        jobs = {}
+        if "comparison" in names:
+            jobs["comparison"] = ("comparison", (stats["total_return"],),
+                                  self.viz_dir / AGGREGATE_CHARTS["comparison"])
+        if "volatility" in names:
+            jobs["volatility"] = ("volatility", (stats["volatility"],),
+                                  self.viz_dir / AGGREGATE_CHARTS["volatility"])
+        if "correlation" in names:
+            close = self.panel.field("close", self.symbols)
+            returns = pd.DataFrame(returns_matrix(close).astype("float64"), columns=close.columns)
+            corr_df = returns.corr()
+            jobs["correlation"] = ("correlation", (corr_df,),
+                                   self.viz_dir / AGGREGATE_CHARTS["correlation"])
+        return jobs
+
+    def chart_jobs(self, names: Optional[Iterable[str]] = None) -> Dict[str, tuple]:
+        """Jobs for the charts in ``names`` (default every chart).
+
+        Keys match the ``files`` of ``generate_all_visualizations``. Only the
+        symbols those charts draw are read: a price chart needs its own
+        symbol, the aggregate charts need all of them.
+        """
+        wanted = None if names is None else set(names)
+        price_symbols = [s for s in self.symbols if wanted is None or f"{s}_price" in wanted]
+        aggregates = [n for n in AGGREGATE_CHARTS if wanted is None or n in wanted]
+        self.panel.preload(self.symbols if aggregates else price_symbols)
+        jobs = {}
+        for symbol in price_symbols:
+            job = self._price_job(symbol, self.days, shard=self.layout == "lazy")
+            if job is not None:
+                jobs[f"{symbol}_price"] = job
+        if aggregates:
+            jobs.update(self._aggregate_jobs(aggregates))
+        return jobs
+
+    def chart_hashes(self) -> Dict[str, str]:
+        """Hash of every chart's inputs, from the S3 listing alone (latest key, ETag per symbol)."""
+        objects = self.panel.locate(self.symbols)
+        params = {"days": self.days, "max_points": self.max_points, "plotlyjs": self.plotlyjs,
+                  "layout": self.layout, "version": CHART_VERSION}
+        hashes = {}
+        for symbol, obj in objects.items():
+            if obj is not None:
+                hashes[f"{symbol}_price"] = hash_inputs(
+                    "price", symbol, obj["Key"], obj.get("ETag"), params)
+        inputs = [(s, obj["Key"], obj.get("ETag")) for s, obj in objects.items() if obj is not None]
+        if inputs:
+            for name in AGGREGATE_CHARTS:
+                hashes[name] = hash_inputs(name, inputs, params)
+        return hashes
+
+    def load_manifest(self) -> Dict[str, dict]:
+        """Chart name -> {"hash", "file"} recorded by the last run ({} if none)."""
+        try:
+            return json.loads((self.viz_dir / MANIFEST_FILE).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest: Dict[str, dict]):
+        path = self.viz_dir / MANIFEST_FILE
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp, path)
+
+    def write_plotlyjs(self) -> Optional[Path]:
+        """In ``shared`` mode, write the plotly.js bundle the pages reference (once per version)."""
+        if self.plotlyjs != "shared":
+            return None
+        from plotly.offline import get_plotlyjs
+
+        bundle = get_plotlyjs().encode("utf-8")
+        path = self.viz_dir / SHARED_PLOTLYJS
+        if not path.exists() or path.stat().st_size != len(bundle):
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(bundle)
+            os.replace(tmp, path)
+        return path
+
+    def _render_one(self, jobs: Dict[str, tuple], name: str) -> Optional[Path]:
+        if name not in jobs:
+            return None
+        self.write_plotlyjs()
+        kind, args, html_file = jobs[name]
+        return Path(render_chart(kind, args, str(html_file), PLOTLYJS_MODES[self.plotlyjs]))
+
+    def render(self, jobs: Dict[str, tuple]) -> Dict[str, Path]:
+        """Render ``jobs`` across worker processes; returns name -> file for each that rendered."""
+        files = {}
+        self.write_plotlyjs()
+        include = PLOTLYJS_MODES[self.plotlyjs]
+        if self.workers <= 1 or len(jobs) <= 1:
+            for name, (kind, args, html_file) in jobs.items():
+                try:
+                    files[name] = Path(render_chart(kind, args, str(html_file), include))
+                    print(f"  ✓ {name}")
+                except Exception as e:
+                    print(f"  ✗ {name}: {e}")
+            return files
+        with ProcessPoolExecutor(min(self.workers, len(jobs))) as pool:
+            futures = {
+                name: pool.submit(render_chart, kind, args, str(html_file), include)
+                for name, (kind, args, html_file) in jobs.items()
+            }
+            for name, future in futures.items():
+                try:
+                    files[name] = Path(future.result())
+                    print(f"  ✓ {name}")
+                except Exception as e:
+                    print(f"  ✗ {name}: {e}")
+        return files
+
+    def create_price_chart(self, symbol: str, days: int = 30) -> Path:
+        """Create candlestick + volume chart."""
+        job = self._price_job(symbol, days)
+        return self._render_one({"price": job}, "price") if job else None
 
     def create_comparison_chart(self) -> Path:
         """Compare returns across all symbols."""
-        data = []
-        
-        for symbol in self.symbols:
-            latest_file = self.s3_client.get_latest_key(f"raw/{symbol}")
-            if latest_file:
-                df = self.s3_client.read_parquet(latest_file)
-                total_return = (df['close'].iloc[-1] / df['close'].iloc[0] - 1) * 100
-                data.append({"symbol": symbol, "return": total_return})
-        
-        df_returns = pd.DataFrame(data)
-        
-        fig = go.Figure()
-        
-        colors = ['#00CC96' if x >= 0 else '#FF6D6D' for x in df_returns['return']]
-        
-        fig.add_trace(
-            go.Bar(
-                x=df_returns['symbol'],
-                y=df_returns['return'],
-                marker_color=colors,
-                text=[f"{x:.2f}%" for x in df_returns['return']],
-                textposition='outside',
-                name='Total Return'
-            )
-        )
-        
-        fig.update_layout(
-            title="Total Return Comparison (30-Day Period)",
-            xaxis_title="Symbol",
-            yaxis_title="Return (%)",
-            hovermode='x',
-            height=500,
-            template='plotly_dark',
-            font=dict(size=12),
-            showlegend=False
-        )
-        
-        fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-        
-        html_file = self.viz_dir / "comparison_returns.html"
-        fig.write_html(html_file)
-        
-        return html_file
+        return self._render_one(self._aggregate_jobs(["comparison"]), "comparison")
 
     def create_volatility_chart(self) -> Path:
         """Volatility comparison chart."""
-        data = []
-        
-        for symbol in self.symbols:
-            latest_file = self.s3_client.get_latest_key(f"raw/{symbol}")
-            if latest_file:
-                df = self.s3_client.read_parquet(latest_file)
-                daily_vol = df['close'].pct_change().std() * 100
-                data.append({"symbol": symbol, "volatility": daily_vol})
-        
-        df_vol = pd.DataFrame(data).sort_values('volatility', ascending=False)
-        
-        fig = go.Figure()
-        
-        fig.add_trace(
-            go.Bar(
-                x=df_vol['symbol'],
-                y=df_vol['volatility'],
-                marker_color=['#FF6D6D' if x > 2 else '#FFA500' if x > 1.5 else '#00CC96' 
-                              for x in df_vol['volatility']],
-                text=[f"{x:.2f}%" for x in df_vol['volatility']],
-                textposition='outside',
-                name='Daily Volatility'
-            )
-        )
-        
-        fig.update_layout(
-            title="Daily Volatility Comparison",
-            xaxis_title="Symbol",
-            yaxis_title="Daily Volatility (%)",
-            hovermode='x',
-            height=500,
-            template='plotly_dark',
-            font=dict(size=12),
-            showlegend=False
-        )
-        
-        html_file = self.viz_dir / "volatility_comparison.html"
-        fig.write_html(html_file)
-        
-        return html_file
+        return self._render_one(self._aggregate_jobs(["volatility"]), "volatility")
 
     def create_correlation_heatmap(self) -> Path:
         """Create correlation matrix heatmap."""
-        data_frames = {}
-        
-        for symbol in self.symbols:
-            latest_file = self.s3_client.get_latest_key(f"raw/{symbol}")
-            if latest_file:
-                df = self.s3_client.read_parquet(latest_file)
-                data_frames[symbol] = df['close'].pct_change()
-        
-        corr_df = pd.DataFrame(data_frames).corr()
-        
-        fig = go.Figure(
-            data=go.Heatmap(
-                z=corr_df.values,
-                x=corr_df.columns,
-                y=corr_df.columns,
-                colorscale='RdBu',
-                zmid=0,
-                text=corr_df.values,
-                texttemplate='%{text:.3f}',
-                textfont={"size": 14},
-                colorbar=dict(title="Correlation")
-            )
-        )
-        
-        fig.update_layout(
-            title="Price Correlation Matrix",
-            height=500,
-            width=600,
-            template='plotly_dark'
-        )
-        
-        html_file = self.viz_dir / "correlation_heatmap.html"
-        fig.write_html(html_file)
-        
-        return html_file
+        return self._render_one(self._aggregate_jobs(["correlation"]), "correlation")
 
-    def create_master_dashboard(self) -> Path:
-        """Create main HTML dashboard linking all charts."""
+    def create_master_dashboard(self, symbols: Optional[List[str]] = None) -> Path:
+        """Create main HTML dashboard linking all charts (price cards for ``symbols``, or all)."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
+        symbols = self.symbols if symbols is None else symbols
+        symbol_cards = "" if self.layout == "lazy" else "\n".join(
+            f"""            <div class="chart-card">
+                <h3>{symbol} - Price & Volume</h3>
+                <iframe src="{symbol}_price_chart.html" title="{symbol} Chart"
+                        loading="lazy"></iframe>
+            </div>
+            """
+            for symbol in symbols
+        )
+        lazy_section = ""
+        if self.layout == "lazy":
+            lazy_section = f"""
+        <div class="symbol-toolbar">
+            <input id="symbol-search" type="search" placeholder="Jump to symbol..."
+                   autocomplete="off">
+            <span id="symbol-count"></span>
+        </div>
+        <div id="symbol-cards" class="dashboard-grid"></div>
+        <div id="symbol-sentinel"></div>
+        <script>const SYMBOLS = {json.dumps(list(symbols))};</script>
+        <script>{LAZY_INDEX_SCRIPT}</script>
+"""
+        if self.plotlyjs == "shared":
+            plotly_script = f'<script src="{SHARED_PLOTLYJS}"></script>'
+        else:
+            plotly_script = '<script src="https://cdn.plot.ly/plotly-latest.min.js"></script>'
+
         html_content = f"""
 <!DOCTYPE html>
 <html>
@@ -232,7 +621,7 @@ class TradingDashboard:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Super Agent Trader - Dashboard</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    {plotly_script}
     <style>
         * {{
             margin: 0;
@@ -295,6 +684,25 @@ class TradingDashboard:
             border: none;
             border-radius: 5px;
         }}
+        .plot {{
+            width: 100%;
+            height: 500px;
+        }}
+        .symbol-toolbar {{
+            display: flex;
+            align-items: center;
+            gap: 15px;
+            margin-bottom: 20px;
+            color: #a0a0a0;
+        }}
+        .symbol-toolbar input {{
+            background: rgba(0, 0, 0, 0.3);
+            border: 1px solid rgba(0, 204, 150, 0.4);
+            border-radius: 5px;
+            color: #e0e0e0;
+            padding: 8px 12px;
+            font-size: 1em;
+        }}
         .full-width {{
             grid-column: 1 / -1;
         }}
@@ -322,116 +730,109 @@ class TradingDashboard:
             <p>Last Updated: {timestamp}</p>
             <p>Real-time analytics powered by your trading data in S3</p>
         </header>
-        
+
         <div class="dashboard-grid">
             <div class="chart-card full-width">
                 <h3>Returns Comparison</h3>
                 <iframe src="comparison_returns.html" title="Returns Comparison"></iframe>
             </div>
-            
-            <div class="chart-card">
-                <h3>AAPL - Price & Volume</h3>
-                <iframe src="AAPL_price_chart.html" title="AAPL Chart"></iframe>
-            </div>
-            
-            <div class="chart-card">
-                <h3>MSFT - Price & Volume</h3>
-                <iframe src="MSFT_price_chart.html" title="MSFT Chart"></iframe>
-            </div>
-            
-            <div class="chart-card">
-                <h3>TSLA - Price & Volume</h3>
-                <iframe src="TSLA_price_chart.html" title="TSLA Chart"></iframe>
-            </div>
-            
+
+{symbol_cards}
             <div class="chart-card">
                 <h3>Volatility Comparison</h3>
                 <iframe src="volatility_comparison.html" title="Volatility"></iframe>
             </div>
-            
+
             <div class="chart-card">
-                <h3>Price Correlation Matrix</h3>
+                <h3>Return Correlation Matrix</h3>
                 <iframe src="correlation_heatmap.html" title="Correlation"></iframe>
             </div>
         </div>
-        
+{lazy_section}
         <footer>
-            <p>For detailed analytics reports, see logs/analytics_data_*.json</p>
+            <p>For detailed analytics reports, see logs/analytics_*/index.json</p>
             <p>Dashboard generated automatically by AnalyticsReporter</p>
         </footer>
     </div>
 </body>
 </html>
 """
-        
+
         html_file = self.viz_dir / "index.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
+        tmp = html_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
             f.write(html_content)
-        
+        os.replace(tmp, html_file)
+
         return html_file
 
-    def generate_all_visualizations(self) -> dict:
-        """Generate all charts and return file locations."""
+    def generate_all_visualizations(self, force: bool = False) -> dict:
+        """Generate the charts whose inputs changed (all with ``force``); return file locations."""
         print("Generating visualizations...")
-        
+
         results = {
             "timestamp": datetime.now().isoformat(),
-            "files": {}
+            "files": {},
+            "regenerated": [],
+            "skipped": [],
         }
-        
-        # Individual price charts
-        for symbol in self.symbols:
-            try:
-                chart_file = self.create_price_chart(symbol)
-                results["files"][f"{symbol}_price"] = str(chart_file)
-                print(f"  ✓ {symbol} price chart")
-            except Exception as e:
-                print(f"  ✗ {symbol} price chart: {e}")
-        
-        # Comparison chart
-        try:
-            comp_file = self.create_comparison_chart()
-            results["files"]["comparison"] = str(comp_file)
-            print(f"  ✓ Comparison chart")
-        except Exception as e:
-            print(f"  ✗ Comparison chart: {e}")
-        
-        # Volatility chart
-        try:
-            vol_file = self.create_volatility_chart()
-            results["files"]["volatility"] = str(vol_file)
-            print(f"  ✓ Volatility chart")
-        except Exception as e:
-            print(f"  ✗ Volatility chart: {e}")
-        
-        # Correlation heatmap
-        try:
-            corr_file = self.create_correlation_heatmap()
-            results["files"]["correlation"] = str(corr_file)
-            print(f"  ✓ Correlation heatmap")
-        except Exception as e:
-            print(f"  ✗ Correlation heatmap: {e}")
-        
+
+        with span("dashboard.locate", rows=len(self.symbols)):
+            hashes = self.chart_hashes()
+        manifest = {} if force else self.load_manifest()
+        stale = [
+            name for name, digest in hashes.items()
+            if manifest.get(name, {}).get("hash") != digest
+            or not (self.viz_dir / manifest[name]["file"]).exists()
+        ]
+        print(f"  {len(hashes) - len(stale)} charts up to date, {len(stale)} to regenerate")
+
+        jobs = {}
+        if stale:
+            with span("dashboard.load"):
+                jobs = self.chart_jobs(stale)
+            print(f"  Loaded {self.panel.reads} symbol files")
+        with span("dashboard.render", rows=len(jobs)):
+            files = self.render(jobs)
+        for name, path in files.items():
+            file = path.relative_to(self.viz_dir).as_posix()
+            previous = manifest.get(name, {}).get("file")
+            if previous and previous != file:  # layout changed: page replaced by shard or back
+                (self.viz_dir / previous).unlink(missing_ok=True)
+            manifest[name] = {"hash": hashes[name], "file": file}
+        # Charts of symbols no longer configured (or without data) are removed
+        for name in set(manifest) - set(hashes):
+            (self.viz_dir / manifest.pop(name)["file"]).unlink(missing_ok=True)
+        self.save_manifest(manifest)
+
+        results["regenerated"] = sorted(files)
+        results["skipped"] = sorted(set(hashes) - set(stale))
+        results["files"].update({
+            name: str(self.viz_dir / entry["file"]) for name, entry in manifest.items()
+            if (self.viz_dir / entry["file"]).exists()
+        })
+
         # Master dashboard
         try:
-            dashboard_file = self.create_master_dashboard()
+            rendered = [s for s in self.symbols if f"{s}_price" in results["files"]]
+            dashboard_file = self.create_master_dashboard(rendered)
             results["files"]["dashboard"] = str(dashboard_file)
-            print(f"  ✓ Master dashboard (index.html)")
+            print("  ✓ Master dashboard (index.html)")
         except Exception as e:
             print(f"  ✗ Master dashboard: {e}")
-        
+
         return results
 
 
 if __name__ == "__main__":
     dashboard = TradingDashboard()
     results = dashboard.generate_all_visualizations()
-    
+
     print("\n" + "=" * 60)
     print("Visualizations created in: visualizations/")
     print("Open 'visualizations/index.html' in your browser")
     print("=" * 60)
-    
+
     print("\nFile listing:")
     for name, path in results["files"].items():
         print(f"  {name}: {path}")
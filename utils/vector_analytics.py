@@ -0,0 +1,111 @@
+"""Vectorized per-symbol statistics over aligned time × symbol matrices.
+
+Every metric of the analytics report is computed for all symbols at once
+with NumPy reductions over the ``DataPanel``'s aligned close/high/low/volume
+matrices, instead of one pandas pass per symbol. Symbols have different
+histories, so cells outside a symbol's bars are NaN and every reduction is
+NaN-aware. Returns are taken between a symbol's own consecutive bars, which
+matches ``Series.pct_change`` on its unaligned series.
+"""
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+def _returns(close: np.ndarray) -> np.ndarray:
+    """Bar-to-bar returns per column, skipping NaN gaps from alignment."""
+    prev = pd.DataFrame(close).ffill().to_numpy()
+    returns = np.full_like(close, np.nan)
+    returns[1:] = close[1:] / prev[:-1] - 1
+    return returns
+
+
+def _first_last(valid: np.ndarray):
+    """Row index of each column's first and last valid cell."""
+    first = valid.argmax(axis=0)
+    last = valid.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    return first, last
+
+
+def max_drawdown(close: np.ndarray) -> np.ndarray:
+    """Deepest fall from a running peak per column, in percent (≤ 0)."""
+    filled = pd.DataFrame(close).ffill().to_numpy()
+    peak = np.fmax.accumulate(filled, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drawdown = filled / peak - 1
+    return np.nanmin(drawdown, axis=0) * 100
+
+
+def symbol_stats(close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame,
+                 volume: pd.DataFrame) -> pd.DataFrame:
+    """All report metrics, one row per column (symbol) of the aligned inputs.
+
+    Columns without any data must be dropped by the caller.
+    """
+    symbols = close.columns
+    index = close.index
+    c = close.to_numpy(dtype="float64")
+    h = high.reindex(columns=symbols).to_numpy(dtype="float64")
+    lo = low.reindex(columns=symbols).to_numpy(dtype="float64")
+    v = volume.reindex(columns=symbols).to_numpy(dtype="float64")
+
+    valid = ~np.isnan(c)
+    n_points = valid.sum(axis=0)
+    first, last = _first_last(valid)
+    cols = np.arange(c.shape[1])
+    first_close, last_close = c[first, cols], c[last, cols]
+
+    r = _returns(c)
+    ret_mean = np.nanmean(r, axis=0)
+    ret_std = np.nanstd(r, axis=0, ddof=1)
+    price_range = h - lo
+    updays = (r > 0).sum(axis=0)
+    downdays = (r < 0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(ret_std > 0, ret_mean / ret_std * TRADING_DAYS ** 0.5, 0.0)
+        sharpe_approx = np.where(ret_std > 0, ret_mean / ret_std, 0.0)
+
+    dates = [_date(index[i]) for i in first], [_date(index[i]) for i in last]
+    stats = pd.DataFrame({
+        "data_points": n_points,
+        "date_range": [f"{a} to {b}" for a, b in zip(*dates)],
+        "current_price": last_close,
+        "price_min": np.nanmin(c, axis=0),
+        "price_max": np.nanmax(c, axis=0),
+        "price_avg": np.nanmean(c, axis=0),
+        "total_return": (last_close / first_close - 1) * 100,
+        "daily_return_avg": ret_mean * 100,
+        "daily_return_std": ret_std * 100,
+        "max_daily_gain": np.nanmax(r, axis=0) * 100,
+        "max_daily_loss": np.nanmin(r, axis=0) * 100,
+        "volatility": ret_std * 100,
+        "avg_price_range": np.nanmean(price_range, axis=0),
+        "max_intraday_range": np.nanmax(price_range, axis=0),
+        "avg_volume": np.nanmean(v, axis=0),
+        "total_volume": np.nansum(v, axis=0),
+        "updays": updays,
+        "downdays": downdays,
+        "win_rate": updays / n_points * 100,
+        # Not part of analyze_symbol's output; used by volatility/performance views
+        "annualized_volatility": ret_std * TRADING_DAYS ** 0.5 * 100,
+        "sharpe_ratio": sharpe,
+        "sharpe_approx": sharpe_approx,
+        "max_drawdown": max_drawdown(c),
+    }, index=pd.Index(symbols, name="symbol"))
+    return stats
+
+
+def panel_stats(panel, symbols: Sequence[str]) -> pd.DataFrame:
+    """``symbol_stats`` for the panel's symbols that have data."""
+    fields = panel.fields(["close", "high", "low", "volume"], symbols)
+    if fields["close"].empty:
+        return pd.DataFrame()
+    return symbol_stats(fields["close"], fields["high"], fields["low"], fields["volume"])
+
+
+def _date(value):
+    # Index entries may be dates or datetimes
+    return value.date() if hasattr(value, "date") else value
@@ -0,0 +1,200 @@
+"""Shared symbol work queue for sharded runs across several worker hosts.
+
+Each run enqueues one item per symbol. Workers ``claim`` an item under a
+lease, renew it with ``heartbeat`` while working, then ``complete`` or
+``fail`` it. An item whose lease expires (worker crashed or lost its host)
+becomes claimable again; items failing ``max_attempts`` times are parked as
+``failed``.
+
+``WorkQueue`` is the backend interface; ``SQLiteWorkQueue`` is the local
+implementation (one database file on storage every worker can reach).
+Select a backend with ``queue.backend`` in config and :func:`open_queue`.
+"""
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+@dataclass
+class WorkItem:
+    run_id: str
+    symbol: str
+    worker_id: str
+    attempts: int
+    lease_expires: float
+
+
+class WorkQueue(ABC):
+    """Lease-based queue of per-symbol work items, grouped by run id."""
+
+    def __init__(self, lease_seconds: float = 300, max_attempts: int = 3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, run_id: str, symbols: Iterable[str]) -> int:
+        """Add items for ``symbols`` not already in the run; returns how many were added."""
+
+    @abstractmethod
+    def claim(self, run_id: str, worker_id: str) -> Optional[WorkItem]:
+        """Lease the next pending or abandoned item, or return None if there is none."""
+
+    @abstractmethod
+    def heartbeat(self, item: WorkItem) -> bool:
+        """Extend the lease; False if the item is no longer leased to this worker."""
+
+    @abstractmethod
+    def complete(self, item: WorkItem, result: Any = None) -> bool:
+        """Record the result; False, recording nothing, if the item is no longer this worker's."""
+
+    @abstractmethod
+    def fail(self, item: WorkItem, error: str):
+        """Release the item for retry, or park it as failed after ``max_attempts``."""
+
+    @abstractmethod
+    def status(self, run_id: str) -> Dict[str, int]:
+        """Item counts by state: pending, leased, done, failed."""
+
+    @abstractmethod
+    def results(self, run_id: str) -> Dict[str, Any]:
+        """Results of the run's completed items, keyed by symbol."""
+
+    def unfinished(self, run_id: str) -> int:
+        counts = self.status(run_id)
+        return counts.get("pending", 0) + counts.get("leased", 0)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """``WorkQueue`` over one SQLite file; claims are atomic via ``BEGIN IMMEDIATE``."""
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3):
+        super().__init__(lease_seconds, max_attempts)
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS work_items (
+                    run_id TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (run_id, symbol)
+                )"""
+            )
+
+    def _connect(self):
+        # Autocommit mode; transactions are opened explicitly where needed
+        return closing(sqlite3.connect(self.path, timeout=30, isolation_level=None))
+
+    def enqueue(self, run_id: str, symbols: Iterable[str]) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.executemany(
+                "INSERT OR IGNORE INTO work_items (run_id, symbol, updated_at) VALUES (?, ?, ?)",
+                [(run_id, symbol, now) for symbol in symbols],
+            )
+            return cur.rowcount
+
+    def claim(self, run_id: str, worker_id: str) -> Optional[WorkItem]:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Leases past expiry belong to dead workers: count the attempt as failed
+            conn.execute(
+                """UPDATE work_items SET state = 'failed', error = 'lease expired', updated_at = ?
+                   WHERE run_id = ? AND state = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                (now, run_id, now, self.max_attempts),
+            )
+            row = conn.execute(
+                """SELECT symbol, attempts FROM work_items
+                   WHERE run_id = ?
+                     AND (state = 'pending' OR (state = 'leased' AND lease_expires < ?))
+                   ORDER BY attempts, symbol LIMIT 1""",
+                (run_id, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            symbol, attempts = row
+            expires = now + self.lease_seconds
+            conn.execute(
+                """UPDATE work_items SET state = 'leased', worker_id = ?, attempts = ?,
+                   lease_expires = ?, updated_at = ? WHERE run_id = ? AND symbol = ?""",
+                (worker_id, attempts + 1, expires, now, run_id, symbol),
+            )
+            conn.execute("COMMIT")
+            return WorkItem(run_id, symbol, worker_id, attempts + 1, expires)
+
+    def heartbeat(self, item: WorkItem) -> bool:
+        expires = time.time() + self.lease_seconds
+        with self._connect() as conn:
+            cur = conn.execute(
+                """UPDATE work_items SET lease_expires = ?, updated_at = ?
+                   WHERE run_id = ? AND symbol = ? AND state = 'leased' AND worker_id = ?""",
+                (expires, time.time(), item.run_id, item.symbol, item.worker_id),
+            )
+        if cur.rowcount:
+            item.lease_expires = expires
+        return bool(cur.rowcount)
+
+    def complete(self, item: WorkItem, result: Any = None) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute(
+                """UPDATE work_items SET state = 'done', result = ?, error = NULL, updated_at = ?
+                   WHERE run_id = ? AND symbol = ? AND worker_id = ? AND state = 'leased'""",
+                (json.dumps(result, default=str), time.time(),
+                 item.run_id, item.symbol, item.worker_id),
+            )
+        return bool(cur.rowcount)
+
+    def fail(self, item: WorkItem, error: str):
+        state = "failed" if item.attempts >= self.max_attempts else "pending"
+        with self._connect() as conn:
+            conn.execute(
+                """UPDATE work_items SET state = ?, error = ?, worker_id = NULL, updated_at = ?
+                   WHERE run_id = ? AND symbol = ? AND worker_id = ? AND state = 'leased'""",
+                (state, error, time.time(), item.run_id, item.symbol, item.worker_id),
+            )
+
+    def status(self, run_id: str) -> Dict[str, int]:
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._connect() as conn:
+            for state, n in conn.execute(
+                "SELECT state, COUNT(*) FROM work_items WHERE run_id = ? GROUP BY state", (run_id,)
+            ):
+                counts[state] = n
+        return counts
+
+    def results(self, run_id: str) -> Dict[str, Any]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT symbol, result FROM work_items WHERE run_id = ? AND state = 'done'",
+                (run_id,),
+            ).fetchall()
+        return {symbol: json.loads(result) if result else None for symbol, result in rows}
+
+
+QUEUE_BACKENDS = {"sqlite": SQLiteWorkQueue}
+
+
+def open_queue(config: dict) -> WorkQueue:
+    """Build the queue described by the config's ``queue`` section."""
+    queue_cfg = config.get("queue", {})
+    backend = queue_cfg.get("backend", "sqlite")
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend: {backend}")
+    return QUEUE_BACKENDS[backend](
+        queue_cfg.get("path", "logs/work_queue.sqlite"),
+        lease_seconds=queue_cfg.get("lease_seconds", 300),
+        max_attempts=queue_cfg.get("max_attempts", 3),
+    )